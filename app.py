@@ -1,130 +1,73 @@
 import streamlit as st
 import pandas as pd
-import io
+import datetime
 import os
-import re
-import time
-import hmac
-import hashlib
 import uuid
-import datetime
-import requests
-import numpy as np
 
-# ==========================================
-# [설정] 서버 파일 경로 (자동 로드용)
-# ==========================================
-SERVER_CONTACT_FILE = "농가관리 목록_20260208 (전체).xlsx"  # 업체 연락처
-SERVER_MEMBER_FILE = "회원관리(전체).xlsx"                # 회원 명부
+from poomasi import profiling
+from poomasi.allocation import AllocationProblem, allocate
+from poomasi.cleaning import clean_phones
+from poomasi.common import clean_phone_number, detect_columns, load_data_smart as _load_data_smart
+from poomasi.compact import compact_frame
+from poomasi.config import ADMIN_PASSWORD, SERVER_CONTACT_FILE, SERVER_MEMBER_FILE, VALID_SUPPLIERS
+from poomasi.forecast import METHODS, backtest
+from poomasi.history import get_history
+from poomasi.jobs import DONE, get_runner, status_line, watch
+from poomasi.member_search import load_member_index
+from poomasi.outbox import FAILED, content_hash, get_outbox
+from poomasi.pipeline import ORDER_GROUPS, forecast_orders, load_sales, load_sales_window, order_table, send_job
+from poomasi.purchase_cube import load_purchase_cube
+from poomasi.ref_cache import source_signature
+from poomasi.rfm import SEGMENTS, build_state, score_rfm, segment_members, segment_summary
+from poomasi.sales_agg import vendor_index
+from poomasi.sms import SmsDispatcher, send_coolsms_direct
+from poomasi.suppliers import get_supplier_resolver
 
-# ==========================================
-# [중요] 발주 대상 업체 (화이트리스트)
-# ==========================================
-VALID_SUPPLIERS = [
-    "(주)가보트레이딩", "(주)열두달", "(주)우리밀", "(주)윈윈농수산", "(주)유기샘",
-    "(주)케이푸드", "(주)한누리", "G1상사", "mk코리아", "가가호영어조합법인",
-    "고삼농협", "금강향수", "나우푸드", "네니아", "농부생각", "농업회사법인(주)담채원",
-    "당암tf", "더테스트키친", "도마령영농조합법인", "두레생협", "또또푸드", "로엘팩토리",
-    "맛가마", "산백유통", "새롬식품", "생수콩나물영농조합법인", "슈가랩", "씨글로벌(아라찬)",
-    "씨에이치하모니", "언니들공방", "에르코스", "엔젤농장", "우리밀농협", "우신영농조합",
-    "유기농산", "유안컴퍼니", "인터뷰베이커리", "자연에찬", "장수이야기", "제로웨이스트존",
-    "청양농협조합", "청오건강농업회사법인", "청춘농장", "코레드인터내쇼날", "태경F&B",
-    "토종마을", "폴카닷(이은경)", "하대목장", "한산항아리소곡주", "함지박(주)", "행복우리식품영농조합",
-    "지족점(벌크)", "지족(Y)", "지족점_공동구매", "지족점과일", "지족점야채", "지족매장", "지족점정육"
-]
+VENDOR_PAGE_SIZE = 10  # 발주 탭에서 한 번에 그리는 업체 수
+SEARCH_LIMIT = 200     # 회원 검색 결과 최대 표시 수
 
 # ==========================================
 # 0. [공통 함수]
 # ==========================================
-def send_coolsms_direct(api_key, api_secret, sender, receiver, text):
-    try:
-        clean_receiver = re.sub(r'[^0-9]', '', str(receiver))
-        clean_sender = re.sub(r'[^0-9]', '', str(sender))
-        if not clean_receiver or not clean_sender: return False, {"errorMessage": "번호 오류"}
-
-        date = datetime.datetime.now(datetime.timezone.utc).isoformat()
-        salt = str(uuid.uuid4())
-        data = date + salt
-        signature = hmac.new(api_secret.encode('utf-8'), data.encode('utf-8'), hashlib.sha256).hexdigest()
-        
-        headers = {"Authorization": f"HMAC-SHA256 apiKey={api_key}, date={date}, salt={salt}, signature={signature}", "Content-Type": "application/json"}
-        url = "https://api.coolsms.co.kr/messages/v4/send"
-        payload = {"message": {"to": clean_receiver, "from": clean_sender, "text": text}}
-        
-        res = requests.post(url, json=payload, headers=headers)
-        if res.status_code == 200: return True, res.json()
-        else: return False, res.json()
-    except Exception as e: return False, {"errorMessage": str(e)}
-
-def clean_phone_number(phone):
-    if pd.isna(phone) or str(phone).strip() in ['-', '', 'nan']: return ''
-    clean_num = re.sub(r'[^0-9]', '', str(phone))
-    if clean_num.startswith('10') and len(clean_num) >= 10: clean_num = '0' + clean_num
-    return clean_num 
-
-@st.cache_data
-def load_data_smart(file_obj, type='sales'):
-    if file_obj is None: return None, "파일 없음"
-    df_raw = None
-    try: df_raw = pd.read_excel(file_obj, header=None, engine='openpyxl')
-    except:
-        try:
-            if hasattr(file_obj, 'seek'): file_obj.seek(0)
-            df_raw = pd.read_csv(file_obj, header=None, encoding='utf-8')
-        except: return None, "읽기 실패"
-
-    target_row_idx = -1
-    keywords = ['농가', '공급자', '생산자', '상품', '품목'] if type == 'sales' else \
-               ['회원번호', '이름', '휴대전화'] if type == 'member' else ['농가명', '휴대전화', '전화번호']
-    
-    for idx, row in df_raw.head(20).iterrows():
-        row_str = row.astype(str).str.cat(sep=' ')
-        match_cnt = sum(1 for k in keywords if k in row_str)
-        if match_cnt >= 2:
-            target_row_idx = idx
-            break
-            
-    if target_row_idx != -1:
-        df_final = df_raw.iloc[target_row_idx+1:].copy()
-        df_final.columns = df_raw.iloc[target_row_idx]
-        df_final.columns = df_final.columns.astype(str).str.replace(' ', '').str.replace('\n', '')
-        df_final = df_final.loc[:, ~df_final.columns.str.contains('^Unnamed')]
-        return df_final, None
-    else:
-        try:
-            if hasattr(file_obj, 'seek'): file_obj.seek(0)
-            return pd.read_excel(file_obj) if (hasattr(file_obj, 'name') and file_obj.name.endswith('xlsx')) else pd.read_csv(file_obj), "헤더 못 찾음(기본로드)"
-        except: return df_raw, "헤더 못 찾음"
-
-def to_clean_number(x):
-    try:
-        clean_str = re.sub(r'[^0-9.-]', '', str(x))
-        return float(clean_str) if clean_str not in ['', '.'] else 0
-    except: return 0
-
-def detect_columns(df_columns):
-    s_item = next((c for c in df_columns if any(x in c for x in ['상품', '품목'])), None)
-    s_qty = next((c for c in df_columns if any(x in c for x in ['판매수량', '총수량'])), None)
-    if not s_qty: s_qty = next((c for c in df_columns if any(x in c for x in ['수량', '개수'])), None)
-    
-    exclude = ['할인', '반품', '취소', '면세', '과세', '부가세']
-    candidates = [c for c in df_columns if ('총' in c and ('판매' in c or '매출' in c))] + \
-                 [c for c in df_columns if (('판매' in c or '매출' in c) and ('액' in c or '금액' in c))] + \
-                 [c for c in df_columns if '금액' in c]
-    
-    s_amt = next((c for c in candidates if not any(bad in c for bad in exclude)), None)
-    s_farmer = next((c for c in df_columns if any(x in c for x in ['공급자', '농가', '생산자', '거래처'])), None)
-    return s_item, s_qty, s_amt, s_farmer
+@st.cache_resource(max_entries=16)
+def _load_shared(file_obj, type='sales', columns=None):
+    # 같은 파일은 프로세스에 한 벌만 (작은 dtype 으로 줄여서) 두고 모든 세션이 같이 씀
+    df, err = _load_data_smart(file_obj, type, columns)
+    return compact_frame(df), err
+
+@st.cache_resource(max_entries=4)
+def _allocation_problem(agg):
+    # 같은 발주 표면 (품목, k) 후보 배열과 정렬을 다시 만들지 않음 → 예산·최소 주문금액 변경은 solve 만
+    return AllocationProblem.from_frame(agg)
+
+def load_data_smart(file_obj, type='sales', columns=None):
+    df, err = _load_shared(file_obj, type, columns)
+    return (df.copy(deep=False) if df is not None else None), err  # 받은 쪽에서 컬럼을 바꿔도 공유본은 그대로
+
+def render_send(job):
+    # 백그라운드 문자 발송 진행 / 결과 (발송 도중에는 취소하지 않음)
+    status_line(job, cancel=False)
+    if job.status != DONE: return
+    summary = job.result
+    st.success(f"{summary['sent']}건 발송 완료!")
+    if summary['skipped']: st.info(f"{summary['skipped']}건은 오늘 같은 내용으로 이미 발송되어 건너뛰었습니다.")
+    if summary['unknown']: st.warning(f"{summary['unknown']}건은 응답을 받지 못했거나 이전 발송이 중단되어 결과 확인이 필요합니다.")
+    if summary['failed']:
+        st.warning(f"{summary['failed']}건 실패")
+        st.dataframe(pd.DataFrame(get_outbox().rows(keys=job.partial()['keys'], status=FAILED))[['receiver', 'error']], hide_index=True)
 
 # ==========================================
 # 1. [사이드바] 설정 및 로그인 (왼쪽 고정)
 # ==========================================
 st.set_page_config(page_title="시다비서 (시비)", page_icon="🤖", layout="wide")
 
-if 'sent_history' not in st.session_state: st.session_state.sent_history = set()
 if 'api_key' not in st.session_state: st.session_state.api_key = ''
 if 'api_secret' not in st.session_state: st.session_state.api_secret = ''
 if 'sender_number' not in st.session_state: st.session_state.sender_number = ''
+if 'perf_sid' not in st.session_state: st.session_state.perf_sid = uuid.uuid4().hex[:8]
+
+# 이번 실행의 단계별 시간 기록 시작 (관리자 패널에서 계측을 켰을 때만, 끝은 파일 맨 아래 end_run)
+profiling.begin_run('시다비서', st.session_state.perf_sid)
 
 with st.sidebar:
     st.header("🔒 로그인")
@@ -144,6 +87,9 @@ with st.sidebar:
     
     st.divider()
     st.info("💡 **문의:** 후니님 (관리자)")
+    if ADMIN_PASSWORD:
+        with st.expander("🛠️ 관리자: 성능 계측"):
+            if st.text_input("관리자 비밀번호", type="password", key='admin_pw') == ADMIN_PASSWORD: profiling.sidebar_panel()
 
 # ==========================================
 # 2. [메인 화면]
@@ -177,103 +123,108 @@ if menu == "📦 자동 채움 발주":
 
     with st.expander("📂 **[파일 열기] 판매 데이터를 넣어주세요**", expanded=True):
         up_sales_list = st.file_uploader("판매 실적 파일 (여러 개 가능)", type=['xlsx', 'csv'], accept_multiple_files=True, key='ord_up')
+        # 판매 이력: 한 번 넣은 파일은 월별로 저장돼 다음부터는 기간만 골라 씀 (겹치는 행은 한 번만)
+        history = get_history()
+        if up_sales_list and st.button("🗄️ 올린 파일을 판매 이력에 저장", key='hist_save'):
+            for f in up_sales_list:
+                r = history.ingest(f)
+                if r['error']: st.warning(f"{r['file']}: {r['error']}")
+                elif r['skipped']: st.caption(f"{r['file']}: 이미 저장된 파일")
+                else: st.caption(f"{r['file']}: 새 행 {r['new']:,} · 중복 {r['duplicate']:,}")
+        h_first, h_last = history.date_range()
+        window = None
+        if h_first and st.checkbox(f"📚 저장된 판매 이력에서 기간 고르기 ({h_first} ~ {h_last})", key='hist_on'):
+            picked = st.date_input("기간", (max(h_first, h_last - datetime.timedelta(days=27)), h_last),
+                                   min_value=h_first, max_value=h_last, key='hist_range')
+            if len(picked) == 2: window = picked
         if os.path.exists(SERVER_CONTACT_FILE):
             st.success(f"📞 서버 연락처 파일 로드됨: {SERVER_CONTACT_FILE}")
         else: st.warning("⚠️ 서버 연락처 파일이 없습니다.")
 
-    df_phone_map = pd.DataFrame()
-    if os.path.exists(SERVER_CONTACT_FILE):
-        try:
-            with open(SERVER_CONTACT_FILE, "rb") as f:
-                df_i, _ = load_data_smart(f, 'info')
-            if df_i is not None:
-                i_name = next((c for c in df_i.columns if '농가명' in c), None)
-                i_phone = next((c for c in df_i.columns if '휴대전화' in c or '전화' in c), None)
-                if i_name and i_phone:
-                    df_i['clean_name'] = df_i[i_name].astype(str).str.replace(' ', '')
-                    df_i['clean_phone'] = df_i[i_phone].apply(clean_phone_number)
-                    df_phone_map = df_i.drop_duplicates(subset=['clean_name'])[['clean_name', 'clean_phone']]
-        except: pass
-
-    df_s = None
-    if up_sales_list:
-        df_list = []
-        for file_obj in up_sales_list:
-            d, _ = load_data_smart(file_obj, 'sales')
-            if d is not None: df_list.append(d)
-        if df_list: df_s = pd.concat(df_list, ignore_index=True)
+    # 화이트리스트 + 연락처 이름 색인 (연락처 파일이 바뀔 때만 다시 만듦, (주)/주식회사·괄호·지점명 차이 흡수)
+    try: resolver = get_supplier_resolver(VALID_SUPPLIERS, SERVER_CONTACT_FILE)
+    except Exception: resolver = get_supplier_resolver(VALID_SUPPLIERS)
 
-    if df_s is not None:
+    if up_sales_list or window:
         st.divider()
-        s_item, s_qty, s_amt, s_farmer = detect_columns(df_s.columns.tolist())
-        
-        if s_item and s_qty and s_amt:
-            if s_farmer:
-                valid_set = {v.replace(' ', '') for v in VALID_SUPPLIERS}
-                df_s['clean_farmer'] = df_s[s_farmer].astype(str).str.replace(' ', '')
-                def classify(name):
-                    if "지족" in name: return "지족(사입)"
-                    elif name in valid_set: return "일반업체"
-                    else: return "제외" if not show_all_data else "일반업체(강제)"
-                df_s['구분'] = df_s['clean_farmer'].apply(classify)
-                df_target = df_s[df_s['구분'] != "제외"].copy()
-                if not df_phone_map.empty:
-                    df_target = pd.merge(df_target, df_phone_map, left_on='clean_farmer', right_on='clean_name', how='left')
-                    df_target.rename(columns={'clean_phone': '전화번호'}, inplace=True)
-                else: df_target['전화번호'] = ''
-            else:
-                df_target = df_s.copy()
-                df_target['구분'] = "일반업체"
-                df_target['전화번호'] = ''
-
-            df_target[s_qty] = df_target[s_qty].apply(to_clean_number)
-            df_target[s_amt] = df_target[s_amt].apply(to_clean_number)
-            
-            groupby_cols = [s_farmer, s_item, '구분']
-            agg_item = df_target.groupby(groupby_cols)[[s_qty, s_amt]].sum().reset_index()
-            
-            if not df_phone_map.empty and s_farmer:
-                agg_item['clean_farmer'] = agg_item[s_farmer].astype(str).str.replace(' ', '')
-                agg_item = pd.merge(agg_item, df_phone_map, left_on='clean_farmer', right_on='clean_name', how='left')
-                agg_item.rename(columns={'clean_phone': '전화번호'}, inplace=True)
-            else: agg_item['전화번호'] = ''
-            
-            agg_item.rename(columns={s_farmer: '업체명', s_item: '상품명', s_qty: '판매량', s_amt: '총판매액'}, inplace=True)
-            agg_item = agg_item[agg_item['판매량'] > 0]
-            
-            agg_item['평균판매가'] = agg_item['총판매액'] / agg_item['판매량']
-            agg_item['추정매입가'] = agg_item['평균판매가'] * purchase_rate
-            agg_item['발주량'] = np.ceil(agg_item['판매량'] * safety)
-            agg_item['예상매입액'] = agg_item['발주량'] * agg_item['추정매입가']
-            
+        # 파일별 부분 집계는 내용 해시로 캐시됨 → 새로 올린 파일만 파싱, 슬라이더 변경은 집계 이후만 재계산
+        # 캐시에 없는 파일은 여러 개면 프로세스 풀에서 동시에 파싱
+        # 판매 이력 기간은 그 기간의 월 파일에서 필요한 컬럼만 읽고, 이력이 바뀔 때까지 집계를 캐시
+        agg_sales, errors = load_sales_window(*window) if window else load_sales(up_sales_list)
+        if window and errors: st.warning(errors[0][1])
+
+        if agg_sales is not None:
+            agg_item = order_table(agg_sales, safety, purchase_rate, show_all_data, resolver)
+            loose = agg_item['매칭'].isin(['정규화', '별칭']) | (agg_item['연락처명'].notna() & (agg_item['연락처명'] != agg_item['clean_farmer']))
+            fuzzy = agg_item[loose].drop_duplicates('업체명')
+            if not fuzzy.empty:
+                with st.expander(f"🔗 이름이 달라도 같은 업체로 본 {len(fuzzy)}곳 (확인용)"):
+                    st.dataframe(fuzzy[['업체명', '매칭업체', '매칭', '연락처명', '전화번호']], hide_index=True)
+            # 이름이 비슷하기만 한 업체는 자동으로 잇지 않는다 (구분·전화번호 그대로) → 맞으면 화이트리스트/연락처에 추가
+            vendors = agg_sales['업체명'].astype(str).drop_duplicates()
+            hints = resolver.resolve(vendors).assign(업체명=vendors.to_numpy())
+            hints = hints[hints['유사후보'].notna()]
+            if not hints.empty:
+                with st.expander(f"🤔 이름이 비슷한 업체 {len(hints)}곳 (자동으로 잇지 않음, 확인용)"):
+                    st.dataframe(hints[['업체명', '유사후보', '화이트리스트', '연락처명']], hide_index=True)
+
+            with st.expander("📅 **수요예측으로 발주량 계산** (판매일시가 있는 파일)"):
+                use_fc = st.checkbox("예측 발주량 사용 (안전 계수 대신 요일·추세 반영)", key='fc_on')
+                f1, f2, f3 = st.columns(3)
+                fc_days = f1.slider("발주 기간 (일)", 1, 14, 7)
+                fc_method = f2.selectbox("예측 방법", list(METHODS), index=1, format_func=METHODS.get)
+                fc_level = f3.select_slider("품절 방지 수준", [0.8, 0.9, 0.95, 0.98], value=0.95)
+                if use_fc:
+                    agg_item, matrix = forecast_orders(agg_item, up_sales_list, fc_days, fc_method, fc_level, window=window)
+                    if matrix is None: st.warning("판매일시 컬럼을 찾지 못해 안전 계수 방식으로 계산합니다.")
+                    else:
+                        st.caption(f"{len(matrix.days)}일치 판매 기준 · 지난 구간으로 맞춰 본 결과 (현재방식 = 직전 {fc_days}일 × 안전 계수)")
+                        st.dataframe(backtest(matrix, fc_days, safety=safety, service_level=fc_level), hide_index=True)
+
+            with st.expander("💰 **예산에 맞춰 발주량 자동 조정**"):
+                use_alloc = st.checkbox("총 발주액이 예산을 넘으면 팔릴 가능성이 낮은 수량부터 줄이기", key='alloc_on')
+                min_order = st.number_input("업체별 최소 주문금액 (원, 0 = 없음)", value=0, step=10000, key='alloc_min')
+                # 최소 주문금액은 예산 안이어도(조정을 끄더라도) 확인해서 못 채운 업체를 뺌
+                if (use_alloc and agg_item['예상매입액'].sum() > budget) or min_order:
+                    # 품목·단위별 후보 배열은 한 번 만들고, 예산 변경은 누적합 검색만으로 다시 풂
+                    cols = [c for c in ['업체명', '발주량', '추정매입가', '평균판매가', '판매량', '예측수요'] if c in agg_item.columns]
+                    limit = budget if use_alloc else float('inf')
+                    agg_item = allocate(agg_item, limit, supplier_min=min_order or None, problem=_allocation_problem(agg_item[cols]))
+                    cut = agg_item[agg_item['발주량'] < agg_item['권장발주량']]
+                    st.caption(f"{len(cut)}개 품목을 줄였습니다. (권장 {agg_item['권장발주량'].sum():,.0f}개 → {agg_item['발주량'].sum():,.0f}개)")
+                    if not cut.empty: st.dataframe(cut[['업체명', '상품명', '권장발주량', '발주량', '추정매입가']], hide_index=True)
+                    agg_item = agg_item[agg_item['발주량'] > 0].reset_index(drop=True)
+
             tab1, tab2 = st.tabs(["🏢 외부업체 건별 발주", "🏪 지족 사입 건별 발주"])
             
+            # 업체별 문자/건수/연락처/소계는 groupby 한 번으로 미리 만들어 두고, 화면에는 현재 페이지 업체만 그림
+            vidx = vendor_index(agg_item)
+
             def render_order_tab(target_groups, tab_key):
-                df_tab = agg_item[agg_item['구분'].isin(target_groups)].copy()
-                if df_tab.empty:
+                v_tab = vidx[vidx['구분'].isin(target_groups)]
+                if v_tab.empty:
                     st.info("데이터 없음")
                     return
                 
-                total_tab = (df_tab['발주량'] * df_tab['추정매입가']).sum()
+                total_tab = v_tab['소계'].sum()
                 st.markdown(f"""<div style="padding:10px; background-color:#f0f2f6; border-radius:5px; margin-bottom:10px;">
-                    <b>📊 그룹 합계:</b> {total_tab:,.0f}원 / <b>품목 수:</b> {len(df_tab)}개</div>""", unsafe_allow_html=True)
+                    <b>📊 그룹 합계:</b> {total_tab:,.0f}원 / <b>품목 수:</b> {v_tab['품목수'].sum()}개</div>""", unsafe_allow_html=True)
 
-                search = st.text_input(f"🔍 업체명 검색", key=f"s_{tab_key}", placeholder="업체명 입력...")
-                all_v = sorted(df_tab['업체명'].unique())
-                targets = [v for v in all_v if search in v] if search else all_v
+                c_s, c_p = st.columns([3, 1])
+                search = c_s.text_input(f"🔍 업체명 검색", key=f"s_{tab_key}", placeholder="업체명 입력...")
+                matched = v_tab[v_tab.index.astype(str).str.contains(search, regex=False)] if search else v_tab
+                n_pages = max(1, -(-len(matched) // VENDOR_PAGE_SIZE))
+                page = c_p.number_input(f"페이지 (총 {n_pages})", min_value=1, max_value=n_pages, value=1, step=1, key=f"pg_{tab_key}") if n_pages > 1 else 1
+                page_v = matched.iloc[(page - 1) * VENDOR_PAGE_SIZE: page * VENDOR_PAGE_SIZE]
+                if n_pages > 1: st.caption(f"{len(matched)}개 업체 중 {(page - 1) * VENDOR_PAGE_SIZE + 1}~{(page - 1) * VENDOR_PAGE_SIZE + len(page_v)}번째")
+                sent_vendors = get_outbox().sent_targets('order')  # 오늘 발송 완료 (모든 세션 공유)
 
-                for vendor in targets:
-                    is_sent = vendor in st.session_state.sent_history
-                    v_data = df_tab[df_tab['업체명'] == vendor]
-                    phone = str(v_data['전화번호'].iloc[0]) if not pd.isna(v_data['전화번호'].iloc[0]) else ''
-                    
-                    msg_lines = [f"[{vendor} 발주]"]
-                    for _, r in v_data.iterrows(): msg_lines.append(f"- {r['상품명']}: {int(r['발주량'])}")
-                    msg_lines.append("잘 부탁드립니다!")
-                    default_msg = "\n".join(msg_lines)
+                for vendor, row in zip(page_v.index, page_v.itertuples(index=False)):
+                    is_sent = vendor in sent_vendors
+                    phone, default_msg = row.전화번호, row.메시지
                     
                     icon = "✅" if is_sent else "📩"
-                    with st.expander(f"{icon} {vendor} ({len(v_data)}건)", expanded=not is_sent):
+                    with st.expander(f"{icon} {vendor} ({row.품목수}건)", expanded=not is_sent):
                         c1, c2 = st.columns([1, 2])
                         with c1:
                             in_phone = st.text_input("전화번호", value=phone, key=f"p_{tab_key}_{vendor}")
@@ -282,17 +233,22 @@ if menu == "📦 자동 채움 발주":
                                     if not st.session_state.api_key or not st.session_state.sender_number: st.error("👈 왼쪽 사이드바에 API 키를 입력하세요!")
                                     else:
                                         final_msg = st.session_state.get(f"m_{tab_key}_{vendor}", default_msg)
-                                        ok, res = send_coolsms_direct(st.session_state.api_key, st.session_state.api_secret, st.session_state.sender_number, clean_phone_number(in_phone), final_msg)
-                                        if ok:
-                                            st.session_state.sent_history.add(vendor)
-                                            st.rerun()
-                                        else: st.error(f"실패: {res.get('errorMessage')}")
+                                        receiver = clean_phone_number(in_phone)
+                                        outbox = get_outbox()
+                                        key = outbox.enqueue_one('order', vendor, receiver, final_msg)
+                                        if not outbox.claim([key]): st.warning("이미 발송되었거나 다른 분이 보내는 중입니다.")
+                                        else:
+                                            ok, res = send_coolsms_direct(st.session_state.api_key, st.session_state.api_secret, st.session_state.sender_number, receiver, final_msg)
+                                            outbox.mark(key, ok, message_id=res.get('messageId'), error=None if ok else res.get('errorMessage'), receiver=receiver, unknown=res.get('unknown', False))
+                                            if ok: st.rerun()
+                                            elif res.get('unknown'): st.warning(f"응답을 받지 못했습니다. 문자가 나갔을 수 있어 자동으로 다시 보내지 않습니다. 문자 서비스에서 확인해 주세요. ({res.get('errorMessage')})")
+                                            else: st.error(f"실패: {res.get('errorMessage')}")
                             else: st.success("발송 완료")
                         with c2:
                             st.text_area("내용", value=default_msg, height=150, key=f"m_{tab_key}_{vendor}")
 
-            with tab1: render_order_tab(["일반업체", "일반업체(강제)"], "ext")
-            with tab2: render_order_tab(["지족(사입)"], "int")
+            with tab1, profiling.stage('render.order_ext'): render_order_tab(ORDER_GROUPS['ext'], "ext")
+            with tab2, profiling.stage('render.order_int'): render_order_tab(ORDER_GROUPS['int'], "int")
             
             st.divider()
             total_all = (agg_item['발주량'] * agg_item['추정매입가']).sum()
@@ -317,21 +273,20 @@ elif menu == "📢 마케팅 & 문자":
     df_ms, _ = load_data_smart(up_mkt_sales, 'sales')
     
     # 회원명부 자동 로드
-    df_mm = None
+    # 명부 버전마다 한 번 만든 검색 인덱스를 모든 세션이 같이 씀
+    df_mm, mm_index = None, None
     if os.path.exists(SERVER_MEMBER_FILE):
-        try:
-            with open(SERVER_MEMBER_FILE, "rb") as f:
-                df_mm, _ = load_data_smart(f, 'member')
+        try: df_mm, mm_index, _ = load_member_index(SERVER_MEMBER_FILE)
         except: pass
 
     st.divider()
     
-    tab_m1, tab_m2 = st.tabs(["🎯 판매 기반 타겟팅", "🔍 회원 직접 검색"])
+    tab_m1, tab_m2, tab_m3 = st.tabs(["🎯 판매 기반 타겟팅", "🔍 회원 직접 검색", "🏷️ RFM 세그먼트"])
     
     final_df = pd.DataFrame()
     sender_name = ""
 
-    with tab_m1:
+    with tab_m1, profiling.stage('render.targeting'):
         if df_ms is None: st.info("판매내역 파일을 올려주세요.")
         else:
             ms_farmer = next((c for c in df_ms.columns if any(x in c for x in ['농가', '공급자'])), None)
@@ -339,51 +294,63 @@ elif menu == "📢 마케팅 & 문자":
             ms_buyer = next((c for c in df_ms.columns if any(x in c for x in ['회원', '구매자'])), None)
             
             if ms_farmer and ms_buyer:
-                farmers = sorted(df_ms[ms_farmer].astype(str).unique())
-                sel_farmer = st.selectbox("농가 선택", farmers)
-                
-                target_df = df_ms[df_ms[ms_farmer] == sel_farmer].copy()
-                
-                if ms_item:
-                    items = ["전체"] + sorted(target_df[ms_item].astype(str).unique())
-                    sel_item = st.selectbox("상품 선택", items)
-                    if sel_item != "전체": target_df = target_df[target_df[ms_item] == sel_item]
-                
-                loyal = target_df.groupby(ms_buyer).size().reset_index(name='구매횟수').sort_values('구매횟수', ascending=False)
-                
-                if df_mm is not None:
-                    mm_name = next((c for c in df_mm.columns if any(x in c for x in ['이름', '회원명'])), None)
-                    mm_phone = next((c for c in df_mm.columns if any(x in c for x in ['휴대전화', '전화'])), None)
-                    if mm_name and mm_phone:
-                        loyal['key'] = loyal[ms_buyer].astype(str).str.replace(' ', '')
-                        df_mm['key'] = df_mm[mm_name].astype(str).str.replace(' ', '')
-                        merged = pd.merge(loyal, df_mm.drop_duplicates(subset=['key']), on='key', how='left')
-                        final_df = merged[[ms_buyer, mm_phone, '구매횟수']].copy()
-                        final_df.columns = ['이름', '전화번호', '구매횟수']
-                    else: final_df = loyal
-                else: final_df = loyal
-                sender_name = sel_farmer
+                # 업로드 파일마다 한 번 만든 구매 큐브에서 선택 농가/상품 구간만 잘라 씀
+                cube = load_purchase_cube(up_mkt_sales, df_ms, ms_farmer, ms_item, ms_buyer, detect_columns(df_ms.columns.tolist())[2])
+                c_f, c_i, c_n = st.columns([2, 2, 1])
+                sel_farmers = c_f.multiselect("농가 선택 (여러 곳 가능)", cube.farmers.tolist(), default=cube.farmers[:1].tolist())
+                sel_items = c_i.multiselect("상품 선택 (비우면 전체)", cube.items_for(sel_farmers)) if ms_item else []
+                min_cnt = c_n.number_input("최소 구매횟수", min_value=1, value=1, step=1)
+
+                mm_name = next((c for c in df_mm.columns if any(x in c for x in ['이름', '회원명'])), None) if df_mm is not None else None
+                mm_phone = next((c for c in df_mm.columns if any(x in c for x in ['휴대전화', '전화'])), None) if df_mm is not None else None
+                if mm_name and mm_phone: cube.attach_phones(df_mm, mm_name, mm_phone, version=source_signature(SERVER_MEMBER_FILE))
+                loyal = cube.buyers_for(sel_farmers, sel_items or None, min_count=min_cnt)
+                if mm_name and mm_phone:
+                    final_df = loyal[['회원', '전화번호', '구매횟수']].rename(columns={'회원': '이름'})
+                else: final_df = loyal[['회원', '구매횟수']].rename(columns={'회원': ms_buyer})
+                sender_name = ", ".join(sel_farmers)
                 st.success(f"총 {len(final_df)}명의 구매자를 찾았습니다.")
 
-    with tab_m2:
+    with tab_m2, profiling.stage('render.member_search'):
         if df_mm is None: st.info("서버에 회원명부 파일이 없거나 로드되지 않았습니다.")
         else:
             mm_name = next((c for c in df_mm.columns if any(x in c for x in ['이름', '회원명'])), None)
             mm_phone = next((c for c in df_mm.columns if any(x in c for x in ['휴대전화', '전화'])), None)
             search_k = st.text_input("이름 또는 전화번호 검색")
             if search_k and mm_name and mm_phone:
-                df_mm['c_name'] = df_mm[mm_name].astype(str).str.replace(' ', '')
-                df_mm['c_phone'] = df_mm[mm_phone].apply(clean_phone_number)
-                k = search_k.replace(' ', '')
-                res = df_mm[df_mm['c_name'].str.contains(k) | df_mm['c_phone'].str.contains(k)].copy()
-                if not res.empty:
-                    final_df = res[[mm_name, mm_phone]].copy()
+                rows, total = mm_index.search(search_k, limit=SEARCH_LIMIT)
+                if total:
+                    final_df = df_mm.iloc[rows][[mm_name, mm_phone]].copy()
                     final_df['비고'] = '검색'
                     final_df.columns = ['이름', '전화번호', '비고']
                     sender_name = "품앗이마을"
-                    st.success(f"{len(final_df)}명 검색됨")
+                    if total > len(final_df): st.success(f"{total}명 검색됨 (상위 {len(final_df)}명만 표시, 더 자세히 입력하세요)")
+                    else: st.success(f"{total}명 검색됨")
                 else: st.warning("결과 없음")
 
+    with tab_m3, profiling.stage('render.rfm'):
+        if df_ms is None: st.info("판매내역 파일을 올려주세요.")
+        else:
+            ms_buyer = next((c for c in df_ms.columns if any(x in c for x in ['회원', '구매자'])), None)
+            ms_time = next((c for c in df_ms.columns if any(x in c for x in ['판매일시', '일시', '일자'])), None)
+            ms_amt = detect_columns(df_ms.columns.tolist())[2]
+            if ms_buyer and ms_time:
+                rfm = score_rfm(build_state(df_ms, ms_buyer, ms_time, ms_amt))
+                st.dataframe(segment_summary(rfm), hide_index=True)
+                sel_seg = st.multiselect("문자 보낼 세그먼트", [s for s in SEGMENTS if s in set(rfm['세그먼트'])])
+                if sel_seg:
+                    seg = segment_members(rfm, sel_seg)
+                    mm_phone = next((c for c in df_mm.columns if any(x in c for x in ['휴대전화', '전화'])), None) if df_mm is not None else None
+                    if mm_phone and 'clean_name' in df_mm.columns:
+                        seg['key'] = seg['회원'].astype(str).str.replace(' ', '')
+                        merged = pd.merge(seg, df_mm.drop_duplicates(subset=['clean_name']), left_on='key', right_on='clean_name', how='left')
+                        final_df = merged[['회원', mm_phone, '세그먼트']].copy()
+                        final_df.columns = ['이름', '전화번호', '세그먼트']
+                    else: final_df = seg[['회원', '세그먼트']].rename(columns={'회원': '이름'})
+                    sender_name = "품앗이마을"
+                    st.success(f"{len(final_df)}명 선택됨")
+            else: st.warning("판매내역에 회원 / 판매일시 컬럼이 필요합니다.")
+
     if not final_df.empty:
         st.markdown("---")
         st.markdown("### 💌 문자 보내기")
@@ -393,7 +360,7 @@ elif menu == "📢 마케팅 & 문자":
         with c_msg2:
             st.write("수신자 리스트")
             if '전화번호' in final_df.columns:
-                final_df['전화번호'] = final_df['전화번호'].apply(clean_phone_number)
+                final_df['전화번호'] = clean_phones(final_df['전화번호'])
                 final_df = final_df[final_df['전화번호'].str.len() >= 10]
             final_df.insert(0, "선택", True)
             edited_mkt = st.data_editor(final_df, hide_index=True, height=150)
@@ -403,10 +370,14 @@ elif menu == "📢 마케팅 & 문자":
                 if not st.session_state.api_key or not st.session_state.sender_number:
                     st.error("👈 왼쪽 사이드바에 API 키를 입력하세요!")
                 else:
-                    bar = st.progress(0)
-                    suc = 0
-                    for i, r in enumerate(targets.itertuples()):
-                        ok, _ = send_coolsms_direct(st.session_state.api_key, st.session_state.api_secret, st.session_state.sender_number, r.전화번호, msg_txt)
-                        if ok: suc += 1
-                        bar.progress((i+1)/len(targets))
-                    st.success(f"{suc}건 발송 완료!")
+                    # 발송함에 먼저 기록 → 끊겨도 다시 누르면 안 보낸 사람에게만 이어서 발송
+                    # 발송은 백그라운드 작업: 화면을 만져도 끊기지 않고, 보내는 중에 다시 눌러도 두 번 띄우지 않음
+                    phones = targets['전화번호'].tolist()
+                    keys = get_outbox().enqueue([(p, p, msg_txt) for p in phones], 'marketing', campaign=f"{sender_name}:{content_hash(msg_txt)}")
+                    dispatcher = SmsDispatcher(st.session_state.api_key, st.session_state.api_secret, st.session_state.sender_number)
+                    get_runner().submit(st.session_state.perf_sid, 'sms', send_job, dispatcher, keys, name=f"문자 발송 {len(keys)}건")
+
+    sms_job = get_runner().latest(st.session_state.perf_sid, 'sms')
+    if sms_job: watch(sms_job, render_send)
+
+profiling.end_run()
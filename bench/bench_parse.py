@@ -0,0 +1,36 @@
+"""판매 파일 병렬 파싱 벤치마크.
+
+    python -m bench.bench_parse [판매파일.xlsx] [--counts 1,2,4,8] [--workers 4]
+
+같은 파일을 N개 복사해 캐시 없이 직렬/병렬로 부분 집계까지 돌리고 시간과 배속을 출력한다.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from poomasi.parallel import MAX_WORKERS, _get_pool, parse_many  # noqa: E402
+
+def run(path, counts, workers):
+    with open(path, 'rb') as f: data = f.read()
+    # 풀 기동(spawn + import) 비용은 한 번뿐이라 미리 띄워 두고 잰다
+    _get_pool(workers).submit(int, 0).result()
+    print(f"{'files':>5} {'serial(s)':>10} {'parallel(s)':>12} {'speedup':>8}")
+    rows = []
+    for n in counts:
+        datas = [data] * n
+        t = time.perf_counter(); parse_many(datas, parallel=False); serial = time.perf_counter() - t
+        t = time.perf_counter(); parse_many(datas, max_workers=workers); par = time.perf_counter() - t
+        rows.append({'files': n, 'serial': serial, 'parallel': par, 'speedup': serial / par})
+        print(f"{n:>5} {serial:>10.2f} {par:>12.2f} {serial / par:>7.2f}x")
+    return rows
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('path', nargs='?', default='sales_raw.xlsx')
+    ap.add_argument('--counts', default='1,2,4,8')
+    ap.add_argument('--workers', type=int, default=MAX_WORKERS)
+    args = ap.parse_args()
+    run(args.path, [int(c) for c in args.counts.split(',')], args.workers)
@@ -0,0 +1,167 @@
+"""발주 / 마케팅 파이프라인 단계별 벤치마크 (가짜 데이터).
+
+    python -m bench.bench_pipeline [--sizes 10k,100k,1m] [--format xlsx] [--out bench/results/xxx.json] [--apply]
+
+bench/synth.py 로 판매·회원·업체 파일을 만들고(.cache/bench 에 재사용) 단계마다
+시간(perf_counter, --repeat 회 중 최소)과 최대 메모리(tracemalloc peak)를 잰다.
+결과는 JSON 으로 저장하므로 버전 사이에 비교할 수 있다 (--compare 이전결과.json).
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from bench.synth import generate, size_arg  # noqa: E402
+from poomasi.basket import build_basket_model  # noqa: E402
+from poomasi.cleaning import clean_numbers, clean_phones  # noqa: E402
+from poomasi.common import clean_phone_number, detect_columns, load_data_smart, to_clean_number  # noqa: E402
+from poomasi.config import VALID_SUPPLIERS  # noqa: E402
+from poomasi.export import write_order_workbook  # noqa: E402
+from poomasi.ref_cache import normalize_reference  # noqa: E402
+from poomasi.sales_agg import apply_order_params, classify_and_join, partial_aggregate, vendor_index  # noqa: E402
+from poomasi.suppliers import SupplierResolver  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+def _buffer(path):
+    with open(path, 'rb') as f: buf = io.BytesIO(f.read())
+    buf.name = os.path.basename(path)
+    return buf
+
+# ---------- 단계 (ctx 를 받아 (결과 dict, 처리 행 수) 반환) ----------
+def st_load(ctx):
+    df, _ = load_data_smart(ctx['sales_buf'], 'sales')
+    mm, _ = load_data_smart(ctx['member_buf'], 'member')
+    info, _ = load_data_smart(ctx['info_buf'], 'info')
+    return {'df': df, 'mm_raw': mm, 'info_raw': info}, len(df) + len(mm) + len(info)
+
+def st_detect(ctx):
+    cols = ctx['df'].columns.tolist()
+    out = None
+    for _ in range(1000): out = detect_columns(cols)
+    return {'cols': out}, 1000
+
+def st_clean(ctx):
+    df = ctx['df']
+    s_item, s_qty, s_amt, _ = ctx['cols']
+    qty, amt = clean_numbers(df[s_qty]), clean_numbers(df[s_amt])
+    phones = clean_phones(ctx['mm_raw']['휴대전화번호'])
+    return {'qty': qty, 'amt': amt, 'phones': phones}, len(df) * 2 + len(phones)
+
+def st_clean_apply(ctx):
+    # 예전 행 단위 apply 방식 (--apply 일 때만, 벡터 정제와 비교용)
+    df = ctx['df']
+    _, s_qty, s_amt, _ = ctx['cols']
+    df[s_qty].apply(to_clean_number); df[s_amt].apply(to_clean_number)
+    ctx['mm_raw']['휴대전화번호'].apply(clean_phone_number)
+    return {}, len(df) * 2 + len(ctx['mm_raw'])
+
+def st_reference(ctx):
+    info = normalize_reference(ctx['info_raw'], 'info')
+    mm = normalize_reference(ctx['mm_raw'], 'member')
+    book = info[info['clean_phone'].fillna('') != ''].drop_duplicates(subset=['clean_name'])
+    resolver = SupplierResolver(VALID_SUPPLIERS, book['clean_name'].tolist(), book['clean_phone'].tolist())
+    return {'resolver': resolver, 'df_mm': mm}, len(info) + len(mm)
+
+def st_aggregate(ctx):
+    agg = partial_aggregate(ctx['df'])
+    agg_item = apply_order_params(classify_and_join(agg, ctx['resolver'], show_all=True), 1.1, 0.7)
+    vidx = vendor_index(agg_item)
+    return {'agg_item': agg_item, 'vidx': vidx}, len(ctx['df'])
+
+def st_basket(ctx):
+    model = build_basket_model(ctx['df'], '회원', '판매일시', '품목명')
+    rules = model.rules(min_count=2, k=3)
+    return {'model': model, 'rules': rules}, len(ctx['df'])
+
+def st_export(ctx):
+    cols = ['구분', '업체명', '상품명', '판매량', '발주량', '추정매입가', '예상매입액', '전화번호']
+    out = write_order_workbook(ctx['agg_item'][cols], '업체명', '발주량', summary_sheet='전체발주')
+    return {'xlsx_bytes': len(out.getvalue())}, len(ctx['agg_item'])
+
+STAGES = [('load', st_load), ('detect_columns', st_detect), ('clean', st_clean), ('clean_apply', st_clean_apply),
+          ('reference', st_reference), ('aggregate', st_aggregate), ('basket', st_basket), ('export', st_export)]
+
+def measure(fn, ctx, repeat=1, memory=True):
+    """(결과, 행 수, 최소 시간, peak MB). 메모리는 시간을 잰 뒤 tracemalloc 을 켜고 한 번 더 돌려서 잰다."""
+    best = float('inf')
+    for _ in range(max(repeat, 1)):
+        t = time.perf_counter()
+        out, rows = fn(ctx)
+        best = min(best, time.perf_counter() - t)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn(ctx)
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+        finally: tracemalloc.stop()
+    return out, rows, best, peak
+
+def run(sizes, fmt='xlsx', data_dir=os.path.join('.cache', 'bench'), seed=0, repeat=1, memory=True, apply=False):
+    rows = []
+    print(f"{'size':>9} {'stage':<15} {'rows':>10} {'time(s)':>9} {'peak(MB)':>9} {'rows/s':>11}")
+    for n in sizes:
+        t = time.perf_counter()
+        paths = generate(n, data_dir, seed, fmt)
+        print(f"{n:>9} {'(generate)':<15} {'':>10} {time.perf_counter() - t:>9.2f}")
+        ctx = {f"{k}_buf": _buffer(p) for k, p in paths.items()}
+        for name, fn in STAGES:
+            if name == 'clean_apply' and not apply: continue
+            out, n_rows, sec, peak = measure(fn, ctx, repeat, memory)
+            ctx.update(out)
+            rows.append({'size': n, 'stage': name, 'rows': int(n_rows), 'seconds': sec, 'peak_mb': peak})
+            print(f"{n:>9} {name:<15} {n_rows:>10} {sec:>9.3f} {'' if peak is None else f'{peak:.1f}':>9} "
+                  f"{n_rows / sec if sec > 0 else 0:>11,.0f}")
+    return rows
+
+def environment():
+    try: rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(RESULTS_DIR)).stdout.strip()
+    except OSError: rev = ''
+    return {'git': rev, 'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+            'platform': platform.platform(), 'cpus': os.cpu_count(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+def compare(old_path, rows):
+    """이전 결과 대비 시간 / 메모리 배율 (같은 size, stage 끼리)."""
+    with open(old_path, encoding='utf-8') as f: old = {(r['size'], r['stage']): r for r in json.load(f)['results']}
+    print(f"\n{'size':>9} {'stage':<15} {'time x':>8} {'peak x':>8}  (이전 / 지금)")
+    for r in rows:
+        o = old.get((r['size'], r['stage']))
+        if not o: continue
+        tx = o['seconds'] / r['seconds'] if r['seconds'] else float('nan')
+        px = o['peak_mb'] / r['peak_mb'] if o.get('peak_mb') and r.get('peak_mb') else float('nan')
+        print(f"{r['size']:>9} {r['stage']:<15} {tx:>7.2f}x {px:>7.2f}x")
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', default='10k,100k')
+    ap.add_argument('--format', choices=['xlsx', 'csv'], default='xlsx')
+    ap.add_argument('--data-dir', default=os.path.join('.cache', 'bench'))
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--repeat', type=int, default=1)
+    ap.add_argument('--no-memory', action='store_true', help="tracemalloc 측정 생략 (큰 파일 로드가 느려짐)")
+    ap.add_argument('--apply', action='store_true', help="예전 행 단위 apply 정제도 같이 잰다")
+    ap.add_argument('--out', help="결과 JSON 경로 (기본: bench/results/<시각>-<커밋>.json)")
+    ap.add_argument('--compare', help="비교할 이전 결과 JSON")
+    args = ap.parse_args()
+
+    sizes = [size_arg(s) for s in args.sizes.split(',')]
+    results = run(sizes, args.format, args.data_dir, args.seed, args.repeat, not args.no_memory, args.apply)
+    env = environment()
+    out = args.out or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{env['git'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump({'env': env, 'args': vars(args), 'results': results}, f, ensure_ascii=False, indent=1)
+    print(f"\n저장: {out}")
+    if args.compare: compare(args.compare, results)
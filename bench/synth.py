@@ -0,0 +1,208 @@
+"""벤치마크용 가짜 데이터 생성기.
+
+실제 파일(행복ICT 판매내역, 회원관리, 농가관리 목록)과 같은 헤더·모양으로 만든다.
+- 제목 행 + 조회조건 행이 섞여 있어 헤더 위치가 파일마다 다름
+- 금액은 숫자 / "12,000" / "12000원" / "-" 가 섞이고, 전화번호는 하이픈·공백·앞자리 0 빠짐이 섞임
+- 업체명은 화이트리스트 이름과 (주)/주식회사/지점명 변형이 섞임
+
+    python bench/synth.py 10k --out .cache/bench
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from poomasi.config import VALID_SUPPLIERS  # noqa: E402
+
+SALES_COLUMNS = ['번호', '판매지점', '판매일시', 'POS번호', '농가명', '농가번호', '품목명', '단위', '기본단가', '판매단가',
+                 '수량', '물품가액', '부가세', '할인금액', '결제금액', '인증구분', '회원', '회원번호']
+MEMBER_COLUMNS = ['회원번호', '이름', '휴대전화번호', '주소', '가입일', '매장\n가입상태', '최근구매일', '출자금', '메모']
+SUPPLIER_COLUMNS = ['번호', '출하상태', '농가명', '농가번호', '생산방식', '사업자구분', '대표자명', '생년월일', '사업자번호', '휴대전화번호']
+
+SURNAMES = list("김이박최정강조윤장임한오서신권황안송류전홍고문양손배백허유남심노하곽성차주우구민진지엄채원천방공현함변염여추도소석선설마길연위표명기반왕금옥육인맹제모남궁")
+GIVEN = list("민서지현수영준우진하은윤재성예도연아유채원시호경희정미혜선주나라다인소담율온")
+ITEM_WORDS = ['유기농', '무농약', '친환경', '국산', '우리밀', '토종', '햇', '생', '냉동', '수제']
+ITEM_NOUNS = ['두부', '콩나물', '달걀', '사과', '배', '딸기', '오이', '대파', '양파', '감자', '고구마', '우유', '요거트', '막걸리',
+              '식빵', '쿠키', '김치', '된장', '고추장', '간장', '참기름', '들기름', '쌀', '현미', '잡곡', '버섯', '시금치', '상추']
+UNITS = ['1개', '500g', '1kg', '30구', '1봉', '1팩', '200ml', '1L', '4개']
+BRANCHES = ['대전점', '유성점', '본점', '지점']
+
+def size_arg(s):
+    s = s.strip().lower()
+    mult = {'k': 1_000, 'm': 1_000_000}.get(s[-1], 1)
+    return int(float(s[:-1] if s[-1] in 'km' else s) * mult)
+
+def _names(rng, n):
+    return (np.array(SURNAMES)[rng.integers(0, len(SURNAMES), n)].astype(object) +
+            np.array(GIVEN)[rng.integers(0, len(GIVEN), n)].astype(object) +
+            np.array(GIVEN)[rng.integers(0, len(GIVEN), n)].astype(object))
+
+def _messy_phones(rng, n):
+    mid, last = rng.integers(1000, 10000, n), rng.integers(1000, 10000, n)
+    base = np.char.add(np.char.add(mid.astype(str), '-'), last.astype(str)).astype(object)
+    style = rng.integers(0, 10, n)
+    out = np.where(style < 6, '010-' + base, None)
+    out = np.where(style == 6, '010' + np.char.replace(base.astype(str), '-', '').astype(object), out)
+    out = np.where(style == 7, '10-' + base, out)                     # 앞자리 0 빠짐
+    out = np.where(style == 8, '010 ' + np.char.replace(base.astype(str), '-', ' ').astype(object), out)
+    out = np.where(style == 9, rng.choice(np.array(['', '-', None], dtype=object), n), out)
+    return out
+
+def _messy_amounts(rng, values):
+    """숫자 그대로 / "12,000" / "12000원" / "-" 가 섞인 object 배열."""
+    values = np.asarray(values)
+    style = rng.integers(0, 20, len(values))
+    out = values.astype(object)
+    comma = style == 0
+    out[comma] = [f"{v:,.0f}" for v in values[comma]]
+    won = style == 1
+    out[won] = [f"{v:.0f}원" for v in values[won]]
+    out[style == 2] = '-'
+    return out
+
+def supplier_names(n, seed=0):
+    """화이트리스트 + 그 변형 + 일반 농가 이름 n 개."""
+    rng = np.random.default_rng(seed)
+    base = list(VALID_SUPPLIERS)
+    variants = []
+    for name in base:
+        bare = name.replace('(주)', '')
+        variants += [f"주식회사 {bare}", f"{bare} {BRANCHES[len(variants) % len(BRANCHES)]}"]
+    farms = [f"{x}농장" for x in _names(rng, max(n - len(base) - len(variants), 0))]
+    return (base + variants + farms)[:max(n, 1)]
+
+def sales_frame(n, seed=0, n_days=60, n_suppliers=300, n_members=None):
+    """판매내역 n 행. 인기 품목·업체는 Zipf 분포, 같은 회원·시각 묶음이 장바구니."""
+    rng = np.random.default_rng(seed)
+    suppliers = np.array(supplier_names(n_suppliers, seed), dtype=object)
+    n_items = int(min(max(n // 20, 200), 8000))
+    items = np.array([f"{ITEM_WORDS[i % len(ITEM_WORDS)]}{ITEM_NOUNS[(i // len(ITEM_WORDS)) % len(ITEM_NOUNS)]}({i})"
+                      for i in range(n_items)], dtype=object)
+    item_supplier = rng.zipf(1.6, n_items) % len(suppliers)
+    price = (rng.integers(5, 300, n_items) * 100).astype(float)
+
+    # 장바구니 단위로 시각·회원을 정하고 품목을 채움
+    n_baskets = max(n // 3, 1)
+    basket_size = np.minimum(rng.geometric(0.35, n_baskets), 12)
+    basket = np.repeat(np.arange(n_baskets), basket_size)[:n]
+    if len(basket) < n: basket = np.r_[basket, rng.integers(0, n_baskets, n - len(basket))]
+    start = pd.Timestamp('2026-01-01 09:00').value
+    when = start + np.sort(rng.integers(0, n_days * 86_400, n_baskets)) * 10**9
+    n_members = n_members or max(n // 10, 100)
+    members = _names(rng, n_members)
+    who = rng.integers(0, n_members, n_baskets).astype(object)
+    who[rng.random(n_baskets) < 0.15] = None  # 비회원
+
+    item = (rng.zipf(1.3, n) - 1) % n_items
+    qty = np.where(rng.random(n) < 0.9, 1, rng.integers(2, 6, n)).astype(float)
+    pay = qty * price[item]
+    member_idx = who[basket]
+    df = pd.DataFrame({
+        '번호': np.arange(n, 0, -1).astype(str),
+        '판매지점': '지족점',
+        '판매일시': pd.to_datetime(when[basket]).strftime('%Y-%m-%d %H:%M:%S'),
+        'POS번호': '001',
+        '농가명': suppliers[item_supplier[item]],
+        '농가번호': (item_supplier[item] + 1).astype(str),
+        '품목명': items[item],
+        '단위': np.array(UNITS, dtype=object)[item % len(UNITS)],
+        '기본단가': price[item],
+        '판매단가': price[item],
+        '수량': qty,
+        '물품가액': _messy_amounts(rng, np.round(pay / 1.1)),
+        '부가세': np.round(pay - pay / 1.1),
+        '할인금액': 0.0,
+        '결제금액': _messy_amounts(rng, pay),
+        '인증구분': rng.choice(np.array(['', '무농약', '유기농', '미인증'], dtype=object), n),
+        '회원': [members[i] if i is not None else None for i in member_idx],
+        '회원번호': [str(i + 1) if i is not None else None for i in member_idx],
+    })
+    return df[SALES_COLUMNS]
+
+def member_frame(n, seed=0):
+    rng = np.random.default_rng(seed + 1)
+    return pd.DataFrame({
+        '회원번호': np.arange(n, 0, -1).astype(str),
+        '이름': _names(rng, n),
+        '휴대전화번호': _messy_phones(rng, n),
+        '주소': '대전광역시 유성구 지족로 ' + pd.Series(rng.integers(1, 400, n)).astype(str),
+        '가입일': pd.to_datetime(pd.Timestamp('2015-01-01').value + rng.integers(0, 11 * 365, n) * 86_400 * 10**9).strftime('%Y-%m-%d'),
+        '매장\n가입상태': '가입',
+        '최근구매일': '',
+        '출자금': 30000,
+        '메모': '',
+    })[MEMBER_COLUMNS]
+
+def supplier_frame(n, seed=0):
+    rng = np.random.default_rng(seed + 2)
+    names = supplier_names(n, seed)
+    return pd.DataFrame({
+        '번호': np.arange(len(names), 0, -1).astype(str), '출하상태': '가능', '농가명': names,
+        '농가번호': np.arange(1, len(names) + 1).astype(str), '생산방식': '농산물(1차)', '사업자구분': '일반농가',
+        '대표자명': '', '생년월일': '', '사업자번호': '', '휴대전화번호': _messy_phones(rng, len(names)),
+    })[SUPPLIER_COLUMNS]
+
+# 실제 파일처럼 제목 + 조회조건 행을 헤더 위에 둔다 (행 수는 seed 로 달라짐)
+PREAMBLE = {
+    'sales': ("직매장 농가별 판매", [['판매기간', '2026-01-01~2026-02-28', '', '', '', '판매/취소', '전체'],
+                                    ['농가정보', '전체, 농가명 : ', '', '', '', '정렬', '최근판매순 내림차순'],
+                                    ['판매형태', '전체', '', '', '', '품목분류', '대분류 전체, 중분류 전체, ']]),
+    'member': ("회원관리", [['회원명', '', '휴대전화'], ['주소', '', 'SMS수신']]),
+    'info': ("농가관리 목록", [['지점', '', '선택'], ['인증여부', '', '선택'], ['품목분류', '', '대분류 전체'],
+                             ['정산은행', '', '선택'], ['성별', '', '전체'], ['조합', '', '선택']]),
+}
+
+def write_workbook(df, path, kind, seed=0):
+    """제목/조회조건 행 + 빈 행(개수 랜덤) 뒤에 헤더와 데이터를 쓴다. .csv 면 CSV 로."""
+    rng = np.random.default_rng(seed + 3)
+    title, filters = PREAMBLE[kind]
+    top = [[title]] + [[]] * int(rng.integers(0, 3)) + filters + [[]] * int(rng.integers(0, 3))
+    if path.endswith('.csv'):
+        import csv
+        with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+            w = csv.writer(f)
+            w.writerows(top)
+            w.writerow(df.columns)
+            w.writerows(df.itertuples(index=False))
+        return path, len(top)
+    import xlsxwriter
+    wb = xlsxwriter.Workbook(path, {'constant_memory': True})
+    ws = wb.add_worksheet('Sheet1')
+    for r, row in enumerate(top): ws.write_row(r, 0, row)
+    ws.write_row(len(top), 0, list(df.columns))
+    cols = [df[c].tolist() for c in df.columns]
+    for r in range(len(df)):
+        for c, values in enumerate(cols):
+            v = values[r]
+            if v is None or v != v: continue
+            if isinstance(v, str): ws.write_string(len(top) + 1 + r, c, v)
+            else: ws.write_number(len(top) + 1 + r, c, v)
+    wb.close()
+    return path, len(top)
+
+def generate(n, out_dir, seed=0, fmt='xlsx'):
+    """판매 n 행 + 회원 n/10 명 + 업체 연락처 파일을 만들고 경로 dict 를 돌려준다 (이미 있으면 재사용)."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {k: os.path.join(out_dir, f"{k}-{n}-s{seed}.{fmt}") for k in ('sales', 'member', 'info')}
+    makers = {'sales': lambda: sales_frame(n, seed), 'member': lambda: member_frame(max(n // 10, 1000), seed),
+              'info': lambda: supplier_frame(min(max(n // 100, 300), 5000), seed)}
+    for kind, path in paths.items():
+        if not os.path.exists(path):
+            tmp = f"{path}.tmp.{fmt}"
+            write_workbook(makers[kind](), tmp, kind, seed)
+            os.replace(tmp, path)
+    return paths
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('sizes', nargs='+', help="판매 행 수 (10k, 100k, 1m …)")
+    ap.add_argument('--out', default=os.path.join('.cache', 'bench'))
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--format', choices=['xlsx', 'csv'], default='xlsx')
+    args = ap.parse_args()
+    for s in args.sizes:
+        print(generate(size_arg(s), args.out, args.seed, args.format))
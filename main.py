@@ -1,178 +1,166 @@
-import streamlit as st
-import pandas as pd
-from io import BytesIO
-import matplotlib.pyplot as plt
-import seaborn as sns
-from itertools import combinations
-from collections import Counter
-import os
-import matplotlib.font_manager as fm
-
-# ---------------------------------------------------------
-# [기본 설정] 폰트 및 페이지 디자인
-# ---------------------------------------------------------
-st.set_page_config(page_title="슬기로운 품앗이생활", page_icon="🌱", layout="wide")
-
-# 한글 폰트 설정
-def set_korean_font():
-    if os.name == 'posix':
-        plt.rc('font', family='NanumGothic')
-    else:
-        plt.rc('font', family='Malgun Gothic')
-    plt.rcParams['axes.unicode_minus'] = False
-
-set_korean_font()
-
-# 메인 타이틀 (대문)
-st.title("슬기로운 품앗이생활 🌱")
-st.markdown("### 데이터로 만드는 우리들의 협동조합")
-
-# ---------------------------------------------------------
-# [공통] 파일 업로드 섹션
-# ---------------------------------------------------------
-st.info("💡 **매입처 기준표**와 **POS 판매 데이터**를 업로드하면, 우리 매장의 '생활 기록부'가 펼쳐집니다.")
-
-col1, col2 = st.columns(2)
-with col1:
-    st.subheader("1. 기준표 (체크리스트)")
-    uploaded_file_standard = st.file_uploader("★매입처_체크리스트.xlsx 파일을 올려주세요", type=['xlsx'])
-
-with col2:
-    st.subheader("2. 판매 데이터 (POS)")
-    uploaded_file_sales = st.file_uploader("직매장 판매내역 엑셀(행복ICT)을 올려주세요", type=['xlsx', 'csv'])
-
-# ---------------------------------------------------------
-# [탭 설정] 업무 공간 분리 (이름 변경!)
-# ---------------------------------------------------------
-# 여기가 핵심입니다! 탭 이름을 바꿨습니다.
-tab1, tab2 = st.tabs(["🛒 슬기로운 발주생활", "📈 슬기로운 마케팅생활"])
-
-# 데이터가 둘 다 있을 때만 작동
-if uploaded_file_standard and uploaded_file_sales:
-    
-    # 데이터 로드
-    df_std = pd.read_excel(uploaded_file_standard)
-    
-    if uploaded_file_sales.name.endswith('.csv'):
-        df_sales = pd.read_csv(uploaded_file_sales)
-    else:
-        df_sales = pd.read_excel(uploaded_file_sales)
-
-    # =========================================================
-    # [Tab 1] 슬기로운 발주생활
-    # =========================================================
-    with tab1:
-        st.markdown("### 📋 품절 없는 매장을 위한 똑똑한 주문")
-        
-        if st.button("🚀 발주 분석 시작하기", key="order_btn"):
-            with st.spinner('데이터를 분석 중입니다...'):
-                # 컬럼명 처리
-                sales_cols = df_sales.columns
-                item_col = '품목명' if '품목명' in sales_cols else '상품명'
-                qty_col = '수량'
-                amt_col = '결제금액' if '결제금액' in sales_cols else '합계'
-
-                # 데이터 집계
-                sales_summary = df_sales.groupby(item_col)[[qty_col, amt_col]].sum().reset_index()
-                sales_summary.rename(columns={item_col: '품목명', qty_col: '총판매수량', amt_col: '총판매금액'}, inplace=True)
-                
-                # 판매건수(인기) 집계
-                sales_count = df_sales[item_col].value_counts().reset_index()
-                sales_count.columns = ['품목명', '판매건수(인기)']
-                
-                final_sales = pd.merge(sales_summary, sales_count, on='품목명', how='left')
-                merged_df = pd.merge(df_std, final_sales, on='품목명', how='left')
-
-                merged_df['총판매수량'] = merged_df['총판매수량'].fillna(0)
-                merged_df['판매건수(인기)'] = merged_df['판매건수(인기)'].fillna(0)
-
-                result_df = merged_df.sort_values(by='판매건수(인기)', ascending=False)
-
-                st.success(f"✅ 분석 완료! 총 {len(result_df)}개 품목이 발주 대상입니다.")
-                st.write("🏆 **품앗이님들이 가장 많이 찾은 Top 5**")
-                st.dataframe(result_df[['농가명', '품목명', '판매건수(인기)', '총판매수량']].head(5))
-
-                output = BytesIO()
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    result_df.to_excel(writer, index=False, sheet_name='전체발주권고')
-                    farmers = result_df['농가명'].unique()
-                    for farmer in farmers:
-                        if pd.isna(farmer): continue
-                        farmer_data = result_df[result_df['농가명'] == farmer]
-                        if farmer_data['판매건수(인기)'].sum() > 0: 
-                            sheet_name = str(farmer)[:30]
-                            farmer_data.to_excel(writer, index=False, sheet_name=sheet_name)
-
-                output.seek(0)
-                st.download_button(
-                    label="📥 최종 발주서 엑셀 다운로드",
-                    data=output,
-                    file_name='품앗이_스마트발주서.xlsx',
-                    mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-
-    # =========================================================
-    # [Tab 2] 슬기로운 마케팅생활
-    # =========================================================
-    with tab2:
-        st.markdown("### 💡 주인의 마음을 읽는 데이터 전략")
-        
-        if st.button("🔍 마케팅 전략 분석하기", key="mkt_btn"):
-            with st.spinner('장바구니 속 이야기를 읽는 중...'):
-                df_mkt = df_sales.copy()
-                req_cols = ['회원', '결제금액', '판매일시', '품목명']
-                missing_cols = [c for c in req_cols if c not in df_mkt.columns]
-                
-                if missing_cols:
-                    st.error(f"⚠️ 데이터 컬럼 부족: {missing_cols}")
-                else:
-                    df_member = df_mkt[df_mkt['회원'].notna()].copy()
-                    df_member['결제금액'] = pd.to_numeric(df_member['결제금액'], errors='coerce').fillna(0)
-                    df_member['판매일시'] = pd.to_datetime(df_member['판매일시'])
-                    df_member['date'] = df_member['판매일시'].dt.date
-
-                    st.subheader("1. 짝꿍 상품 분석 (연관 구매)")
-                    top_items = df_member['품목명'].value_counts().head(50).index.tolist()
-                    df_top = df_member[df_member['품목명'].isin(top_items)]
-                    df_top['basket_id'] = df_top['회원'].astype(str) + "_" + df_top['판매일시'].astype(str)
-                    baskets = df_top.groupby('basket_id')['품목명'].apply(list)
-
-                    item_pairs = Counter()
-                    for basket in baskets:
-                        if len(basket) > 1:
-                            unique_items = sorted(set(basket))
-                            for pair in combinations(unique_items, 2):
-                                item_pairs[pair] += 1
-
-                    if item_pairs:
-                        top_pairs = item_pairs.most_common(10)
-                        df_pairs = pd.DataFrame([{'조합': f"{p[0]} + {p[1]}", '횟수': c} for p, c in top_pairs])
-                        fig1, ax1 = plt.subplots(figsize=(10, 6))
-                        sns.barplot(data=df_pairs, x='횟수', y='조합', palette='viridis', ax=ax1)
-                        ax1.set_title('함께 많이 팔린 짝꿍 상품 Top 10')
-                        st.pyplot(fig1)
-                    else:
-                        st.info("데이터가 부족합니다.")
-
-                    st.markdown("---")
-                    st.subheader("2. 단골(주인) 분포도")
-                    current_date = df_member['판매일시'].max()
-                    rfm = df_member.groupby('회원').agg({
-                        '판매일시': lambda x: (current_date - x.max()).days,
-                        'date': 'nunique',
-                        '결제금액': 'sum'
-                    }).rename(columns={'판매일시': '최근방문(일전)', 'date': '방문횟수', '결제금액': '총구매액'})
-
-                    fig2, ax2 = plt.subplots(figsize=(10, 8))
-                    sns.scatterplot(
-                        data=rfm, x='방문횟수', y='총구매액', 
-                        size='총구매액', hue='최근방문(일전)',
-                        sizes=(20, 500), alpha=0.6, palette='RdYlGn_r', ax=ax2
-                    )
-                    ax2.axvline(rfm['방문횟수'].median(), color='red', linestyle='--', alpha=0.3)
-                    ax2.axhline(rfm['총구매액'].median(), color='red', linestyle='--', alpha=0.3)
-                    ax2.set_title('품앗이님 활동 분포 (RFM)')
-                    st.pyplot(fig2)
-
-else:
-    st.warning("👈 파일을 업로드해주세요.")
+import streamlit as st
+import pandas as pd
+import uuid
+
+from poomasi import profiling
+from poomasi.config import ADMIN_PASSWORD
+from poomasi.history import get_history
+from poomasi.jobs import DONE, get_runner, status_line, watch
+from poomasi.pipeline import farmer_zip_job, history_frame, marketing_report_job, order_report_job
+
+# ---------------------------------------------------------
+# [기본 설정] 폰트 및 페이지 디자인
+# ---------------------------------------------------------
+st.set_page_config(page_title="슬기로운 품앗이생활", page_icon="🌱", layout="wide")
+
+# 단계별 시간 기록 (관리자 패널에서 켰을 때만, 끝은 파일 맨 아래 end_run)
+if 'perf_sid' not in st.session_state: st.session_state.perf_sid = uuid.uuid4().hex[:8]
+profiling.begin_run('품앗이생활', st.session_state.perf_sid)
+if ADMIN_PASSWORD:
+    with st.sidebar.expander("🛠️ 관리자: 성능 계측"):
+        if st.text_input("관리자 비밀번호", type="password", key='admin_pw') == ADMIN_PASSWORD: profiling.sidebar_panel()
+
+# 한글 폰트·matplotlib 은 차트를 처음 그릴 때 poomasi.charts 에서 불러옴
+# 메인 타이틀 (대문)
+st.title("슬기로운 품앗이생활 🌱")
+st.markdown("### 데이터로 만드는 우리들의 협동조합")
+
+# ---------------------------------------------------------
+# [공통] 파일 업로드 섹션
+# ---------------------------------------------------------
+st.info("💡 **매입처 기준표**와 **POS 판매 데이터**를 업로드하면, 우리 매장의 '생활 기록부'가 펼쳐집니다.")
+
+col1, col2 = st.columns(2)
+with col1:
+    st.subheader("1. 기준표 (체크리스트)")
+    uploaded_file_standard = st.file_uploader("★매입처_체크리스트.xlsx 파일을 올려주세요", type=['xlsx'])
+
+with col2:
+    st.subheader("2. 판매 데이터 (POS)")
+    uploaded_file_sales = st.file_uploader("직매장 판매내역 엑셀(행복ICT)을 올려주세요", type=['xlsx', 'csv'])
+    # 판매 이력(앱 '시다비서'나 python -m poomasi ingest 로 저장)이 있으면 파일 대신 기간으로 분석
+    h_first, h_last = get_history().date_range()
+    sales_window = None
+    if h_first and st.checkbox(f"📚 저장된 판매 이력 쓰기 ({h_first} ~ {h_last})", key='hist_on'):
+        picked = st.date_input("기간", (h_first, h_last), min_value=h_first, max_value=h_last, key='hist_range')
+        if len(picked) == 2: sales_window = picked
+
+# ---------------------------------------------------------
+# [탭 설정] 업무 공간 분리 (이름 변경!)
+# ---------------------------------------------------------
+# 여기가 핵심입니다! 탭 이름을 바꿨습니다.
+tab1, tab2 = st.tabs(["🛒 슬기로운 발주생활", "📈 슬기로운 마케팅생활"])
+
+# 데이터가 둘 다 있을 때만 작동
+if uploaded_file_standard and (uploaded_file_sales or sales_window):
+    
+    # 데이터 로드
+    with profiling.stage('read.standard') as s:
+        df_std = pd.read_excel(uploaded_file_standard)
+        s.rows = len(df_std)
+    
+    with profiling.stage('read.sales') as s:
+        if sales_window:
+            df_sales = history_frame(*sales_window, ['회원', '품목명', '수량', '결제금액'])
+        elif uploaded_file_sales.name.endswith('.csv'):
+            df_sales = pd.read_csv(uploaded_file_sales)
+        else:
+            df_sales = pd.read_excel(uploaded_file_sales)
+        s.rows = len(df_sales)
+
+    # 분석·엑셀 만들기는 백그라운드 작업으로 돌리고, 화면은 매번 작업 상태와 나온 결과만 그림
+    # (분석 중에 다른 버튼을 눌러도 끊기지 않고, 같은 분석을 두 번 띄우지 않음)
+    runner = get_runner()
+    sid = st.session_state.perf_sid
+    source = f"{sales_window[0]} ~ {sales_window[1]}" if sales_window else uploaded_file_sales.name
+
+    # =========================================================
+    # [Tab 1] 슬기로운 발주생활
+    # =========================================================
+    with tab1:
+        st.markdown("### 📋 품절 없는 매장을 위한 똑똑한 주문")
+        
+        if st.button("🚀 발주 분석 시작하기", key="order_btn"):
+            runner.submit(sid, 'order', order_report_job, df_std, df_sales, name=f"발주 분석 ({source})")
+
+        def render_order(job):
+            status_line(job)
+            part = job.partial()
+            if 'result' in part:
+                result_df = part['result']
+                st.success(f"✅ 분석 완료! 총 {len(result_df)}개 품목이 발주 대상입니다.")
+                st.write("🏆 **품앗이님들이 가장 많이 찾은 Top 5**")
+                st.dataframe(result_df[['농가명', '품목명', '판매건수(인기)', '총판매수량']].head(5))
+
+            # 농가별로 한 번만 묶어 전체/농가별 시트를 한 번에 씀 (xlsxwriter constant_memory)
+            if 'workbook' in part:
+                st.download_button(
+                    label="📥 최종 발주서 엑셀 다운로드",
+                    data=part['workbook'],
+                    file_name='품앗이_스마트발주서.xlsx',
+                    mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                )
+
+        def render_zip(job):
+            status_line(job)
+            part = job.partial()
+            if 'zip' in part:
+                st.download_button(
+                    label="🗂️ 농가별 발주서 묶음(zip) 다운로드",
+                    data=part['zip'],
+                    file_name='품앗이_농가별발주서.zip',
+                    mime='application/zip'
+                )
+
+        order_job = runner.latest(sid, 'order')
+        if order_job: watch(order_job, render_order)
+        # 농가별 zip 은 필요한 사람만 따로 만든다 (발주 분석마다 만들지 않음)
+        if order_job and order_job.status == DONE:
+            zip_key = f"order_zip:{order_job.id}"  # 분석 결과마다 따로 (이전 분석의 zip 이 보이지 않게)
+            if st.button("🗂️ 농가별 발주서 묶음(zip) 만들기", key="order_zip_btn"):
+                runner.submit(sid, zip_key, farmer_zip_job, order_job.result['result'], name="농가별 발주서 zip")
+            zip_job = runner.latest(sid, zip_key)
+            if zip_job: watch(zip_job, render_zip)
+
+    # =========================================================
+    # [Tab 2] 슬기로운 마케팅생활
+    # =========================================================
+    with tab2:
+        st.markdown("### 💡 주인의 마음을 읽는 데이터 전략")
+        
+        if st.button("🔍 마케팅 전략 분석하기", key="mkt_btn"):
+            req_cols = ['회원', '결제금액', '판매일시', '품목명']
+            missing_cols = [c for c in req_cols if c not in df_sales.columns]
+            if missing_cols: st.error(f"⚠️ 데이터 컬럼 부족: {missing_cols}")
+            else: runner.submit(sid, 'mkt', marketing_report_job, df_sales, window=sales_window, name=f"마케팅 분석 ({source})")
+
+        def render_mkt(job):
+            status_line(job)
+            part = job.partial()
+            if 'pairs_png' in part:
+                st.subheader("1. 짝꿍 상품 분석 (연관 구매)")
+                # 전체 품목 대상 희소 동시구매 행렬 (상위 50개 제한 없음), 같은 집계면 그려 둔 그림을 그대로 씀
+                if part['pairs_png'] is None: st.info("데이터가 부족합니다.")
+                else: st.image(part['pairs_png'])
+            if 'rules' in part:
+                st.write("🤝 **상품별 추천 짝꿍** (3번 이상 같이 팔린 조합, 향상도 순)")
+                st.dataframe(part['rules'], hide_index=True)
+            if 'triples' in part and not part['triples'].empty:
+                st.write("🧺 **세 가지 이상 함께 담긴 묶음**")
+                st.dataframe(part['triples'].head(20), hide_index=True)
+
+            if 'rfm_summary' in part:
+                st.markdown("---")
+                st.subheader("2. 단골(주인) 분포도")
+                # 회원이 많으면 점 대신 밀도(hexbin) + 상위 1% 회원만 점으로 그림
+                if 'rfm_png' in part: st.image(part['rfm_png'])
+                st.write("🏷️ **세그먼트별 품앗이님** (시다비서 마케팅 탭에서 바로 문자 대상으로 쓸 수 있어요)")
+                st.dataframe(part['rfm_summary'], hide_index=True)
+
+        mkt_job = runner.latest(sid, 'mkt')
+        if mkt_job: watch(mkt_job, render_mkt)
+
+else:
+    st.warning("👈 파일을 업로드해주세요.")
+
+profiling.end_run()
@@ -0,0 +1,5 @@
+"""시다비서 / 슬기로운 품앗이생활 공용 엔진.
+
+Streamlit 화면(app.py, main.py)에서 쓰는 데이터 로드·정제·집계 로직을 모아 둔 패키지.
+무거운 의존성은 각 모듈 안에서만 import 한다.
+"""
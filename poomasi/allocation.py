@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+from .profiling import timed
+
+# ==========================================
+# [예산 배분] 예산 안에서 발주량 정하기
+# ==========================================
+# 품목 i 의 k 번째 한 개가 팔릴 확률 P(수요 ≥ k) × 판매가 를 그 한 개의 가치로 보고,
+# (품목, k) 단위 후보를 가치/원가 순으로 정렬해 누적 원가가 예산 안인 곳까지 담는다.
+# 가치가 k 에 따라 줄어들기 때문에(오목) 이 탐욕 순서가 품목별로 앞 단위부터 채워진다.
+# 정렬·누적합은 한 번만 만들어 두고, 예산만 바뀌면 searchsorted 한 번으로 다시 푼다.
+EXACT_MAX_UNITS = 400      # 정확 모드(0/1 배낭 DP)를 쓰는 최대 후보 수
+EXACT_MAX_CELLS = 200_000  # DP 예산 격자 칸 수 상한
+EXACT_MAX_KEEP = 8_000_000 # DP 선택 기록(후보 수 × 격자 칸, bool) 상한 ≈ 8MB. 넘으면 탐욕으로
+EXACT_GRID = 10            # DP 예산 격자 (원)
+
+def _norm_sf(x):
+    """표준정규 생존함수 1 - Φ(x) (Abramowitz-Stegun 7.1.26, 오차 1e-7)."""
+    z = np.abs(x) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erfc = poly * np.exp(-z * z)
+    return np.where(x >= 0, 0.5 * erfc, 1 - 0.5 * erfc)
+
+class AllocationProblem:
+    """품목별 원가·상한·기대수요·가격·업체 코드 배열과 (품목, k) 후보 배열."""
+
+    def __init__(self, cost, max_qty, demand, price, supplier_codes, suppliers):
+        self.cost = np.asarray(cost, dtype=float)
+        self.max_qty = np.maximum(np.asarray(max_qty, dtype=np.int64), 0)
+        self.suppliers = np.asarray(suppliers, dtype=object)
+        self.supplier = np.asarray(supplier_codes, dtype=np.int64)
+        demand = np.maximum(np.asarray(demand, dtype=float), 0)
+        price = np.asarray(price, dtype=float)
+
+        # (품목, k) 후보: k = 1..max_qty
+        self.unit_item = np.repeat(np.arange(len(self.cost)), self.max_qty)
+        k = np.arange(len(self.unit_item)) - np.repeat(np.cumsum(self.max_qty) - self.max_qty, self.max_qty) + 1
+        mu, sigma = demand[self.unit_item], np.sqrt(np.maximum(demand[self.unit_item], 1.0))
+        self.unit_value = price[self.unit_item] * _norm_sf((k - 0.5 - mu) / sigma)
+        self.unit_cost = self.cost[self.unit_item]
+        ratio = self.unit_value / np.where(self.unit_cost > 0, self.unit_cost, np.inf)
+        # 원가 0 인 단위는 무조건 먼저, 같은 가치/원가면 품목·k 순
+        self.order = np.lexsort((np.arange(len(ratio)), -ratio, self.unit_cost > 0))
+        self._prefix = np.cumsum(self.unit_cost[self.order])
+
+    @classmethod
+    def from_frame(cls, agg, qty_col='발주량', cost_col='추정매입가', price_col='평균판매가',
+                   demand_col=None, supplier_col='업체명'):
+        """발주 표(agg_item) → 문제. 기대수요는 예측수요가 있으면 그것, 없으면 판매량."""
+        if demand_col is None: demand_col = '예측수요' if '예측수요' in agg.columns else '판매량'
+        codes, suppliers = pd.factorize(agg[supplier_col])
+        demand = agg[demand_col].fillna(agg['판매량']) if demand_col != '판매량' else agg[demand_col]
+        return cls(agg[cost_col].fillna(0).to_numpy(), agg[qty_col].fillna(0).to_numpy(), demand.to_numpy(),
+                   agg[price_col].fillna(0).to_numpy(), codes, suppliers)
+
+    def _greedy(self, budget, allowed):
+        order, prefix = self.order, self._prefix
+        if allowed is not None:
+            order = order[allowed[self.order]]
+            prefix = np.cumsum(self.unit_cost[order])
+        n = int(np.searchsorted(prefix, budget + 1e-9, side='right'))
+        take = order[:n]
+        left = budget - (prefix[n - 1] if n else 0.0)
+        # 다음 후보가 안 들어가도 뒤쪽의 더 싼 단위는 남은 예산에 들어갈 수 있다
+        tail = order[n:]
+        while len(tail) and left > 0:
+            fits = np.flatnonzero(self.unit_cost[tail] <= left + 1e-9)
+            if not len(fits): break
+            pick = tail[fits[0]]
+            take = np.append(take, pick)
+            left -= self.unit_cost[pick]
+            tail = tail[fits[0] + 1:]
+        return take
+
+    def _exact(self, budget, allowed):
+        idx = np.arange(len(self.unit_item)) if allowed is None else np.flatnonzero(allowed)
+        w = np.ceil(self.unit_cost[idx] / EXACT_GRID).astype(np.int64)
+        cap = int(budget // EXACT_GRID)
+        dp = np.zeros(cap + 1)
+        keep = np.zeros((len(idx), cap + 1), dtype=bool)
+        for r, (wi, vi) in enumerate(zip(w, self.unit_value[idx])):
+            if wi > cap: continue
+            cand = np.full(cap + 1, -np.inf)
+            cand[wi:] = dp[:cap + 1 - wi] + vi
+            keep[r] = cand > dp
+            dp = np.maximum(dp, cand)
+        take, c = [], cap
+        for r in range(len(idx) - 1, -1, -1):
+            if keep[r, c]:
+                take.append(idx[r])
+                c -= w[r]
+        return np.array(take, dtype=np.int64)
+
+    def solve(self, budget, supplier_min=None, exact=None):
+        """예산(원) 안의 품목별 발주량 배열. supplier_min: {업체명: 최소 주문금액} 또는 모든 업체 공통 숫자.
+
+        최소 주문금액을 못 채운 업체는 빼고 다시 푼다 (채울 수 있는 업체만 남을 때까지).
+        exact=None 이면 후보가 적을 때만 DP 로 정확히 푼다. DP 선택 기록이 EXACT_MAX_KEEP 칸을 넘으면
+        exact=True 여도 탐욕으로 푼다.
+        """
+        n_units = len(self.unit_item)
+        cells = budget / EXACT_GRID + 1
+        if exact is None: exact = n_units <= EXACT_MAX_UNITS and cells <= EXACT_MAX_CELLS
+        exact = exact and n_units * cells <= EXACT_MAX_KEEP
+        mins = np.zeros(len(self.suppliers))
+        if isinstance(supplier_min, dict):
+            lookup = pd.Index(self.suppliers)
+            for name, v in supplier_min.items():
+                pos = lookup.get_indexer([name])[0]
+                if pos >= 0: mins[pos] = v
+        elif supplier_min: mins[:] = supplier_min
+        allowed = None
+        for _ in range(len(self.suppliers) + 1):
+            take = self._exact(budget, allowed) if exact else self._greedy(budget, allowed)
+            qty = np.bincount(self.unit_item[take], minlength=len(self.cost))
+            spend = np.bincount(self.supplier, weights=qty * self.cost, minlength=len(self.suppliers))
+            short = (spend > 0) & (spend < mins)
+            if not short.any(): return qty
+            drop = short[self.supplier[self.unit_item]]
+            allowed = ~drop if allowed is None else allowed & ~drop
+        return qty
+
+@timed()
+def allocate(agg, budget, supplier_min=None, exact=None, problem=None):
+    """발주 표의 발주량을 예산 안으로 맞춘 표 (발주량/예상매입액 갱신, 원래 값은 권장발주량)."""
+    problem = problem or AllocationProblem.from_frame(agg)
+    out = agg.copy()
+    out['권장발주량'] = out['발주량']
+    out['발주량'] = problem.solve(budget, supplier_min, exact).astype(float)
+    out['예상매입액'] = out['발주량'] * out['추정매입가']
+    return out
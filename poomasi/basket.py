@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+
+from .profiling import timed
+
+# ==========================================
+# [장바구니 분석] 정수 코드 + 희소 동시구매 행렬
+# ==========================================
+# 장바구니(회원 + 판매일시)와 품목을 정수 코드로 바꿔 (장바구니, 품목) 희소 행렬 X 를 만들고
+# 동시구매 횟수 XᵀX 의 상삼각(a < b)만 COO 형태(pair_a, pair_b, pair_count)로 계산한다.
+# 상위 50개 제한 없이 전체 품목에 대해 support / confidence / lift 를 낸다.
+
+class BasketModel:
+    def __init__(self, items, basket_idx, item_idx, n_baskets):
+        self.items = np.asarray(items, dtype=object)
+        self.n_baskets = int(n_baskets)
+        # 같은 장바구니 안의 중복 품목 제거 후 (장바구니, 품목) 순으로 정렬된 희소 행렬
+        n_items = len(self.items)
+        cell = np.unique(basket_idx.astype(np.int64) * n_items + item_idx)
+        self.basket_idx = cell // n_items
+        self.item_idx = cell % n_items
+        self.item_count = np.bincount(self.item_idx, minlength=n_items)
+        self.pair_a, self.pair_b, self.pair_count = self._cooccurrence()
+
+    def _cooccurrence(self):
+        n_items = len(self.items)
+        b, it = self.basket_idx, self.item_idx
+        if len(b) == 0: return (np.array([], dtype=np.int64),) * 3
+        # 장바구니별 시작 위치 → 각 원소가 같은 장바구니 뒤쪽 원소들과 짝을 이룸
+        starts = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+        ends = np.r_[starts[1:], len(b)]
+        end_of = np.repeat(ends, ends - starts)
+        pos = np.arange(len(b))
+        n_right = end_of - pos - 1
+        total = int(n_right.sum())
+        if total == 0: return (np.array([], dtype=np.int64),) * 3
+        left = np.repeat(pos, n_right)
+        offset = np.arange(total) - np.repeat(np.cumsum(n_right) - n_right, n_right)
+        right = left + 1 + offset
+        keys, counts = np.unique(it[left].astype(np.int64) * n_items + it[right], return_counts=True)
+        return keys // n_items, keys % n_items, counts
+
+    def pairs(self, min_count=1):
+        """모든 품목 쌍의 support / confidence(A→B, B→A) / lift."""
+        m = self.pair_count >= min_count
+        a, b, c = self.pair_a[m], self.pair_b[m], self.pair_count[m]
+        n = max(self.n_baskets, 1)
+        ca, cb = self.item_count[a], self.item_count[b]
+        return pd.DataFrame({
+            '상품A': self.items[a], '상품B': self.items[b], '횟수': c,
+            'support': c / n,
+            'confidence_AB': c / ca, 'confidence_BA': c / cb,
+            'lift': c * n / (ca * cb),
+        })
+
+    def top_pairs(self, k=10):
+        order = np.lexsort((self.pair_b, self.pair_a, -self.pair_count))[:k]
+        return pd.DataFrame({'상품A': self.items[self.pair_a[order]], '상품B': self.items[self.pair_b[order]],
+                             '횟수': self.pair_count[order]})
+
+    def rules(self, min_count=2, k=3, by='lift'):
+        """품목별 추천(기준상품 → 추천상품) 상위 k개. 양방향 규칙을 모두 펼쳐서 계산."""
+        m = self.pair_count >= min_count
+        a, b, c = self.pair_a[m], self.pair_b[m], self.pair_count[m]
+        src, dst, cnt = np.r_[a, b], np.r_[b, a], np.r_[c, c]
+        n = max(self.n_baskets, 1)
+        conf = cnt / self.item_count[src]
+        lift = conf * n / self.item_count[dst]
+        df = pd.DataFrame({'src': src, '기준상품': self.items[src], '추천상품': self.items[dst],
+                           '횟수': cnt, '신뢰도': conf, '향상도': lift})
+        key = {'lift': '향상도', 'confidence': '신뢰도', 'count': '횟수'}[by]
+        df = df.sort_values(['src', key, '횟수'], ascending=[True, False, False])
+        df = df[df.groupby('src').cumcount() < k]
+        return df.drop(columns='src').reset_index(drop=True)
+
+    def recommend(self, item, k=5, by='lift'):
+        idx = np.flatnonzero(self.items == item)
+        if len(idx) == 0: return pd.DataFrame(columns=['기준상품', '추천상품', '횟수', '신뢰도', '향상도'])
+        r = self.rules(min_count=1, k=len(self.items), by=by)
+        return r[r['기준상품'] == item].head(k).reset_index(drop=True)
+
+    def transactions(self, min_count=1):
+        """장바구니별 품목 코드 목록 (min_count 미만 품목 제외)."""
+        keep = self.item_count[self.item_idx] >= min_count
+        b, it = self.basket_idx[keep], self.item_idx[keep]
+        cut = np.flatnonzero(np.r_[True, b[1:] != b[:-1]]) if len(b) else np.array([], dtype=np.int64)
+        return [t for t in np.split(it, cut[1:]) if len(t)]
+
+@timed()
+def build_basket_model(df, member_col='회원', time_col='판매일시', item_col='품목명'):
+    """판매 행 → BasketModel. 장바구니 = 같은 회원의 같은 판매일시."""
+    df = df[df[item_col].notna()]
+    basket_idx = df.groupby([df[member_col].astype(str), time_col], sort=False, dropna=False).ngroup().to_numpy()
+    item_idx, items = pd.factorize(df[item_col], sort=True)
+    return BasketModel(items, basket_idx, item_idx, basket_idx.max() + 1 if len(basket_idx) else 0)
+
+# ---------- FP-growth (3개 이상 묶음) ----------
+class _Node:
+    __slots__ = ('item', 'count', 'parent', 'children', 'link')
+
+    def __init__(self, item, parent):
+        self.item, self.count, self.parent, self.children, self.link = item, 0, parent, {}, None
+
+def _build_tree(transactions, min_count):
+    counts = {}
+    for t, w in transactions:
+        for i in t: counts[i] = counts.get(i, 0) + w
+    freq = {i: c for i, c in counts.items() if c >= min_count}
+    root, heads = _Node(None, None), {}
+    for t, w in transactions:
+        path = sorted((i for i in t if i in freq), key=lambda i: (-freq[i], i))
+        node = root
+        for i in path:
+            child = node.children.get(i)
+            if child is None:
+                child = node.children[i] = _Node(i, node)
+                child.link, heads[i] = heads.get(i), child
+            child.count += w
+            node = child
+    return freq, heads
+
+def _mine(transactions, min_count, suffix, max_len, out):
+    freq, heads = _build_tree(transactions, min_count)
+    for item in sorted(freq, key=lambda i: (freq[i], i)):
+        itemset = suffix + (item,)
+        out.append((itemset, freq[item]))
+        if len(itemset) >= max_len: continue
+        cond = []
+        node = heads[item]
+        while node is not None:
+            path, p = [], node.parent
+            while p is not None and p.item is not None:
+                path.append(p.item)
+                p = p.parent
+            if path: cond.append((path, node.count))
+            node = node.link
+        if cond: _mine(cond, min_count, itemset, max_len, out)
+
+@timed()
+def frequent_itemsets(model, min_support=0.01, max_len=3, min_len=2):
+    """FP-growth 로 자주 같이 팔린 품목 묶음. support 는 전체 장바구니 대비 비율."""
+    min_count = max(1, int(np.ceil(min_support * model.n_baskets)))
+    out = []
+    _mine([(t.tolist(), 1) for t in model.transactions(min_count) if len(t) >= min_len], min_count, (), max_len, out)
+    rows = [(' + '.join(str(model.items[i]) for i in sorted(s)), len(s), c, c / max(model.n_baskets, 1))
+            for s, c in out if len(s) >= min_len]
+    return pd.DataFrame(rows, columns=['조합', '품목수', '횟수', 'support']).sort_values(
+        ['품목수', '횟수'], ascending=[False, False]).reset_index(drop=True)
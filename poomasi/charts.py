@@ -0,0 +1,112 @@
+import hashlib
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .profiling import timed
+from .sales_agg import PartialCache
+
+# ==========================================
+# [차트] 데이터 해시로 캐시하는 PNG 렌더링
+# ==========================================
+# 차트에 들어가는 집계표(짝꿍 Top 10, 회원별 RFM)를 해시해서 같은 데이터면 그려 둔 PNG 를 그대로 쓴다.
+# matplotlib / seaborn 은 처음 그릴 때만 불러오고, pyplot 대신 Figure 를 직접 만들어 세션끼리 섞이지 않게 한다.
+# 회원이 많으면 점을 하나씩 찍지 않고 육각 밀도(hexbin) + 바깥쪽 회원만 점으로 그려 그리는 시간이 회원 수와 무관하다.
+SCATTER_MAX_POINTS = 2000  # 이보다 많으면 밀도 그림
+OUTLIER_QUANTILE = 0.99    # 방문횟수·총구매액 상위 1% 는 점으로 따로
+OUTLIER_MAX = 300
+HEXBIN_GRID = 40
+DPI = 100
+
+_charts = PartialCache(maxsize=32)
+_mpl_lock = threading.Lock()
+_mpl = None
+
+def _matplotlib():
+    """matplotlib 을 처음 쓸 때 불러오고 한글 폰트를 맞춘다."""
+    global _mpl
+    with _mpl_lock:
+        if _mpl is None:
+            import matplotlib
+            from matplotlib.figure import Figure
+            matplotlib.rcParams['font.family'] = 'NanumGothic' if os.name == 'posix' else 'Malgun Gothic'
+            matplotlib.rcParams['axes.unicode_minus'] = False
+            _mpl = Figure
+    return _mpl
+
+def data_key(kind, df, cols, *params):
+    """(차트 종류, 집계표 내용, 옵션) 해시."""
+    h = hashlib.sha1(f"{kind}|{params}|{list(cols)}".encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(df[list(cols)], index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+def _png(fig):
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=DPI, bbox_inches='tight')
+    return buf.getvalue()
+
+def _cached(key, draw):
+    png = _charts.get(key)
+    if png is None:
+        png = draw()
+        _charts.put(key, png)
+    return png
+
+# ---------- 짝꿍 상품 ----------
+def _draw_pairs(df_pairs):
+    import seaborn as sns
+    fig = _matplotlib()(figsize=(10, 6))
+    ax = fig.subplots()
+    sns.barplot(data=df_pairs, x='횟수', y='조합', hue='조합', palette='viridis', legend=False, ax=ax)
+    ax.set_title('함께 많이 팔린 짝꿍 상품 Top 10')
+    return _png(fig)
+
+@timed()
+def pair_chart(df_pairs):
+    """조합/횟수 표 → 막대 그래프 PNG."""
+    return _cached(data_key('pairs', df_pairs, ['조합', '횟수']), lambda: _draw_pairs(df_pairs))
+
+# ---------- RFM 분포 ----------
+def _draw_rfm_points(rfm):
+    import seaborn as sns
+    fig = _matplotlib()(figsize=(10, 8))
+    ax = fig.subplots()
+    sns.scatterplot(data=rfm, x='방문횟수', y='총구매액', size='총구매액', hue='최근방문(일전)',
+                    sizes=(20, 500), alpha=0.6, palette='RdYlGn_r', ax=ax)
+    return fig, ax
+
+def _draw_rfm_density(rfm):
+    """회원 밀도(hexbin) + 상위 1% 회원만 점으로."""
+    fig = _matplotlib()(figsize=(10, 8))
+    ax = fig.subplots()
+    x = rfm['방문횟수'].to_numpy(dtype=float)
+    y = rfm['총구매액'].to_numpy(dtype=float)
+    hb = ax.hexbin(x, y, gridsize=HEXBIN_GRID, bins='log', mincnt=1, cmap='Blues', linewidths=0.2)
+    fig.colorbar(hb, ax=ax, label='회원 수')
+    ax.set_xlabel('방문횟수')
+    ax.set_ylabel('총구매액')
+    out = (x > np.quantile(x, OUTLIER_QUANTILE)) | (y > np.quantile(y, OUTLIER_QUANTILE))
+    idx = np.flatnonzero(out)
+    if len(idx) > OUTLIER_MAX: idx = idx[np.argsort(-y[idx], kind='stable')[:OUTLIER_MAX]]
+    if len(idx):
+        pts = ax.scatter(x[idx], y[idx], c=rfm['최근방문(일전)'].to_numpy(dtype=float)[idx], cmap='RdYlGn_r',
+                         s=30, alpha=0.8, edgecolors='k', linewidths=0.3)
+        fig.colorbar(pts, ax=ax, label='최근방문(일전)')
+    return fig, ax
+
+def _draw_rfm(rfm):
+    dense = len(rfm) > SCATTER_MAX_POINTS
+    fig, ax = _draw_rfm_density(rfm) if dense else _draw_rfm_points(rfm)
+    ax.axvline(rfm['방문횟수'].median(), color='red', linestyle='--', alpha=0.3)
+    ax.axhline(rfm['총구매액'].median(), color='red', linestyle='--', alpha=0.3)
+    ax.set_title('품앗이님 활동 분포 (RFM)' + (f' · {len(rfm):,}명 밀도, 상위 1%는 점' if dense else ''))
+    return _png(fig)
+
+@timed()
+def rfm_chart(rfm):
+    """회원별 RFM 표 → 분포 그림 PNG. 회원이 많으면 밀도 그림."""
+    cols = ['방문횟수', '총구매액', '최근방문(일전)']
+    return _cached(data_key('rfm', rfm, cols, SCATTER_MAX_POINTS), lambda: _draw_rfm(rfm))
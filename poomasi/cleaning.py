@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from .common import to_clean_number
+from .profiling import timed
+
+# ==========================================
+# [벡터 정제] 금액·수량 / 전화번호 / 업체 구분
+# ==========================================
+# 행 단위 함수(to_clean_number, clean_phone_number, classify_supplier)와
+# 결과가 똑같도록 컬럼 전체를 한 번에 처리한다.
+NUMBER_PATTERN = r'-?(?:[0-9]+\.?[0-9]*|\.[0-9]+)'
+
+def _as_text(s):
+    # str(x) 와 같은 문자열 표현 (결측은 'nan')
+    if isinstance(s.dtype, pd.StringDtype): return s.fillna('nan')
+    return s.astype(object).where(s.notna(), 'nan').astype(str)
+
+@timed()
+def clean_numbers(s):
+    """s.apply(to_clean_number) 와 같은 결과 (float64)."""
+    s = pd.Series(s)
+    if pd.api.types.is_bool_dtype(s.dtype): s = s.astype(object)
+    if pd.api.types.is_numeric_dtype(s.dtype):
+        vals = s.to_numpy(dtype='float64', na_value=np.nan)
+        out = np.where(np.isnan(vals), 0.0, vals)
+        # 지수 표기(1e-05, 1e+16 …)로 찍히는 값은 문자열 처리 결과가 달라서 원래 함수로 계산
+        odd = ~np.isnan(vals) & (vals != 0) & ((np.abs(vals) < 1e-4) | (np.abs(vals) >= 1e16))
+        if odd.any(): out[odd] = [to_clean_number(v) for v in s[odd]]
+        return pd.Series(out, index=s.index, dtype='float64')
+
+    cleaned = _as_text(s).str.replace(r'[^0-9.-]', '', regex=True)
+    valid = cleaned.str.fullmatch(NUMBER_PATTERN).fillna(False).to_numpy(dtype=bool)
+    out = np.zeros(len(s), dtype='float64')
+    out[valid] = cleaned[valid].to_numpy(dtype=object).astype('float64')
+    return pd.Series(out, index=s.index)
+
+@timed()
+def clean_phones(s):
+    """s.apply(clean_phone_number) 와 같은 결과 (숫자만 남긴 문자열, 10… → 010…)."""
+    s = pd.Series(s)
+    txt = _as_text(s)
+    blank = s.isna().to_numpy() | txt.str.strip().isin(['-', '', 'nan']).to_numpy()
+    digits = txt.str.replace(r'[^0-9]', '', regex=True)
+    fix = digits.str.startswith('10') & (digits.str.len() >= 10)
+    digits = digits.where(~fix, '0' + digits)
+    return digits.where(~blank, '').astype(object)
+
+def supplier_set(names):
+    return {str(v).replace(' ', '') for v in names}
+
+def classify_supplier(name, valid_set, show_all=False):
+    if "지족" in name: return "지족(사입)"
+    elif name in valid_set: return "일반업체"
+    else: return "제외" if not show_all else "일반업체(강제)"
+
+def classify_suppliers(clean_names, valid_set, show_all=False):
+    """업체명(공백 제거된) 컬럼을 지족(사입)/일반업체/제외 로 분류.
+
+    고유 업체명만 분류한 뒤 코드로 되돌려 붙이므로 행 수가 아니라 업체 수에 비례한다.
+    """
+    codes, uniques = pd.factorize(pd.Series(clean_names), use_na_sentinel=True)
+    labels = np.array([classify_supplier(str(u), valid_set, show_all) for u in uniques] +
+                      [classify_supplier('', valid_set, show_all)], dtype=object)
+    return pd.Series(labels[codes], index=getattr(clean_names, 'index', None))
@@ -0,0 +1,143 @@
+"""배치 실행용 CLI.
+
+    python -m poomasi order  판매폴더/ --out 발주서.xlsx [--zip] [--outbox] [--forecast 7] [--budget 500000]
+    python -m poomasi rfm    판매폴더/ --segment 챔피언 --text "..." [--campaign 이름]
+    python -m poomasi send   [--kind order] [--day 2026-02-08]
+    python -m poomasi ingest 판매폴더/            (판매 이력에 쌓기, 이미 넣은 파일·행은 건너뜀)
+    python -m poomasi order  --from 2026-01-01 --to 2026-01-31 --out 발주서.xlsx   (파일 대신 판매 이력 기간)
+
+pandas 등 무거운 모듈은 하위 명령 안에서만 불러와 --help 와 인자 오류는 바로 끝난다.
+문자 API 키는 환경변수 POOMASI_SMS_KEY / POOMASI_SMS_SECRET / POOMASI_SMS_SENDER 로 받는다.
+"""
+import argparse
+import os
+import sys
+
+def _log(msg):
+    print(msg, file=sys.stderr)
+
+def _window(args):
+    """--from/--to 중 하나라도 있으면 (start, end), 없으면 None."""
+    return (args.start, args.end) if args.start or args.end else None
+
+def cmd_order(args):
+    from . import pipeline
+    window = _window(args)
+    paths = [] if window else pipeline.sales_files(args.paths)
+    if not (paths or window): _log("판매 파일(또는 --from/--to 기간)이 없습니다."); return 1
+    files = pipeline.open_files(paths)
+    agg_item, errors = pipeline.run_order(
+        files, safety=args.safety, purchase_rate=args.rate / 100.0, show_all=args.show_all,
+        horizon=args.forecast, service_level=args.service_level, budget=args.budget,
+        supplier_min=args.supplier_min or None, parallel=not args.serial, window=window)
+    for name, err in errors: _log(f"건너뜀: {name} ({err})")
+    if agg_item is None or agg_item.empty: _log("발주할 품목이 없습니다."); return 1
+    groups = pipeline.ORDER_GROUPS[args.group] if args.group else None
+    if groups: agg_item = agg_item[agg_item['구분'].isin(groups)]
+    source = f"판매 이력 {window[0] or '처음'} ~ {window[1] or '끝'}" if window else f"{len(paths)}개 파일"
+    _log(f"{source} · {agg_item['업체명'].nunique()}개 업체 · {len(agg_item)}개 품목 · "
+         f"예상 매입액 {agg_item['예상매입액'].sum():,.0f}원")
+    if args.out:
+        pipeline.write_order_sheets(agg_item, args.out, per_vendor_zip=args.zip)
+        _log(f"저장: {args.out}")
+    if args.outbox:
+        keys, no_phone = pipeline.enqueue_orders(agg_item, day=args.day)
+        _log(f"발송함에 {len(keys)}건 기록" + (f" (번호 없음 {len(no_phone)}곳: {', '.join(no_phone[:10])})" if no_phone else ""))
+    return 0
+
+def cmd_rfm(args):
+    from . import pipeline
+    window = _window(args)
+    files = [] if window else pipeline.open_files(pipeline.sales_files(args.paths))
+    targets = pipeline.rfm_targets(files, args.segment, window=window)
+    _log(f"{len(targets)}명 선택 ({', '.join(args.segment)})")
+    if args.csv: targets.to_csv(args.csv, index=False, encoding='utf-8-sig')
+    if args.text:
+        keys = pipeline.enqueue_marketing(targets, args.text, args.campaign, day=args.day)
+        _log(f"발송함에 {len(keys)}건 기록")
+    return 0
+
+def cmd_send(args):
+    from .outbox import get_outbox, today
+    from .sms import SmsDispatcher
+    key, secret, sender = (os.environ.get(f"POOMASI_SMS_{k}", '') for k in ('KEY', 'SECRET', 'SENDER'))
+    if not (key and secret and sender): _log("POOMASI_SMS_KEY / SECRET / SENDER 환경변수가 필요합니다."); return 2
+    outbox, day = get_outbox(), args.day or today()
+    keys = outbox.pending_keys(kind=args.kind, day=day)
+    summary = outbox.send_pending(SmsDispatcher(key, secret, sender), keys)
+    _log(f"발송 {summary['sent']} · 실패 {summary['failed']} · 이미 발송 {summary['skipped']} · 확인 필요 {summary['unknown']}")
+    return 0 if not summary['failed'] else 1
+
+def cmd_ingest(args):
+    from . import pipeline
+    from .history import get_history
+    history = get_history()
+    paths = pipeline.sales_files(args.paths)
+    if not paths: _log("판매 파일이 없습니다."); return 1
+    failed = 0
+    for path, f in zip(paths, pipeline.open_files(paths)):
+        r = history.ingest(f, force=args.force)
+        if r['error']: failed += 1; _log(f"건너뜀: {r['file']} ({r['error']})")
+        elif r['skipped']: _log(f"이미 넣은 파일: {r['file']}")
+        else: _log(f"{r['file']}: {r['rows']:,}행 중 새 행 {r['new']:,} · 중복 {r['duplicate']:,}"
+                   + (f" · 판매일시 없음 {r['dropped']:,}" if r['dropped'] else ""))
+    first, last = history.date_range()
+    if first: _log(f"판매 이력: {first} ~ {last} ({history.root})")
+    return 1 if failed else 0
+
+def _add_window(p):
+    p.add_argument('--from', dest='start', metavar='YYYY-MM-DD', help="파일 대신 판매 이력에서 이 날짜부터")
+    p.add_argument('--to', dest='end', metavar='YYYY-MM-DD', help="판매 이력에서 이 날짜까지 (포함)")
+
+def build_parser():
+    ap = argparse.ArgumentParser(prog='python -m poomasi', description="품앗이 발주/문자 배치 실행")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+
+    p = sub.add_parser('order', help="판매 파일 → 발주서 엑셀 / 발송함")
+    p.add_argument('paths', nargs='*', help="판매 파일 또는 폴더")
+    _add_window(p)
+    p.add_argument('--out', help="발주서 저장 경로 (.xlsx, --zip 이면 .zip)")
+    p.add_argument('--zip', action='store_true', help="업체별 파일을 zip 으로")
+    p.add_argument('--outbox', action='store_true', help="업체별 발주 문자를 발송함에 기록")
+    p.add_argument('--group', choices=['ext', 'int'], help="ext: 외부업체, int: 지족 사입")
+    p.add_argument('--safety', type=float, default=1.1)
+    p.add_argument('--rate', type=float, default=70, help="매입 원가율 (%%)")
+    p.add_argument('--show-all', action='store_true', help="화이트리스트 밖 업체도 포함")
+    p.add_argument('--forecast', type=int, metavar='DAYS', help="수요예측으로 DAYS 일치 발주량 계산")
+    p.add_argument('--service-level', type=float, default=0.95)
+    p.add_argument('--budget', type=float, help="예산 (원). 넘으면 발주량을 줄임")
+    p.add_argument('--supplier-min', type=float, default=0, help="업체별 최소 주문금액 (원)")
+    p.add_argument('--day', help="발송함 날짜 (기본 오늘)")
+    p.add_argument('--serial', action='store_true', help="프로세스 풀 없이 파싱")
+    p.set_defaults(func=cmd_order)
+
+    p = sub.add_parser('rfm', help="RFM 세그먼트 회원 → CSV / 발송함")
+    p.add_argument('paths', nargs='*')
+    _add_window(p)
+    p.add_argument('--segment', action='append', required=True, help="세그먼트 이름 (여러 번 가능)")
+    p.add_argument('--csv', help="대상자 CSV 저장 경로")
+    p.add_argument('--text', help="보낼 문자 내용 (있으면 발송함에 기록)")
+    p.add_argument('--campaign', default="품앗이마을")
+    p.add_argument('--day')
+    p.set_defaults(func=cmd_rfm)
+
+    p = sub.add_parser('send', help="발송함의 대기/실패 건 발송")
+    p.add_argument('--kind', choices=['order', 'marketing'])
+    p.add_argument('--day')
+    p.set_defaults(func=cmd_send)
+
+    p = sub.add_parser('ingest', help="판매 파일 → 판매 이력 (월별 저장, 중복 행 제외)")
+    p.add_argument('paths', nargs='+', help="판매 파일 또는 폴더")
+    p.add_argument('--force', action='store_true', help="이미 넣은 파일도 다시 확인")
+    p.set_defaults(func=cmd_ingest)
+    return ap
+
+def main(argv=None):
+    ap = build_parser()
+    args = ap.parse_args(argv)
+    if hasattr(args, 'start') and args.paths and _window(args):
+        ap.error("판매 파일과 --from/--to 기간은 같이 쓸 수 없습니다 (둘 중 하나만).")
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+import re
+
+import pandas as pd
+
+from .reader import read_table
+
+# ==========================================
+# [공통 함수] 파일 로드 / 컬럼 감지 / 값 정제
+# ==========================================
+HEADER_KEYWORDS = {
+    'sales': ['농가', '공급자', '생산자', '상품', '품목'],
+    'member': ['회원번호', '이름', '휴대전화'],
+    'info': ['농가명', '휴대전화', '전화번호'],
+}
+
+def header_keywords(type):
+    return HEADER_KEYWORDS.get(type, HEADER_KEYWORDS['info'])
+
+def clean_phone_number(phone):
+    if pd.isna(phone) or str(phone).strip() in ['-', '', 'nan']: return ''
+    clean_num = re.sub(r'[^0-9]', '', str(phone))
+    if clean_num.startswith('10') and len(clean_num) >= 10: clean_num = '0' + clean_num
+    return clean_num
+
+def load_data_smart(file_obj, type='sales', columns=None):
+    # 파일을 한 번만 스트리밍하며 헤더를 찾고, columns 로 지정한 컬럼만 읽는다
+    # columns: 컬럼 이름 목록, 또는 PROJECTIONS 의 이름 (st.cache_data 가 해시할 수 있게 문자열로 받음)
+    if isinstance(columns, str): columns = PROJECTIONS[columns]
+    return read_table(file_obj, header_keywords(type), columns=columns)
+
+def to_clean_number(x):
+    try:
+        clean_str = re.sub(r'[^0-9.-]', '', str(x))
+        return float(clean_str) if clean_str not in ['', '.'] else 0
+    except: return 0
+
+def detect_columns(df_columns):
+    s_item = next((c for c in df_columns if any(x in c for x in ['상품', '품목'])), None)
+    s_qty = next((c for c in df_columns if any(x in c for x in ['판매수량', '총수량'])), None)
+    if not s_qty: s_qty = next((c for c in df_columns if any(x in c for x in ['수량', '개수'])), None)
+
+    exclude = ['할인', '반품', '취소', '면세', '과세', '부가세']
+    candidates = [c for c in df_columns if ('총' in c and ('판매' in c or '매출' in c))] + \
+                 [c for c in df_columns if (('판매' in c or '매출' in c) and ('액' in c or '금액' in c))] + \
+                 [c for c in df_columns if '금액' in c]
+
+    s_amt = next((c for c in candidates if not any(bad in c for bad in exclude)), None)
+    s_farmer = next((c for c in df_columns if any(x in c for x in ['공급자', '농가', '생산자', '거래처'])), None)
+    return s_item, s_qty, s_amt, s_farmer
+
+def detect_date_column(df_columns):
+    return next((c for c in df_columns if any(x in c for x in ['판매일시', '일시', '일자', '날짜'])), None)
+
+# 헤더만 보고 필요한 컬럼을 고르는 투영 규칙
+PROJECTIONS = {
+    'order': detect_columns,
+    'forecast': lambda cols: list(detect_columns(cols)) + [detect_date_column(cols)],
+}
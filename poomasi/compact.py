@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# [컴팩트 dtype] 오래 들고 있는 프레임 줄이기
+# ==========================================
+# 프로세스가 계속 들고 있는 프레임(참조 명부, 마케팅용 판매 프레임)만 줄인다.
+#  - 같은 값이 반복되는 문자열 컬럼(농가명, 품목명, 회원, 지점 …) → category (정수 코드 + 고유값 한 벌)
+#  - 나머지 문자열, 숫자·문자가 섞인 object 컬럼 → Arrow 문자열(str, 한 버퍼에 연속 저장)
+#  - 정수 / 정수값만 있는 실수 → int32 (범위 안일 때)
+# 값은 바뀌지 않는다: 문자열로 바꾼 값은 str(x) 와 같고, 숫자는 같은 값이다.
+CATEGORY_RATIO = 0.5      # 고유값 수 / 행 수가 이 이하이면 category
+INT32 = np.iinfo(np.int32)
+
+def _fits_int32(vals):
+    return len(vals) == 0 or (vals.min() >= INT32.min and vals.max() <= INT32.max)
+
+def compact_series(s, category_ratio=CATEGORY_RATIO):
+    dtype = s.dtype
+    if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype): return s
+    if pd.api.types.is_integer_dtype(dtype):
+        return s.astype(np.int32) if dtype.itemsize > 4 and _fits_int32(s.to_numpy()) else s
+    if pd.api.types.is_float_dtype(dtype):
+        vals = s.to_numpy(dtype='float64', na_value=np.nan)
+        whole = len(vals) and not np.isnan(vals).any() and (vals == np.round(vals)).all() and _fits_int32(vals)
+        return s.astype(np.int32) if whole else s
+    if not (pd.api.types.is_string_dtype(dtype) or dtype == object): return s
+
+    present = s[s.notna()]
+    if dtype == object and not present.map(lambda v: isinstance(v, (str, int, float, np.number))).all(): return s
+    text = s.astype('str')
+    if len(s) and text.nunique() <= category_ratio * len(s): return text.astype('category')
+    return text
+
+def compact_frame(df, category_ratio=CATEGORY_RATIO, keep=()):
+    """컬럼별로 compact_series 를 적용한 새 프레임 (keep 에 든 컬럼은 그대로)."""
+    if df is None: return None
+    out = df.copy(deep=False)
+    for i, c in enumerate(df.columns):
+        if c in keep: continue
+        out.isetitem(i, compact_series(df.iloc[:, i], category_ratio))
+    return out
+
+def parse_dates(s):
+    """pd.to_datetime(s, errors='coerce'). category 컬럼은 고유값만 한 번 파싱해서 펼친다."""
+    if not isinstance(s.dtype, pd.CategoricalDtype): return pd.to_datetime(s, errors='coerce')
+    cats = pd.to_datetime(pd.Series(s.cat.categories, dtype=object), errors='coerce').to_numpy()
+    cats = np.append(cats, np.array(['NaT'], dtype=cats.dtype))  # 코드 -1(결측) → NaT
+    return pd.Series(cats[s.cat.codes.to_numpy()], index=s.index)
@@ -0,0 +1,27 @@
+import os
+
+# ==========================================
+# [설정] 앱과 배치(CLI)가 같이 쓰는 값
+# ==========================================
+# 서버 파일 경로 (자동 로드용)
+SERVER_CONTACT_FILE = "농가관리 목록_20260208 (전체).xlsx"  # 업체 연락처
+SERVER_MEMBER_FILE = "회원관리(전체).xlsx"                # 회원 명부
+
+# ==========================================
+# [중요] 발주 대상 업체 (화이트리스트)
+# ==========================================
+VALID_SUPPLIERS = [
+    "(주)가보트레이딩", "(주)열두달", "(주)우리밀", "(주)윈윈농수산", "(주)유기샘",
+    "(주)케이푸드", "(주)한누리", "G1상사", "mk코리아", "가가호영어조합법인",
+    "고삼농협", "금강향수", "나우푸드", "네니아", "농부생각", "농업회사법인(주)담채원",
+    "당암tf", "더테스트키친", "도마령영농조합법인", "두레생협", "또또푸드", "로엘팩토리",
+    "맛가마", "산백유통", "새롬식품", "생수콩나물영농조합법인", "슈가랩", "씨글로벌(아라찬)",
+    "씨에이치하모니", "언니들공방", "에르코스", "엔젤농장", "우리밀농협", "우신영농조합",
+    "유기농산", "유안컴퍼니", "인터뷰베이커리", "자연에찬", "장수이야기", "제로웨이스트존",
+    "청양농협조합", "청오건강농업회사법인", "청춘농장", "코레드인터내쇼날", "태경F&B",
+    "토종마을", "폴카닷(이은경)", "하대목장", "한산항아리소곡주", "함지박(주)", "행복우리식품영농조합",
+    "지족점(벌크)", "지족(Y)", "지족점_공동구매", "지족점과일", "지족점야채", "지족매장", "지족점정육"
+]
+
+# 관리자 패널(성능 계측) 비밀번호. 비어 있으면 패널을 숨긴다.
+ADMIN_PASSWORD = os.environ.get('POOMASI_ADMIN_PASSWORD', '')
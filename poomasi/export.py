@@ -0,0 +1,132 @@
+import io
+import re
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from .profiling import timed
+
+# ==========================================
+# [발주서 내보내기] xlsxwriter 한 번에 쓰기
+# ==========================================
+# 농가별로 한 번만 묶고(factorize + 정렬), 전체 시트와 농가별 시트를 순서대로 한 번에 쓴다.
+# xlsxwriter 의 constant_memory 모드라 행을 쓰는 즉시 내보내고 메모리에 쌓지 않는다.
+# 값도 CHUNK_ROWS 행씩만 파이썬 객체로 바꿔 쓴다 (프레임 전체를 셀 객체 목록으로 만들지 않음).
+SHEET_NAME_MAX = 31
+CHUNK_ROWS = 4096
+_BAD_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+_BAD_FILE_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+def sanitize_sheet_name(name, used):
+    """엑셀 시트 이름 규칙(31자, 금지문자, 대소문자 무시 중복 금지)에 맞춘다. used 는 소문자 집합."""
+    base = _BAD_SHEET_CHARS.sub('_', str(name)).strip().strip("'") or 'Sheet'
+    base = base[:SHEET_NAME_MAX]
+    candidate, n = base, 1
+    while candidate.lower() in used:
+        n += 1
+        suffix = f"({n})"
+        candidate = base[:SHEET_NAME_MAX - len(suffix)] + suffix
+    used.add(candidate.lower())
+    return candidate
+
+def sanitize_file_name(name, used, ext='.xlsx'):
+    """zip 안 파일 이름용. 경로 구분자·금지문자 제거 후 중복이면 (2), (3)… 을 붙인다."""
+    base = _BAD_FILE_CHARS.sub('_', str(name)).strip().strip('.') or 'file'
+    base = base[:100]
+    candidate, n = base, 1
+    while (candidate + ext).lower() in used:
+        n += 1
+        candidate = f"{base}({n})"
+    used.add((candidate + ext).lower())
+    return candidate + ext
+
+def _column_plan(df):
+    """컬럼별 종류를 한 번만 정한다. 셀마다 타입을 다시 따지지 않기 위함."""
+    plan = []
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_bool_dtype(s): plan.append('bool')
+        elif pd.api.types.is_numeric_dtype(s): plan.append('num')
+        elif pd.api.types.is_datetime64_any_dtype(s): plan.append('date')
+        else: plan.append('obj')
+    return plan
+
+def _chunk_values(s, kind):
+    """컬럼 조각 → (값 목록, 유효 목록)."""
+    if kind == 'num':
+        values = s.to_numpy(dtype='float64', na_value=np.nan)
+        return values.tolist(), np.isfinite(values).tolist()
+    valid = s.notna().to_numpy().tolist()
+    if kind == 'date': return list((s.dt.tz_localize(None) if s.dt.tz else s).dt.to_pydatetime()), valid
+    return s.to_numpy(dtype=object).tolist(), valid
+
+def _iter_rows(df, plan, rows):
+    """rows 위치의 행을 [(열 번호, 값), ...] 으로 하나씩 (빈 칸 제외).
+
+    CHUNK_ROWS 행씩만 파이썬 값으로 바꾸므로 전체 프레임을 한꺼번에 객체로 만들지 않는다.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    for start in range(0, len(rows), CHUNK_ROWS):
+        part = df.iloc[rows[start:start + CHUNK_ROWS]]
+        cols = [_chunk_values(part.iloc[:, c], kind) for c, kind in enumerate(plan)]
+        for k in range(len(part)):
+            yield [(c, values[k]) for c, (values, valid) in enumerate(cols) if valid[k]]
+
+def _write_sheet(wb, name, df, plan, rows, header_fmt, date_fmt):
+    ws = wb.add_worksheet(name)
+    for c, col in enumerate(df.columns): ws.write_string(0, c, str(col), header_fmt)
+    writers = {'num': ws.write_number, 'bool': ws.write_boolean,
+               'date': lambda r, c, v: ws.write_datetime(r, c, v, date_fmt),
+               'obj': lambda r, c, v: ws.write_string(r, c, v) if isinstance(v, str) else ws.write(r, c, v)}
+    write = [writers[kind] for kind in plan]
+    # constant_memory 모드는 행 순서대로 써야 한다
+    for r, cells in enumerate(_iter_rows(df, plan, rows), start=1):
+        for c, v in cells: write[c](r, c, v)
+    return ws
+
+def farmer_groups(df, farmer_col='농가명', count_col='판매건수(인기)'):
+    """(농가명, 행 위치 배열) 목록. 첫 등장 순서 유지, 판매건수 합이 0 이하인 농가는 뺀다."""
+    codes, uniques = pd.factorize(df[farmer_col])
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    bounds = np.searchsorted(sorted_codes, np.arange(len(uniques) + 1))
+    if count_col in df.columns:
+        counts = np.bincount(codes[codes >= 0], weights=pd.to_numeric(df[count_col], errors='coerce').fillna(0).to_numpy()[codes >= 0], minlength=len(uniques))
+    else: counts = np.ones(len(uniques))
+    return [(uniques[g], order[bounds[g]:bounds[g + 1]]) for g in range(len(uniques)) if counts[g] > 0]
+
+def _workbook(target):
+    import xlsxwriter
+    wb = xlsxwriter.Workbook(target, {'constant_memory': True})
+    return wb, wb.add_format({'bold': True, 'border': 1, 'align': 'center'}), wb.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+
+@timed()
+def write_order_workbook(df, farmer_col='농가명', count_col='판매건수(인기)', summary_sheet='전체발주권고'):
+    """전체 시트 + 농가별 시트가 든 발주서 엑셀 (BytesIO)."""
+    output = io.BytesIO()
+    plan = _column_plan(df)
+    wb, header_fmt, date_fmt = _workbook(output)
+    used = set()
+    _write_sheet(wb, sanitize_sheet_name(summary_sheet, used), df, plan, np.arange(len(df)), header_fmt, date_fmt)
+    for farmer, rows in farmer_groups(df, farmer_col, count_col):
+        _write_sheet(wb, sanitize_sheet_name(farmer, used), df, plan, rows, header_fmt, date_fmt)
+    wb.close()
+    output.seek(0)
+    return output
+
+@timed()
+def write_farmer_zip(df, farmer_col='농가명', count_col='판매건수(인기)'):
+    """농가별 발주서를 각각 엑셀 파일로 만들어 zip 으로 묶는다 (공급처 전달용)."""
+    output = io.BytesIO()
+    plan = _column_plan(df)
+    used = set()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for farmer, rows in farmer_groups(df, farmer_col, count_col):
+            buf = io.BytesIO()
+            wb, header_fmt, date_fmt = _workbook(buf)
+            _write_sheet(wb, sanitize_sheet_name(farmer, set()), df, plan, rows, header_fmt, date_fmt)
+            wb.close()
+            zf.writestr(sanitize_file_name(farmer, used), buf.getvalue())
+    output.seek(0)
+    return output
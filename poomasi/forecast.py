@@ -0,0 +1,148 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from .cleaning import clean_numbers
+from .compact import parse_dates
+from .common import detect_columns, detect_date_column, load_data_smart
+from .profiling import timed
+from .sales_agg import KEY_COLS, PartialCache, file_digest
+
+# ==========================================
+# [수요 예측] 품목 × 일자 행렬 + 일괄 모델
+# ==========================================
+# 판매 파일을 (업체, 상품, 일자)별 판매량으로 줄인 뒤 품목 × 일자 밀집 행렬을 만들고,
+# 이동평균 / 단순지수평활 / 요일 계수를 모든 품목에 한 번에(NumPy 배열 연산) 적용한다.
+# 반복문은 일자 방향(수십~수백 번)뿐이고 품목 방향은 전부 벡터 연산이다.
+METHODS = {'ma': '이동평균', 'ses': '지수평활'}
+MIN_SEASON_WEEKS = 2  # 요일 계수는 최소 2주치가 있어야 쓴다
+
+def daily_aggregate(df):
+    """파싱된 판매 프레임 → 업체명/상품명/일자별 판매량. 일자 컬럼이 없으면 None."""
+    s_item, s_qty, _, s_farmer = detect_columns(df.columns.tolist())
+    s_date = detect_date_column(df.columns.tolist())
+    if not (s_item and s_qty and s_date): return None
+    day = parse_dates(df[s_date]).dt.normalize()
+    part = pd.DataFrame({'업체명': df[s_farmer] if s_farmer else '', '상품명': df[s_item],
+                         '일자': day, '판매량': clean_numbers(df[s_qty])})
+    return part[part['일자'].notna()].groupby(KEY_COLS + ['일자'])['판매량'].sum().reset_index()
+
+_daily = PartialCache()
+
+@timed()
+def load_daily(files, cache=_daily):
+    """파일들의 일자별 집계를 합친다. 파일 내용 해시로 캐시."""
+    parts = []
+    for f in files:
+        key = file_digest(f)
+        part = cache.get(key)
+        if part is None:
+            df, _ = load_data_smart(f, 'sales', columns='forecast')
+            part = daily_aggregate(df) if df is not None else None
+            if part is None: return None
+            cache.put(key, part)
+        parts.append(part)
+    if not parts: return None
+    return pd.concat(parts, ignore_index=True).groupby(KEY_COLS + ['일자'])['판매량'].sum().reset_index()
+
+class DemandMatrix:
+    """keys: 품목(업체명, 상품명) 표, days: 연속 일자, qty: [품목 수, 일수] 판매량."""
+
+    def __init__(self, keys, days, qty):
+        self.keys, self.days, self.qty = keys, days, qty
+
+    def head(self, n_days):
+        """앞쪽 n_days 일만 남긴 행렬 (백테스트용, 복사 없음)."""
+        return DemandMatrix(self.keys, self.days[:n_days], self.qty[:, :n_days])
+
+@timed()
+def build_matrix(daily):
+    """일자별 집계 → DemandMatrix. 판매가 없는 날은 0 으로 채운다."""
+    item_codes, keys = pd.MultiIndex.from_frame(daily[KEY_COLS]).factorize()
+    start, end = daily['일자'].min(), daily['일자'].max()
+    days = pd.date_range(start, end, freq='D')
+    day_codes = ((daily['일자'] - start) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+    qty = np.zeros((len(keys), len(days)))
+    np.add.at(qty, (item_codes, day_codes), daily['판매량'].to_numpy(dtype=float))
+    return DemandMatrix(keys.to_frame(index=False, name=KEY_COLS), days, qty)
+
+# ---------- 모델 (모두 [품목, 일자] 배열 단위) ----------
+def weekday_index(qty, days):
+    """품목별 요일 계수 [품목, 7] (평균 1). 2주 미만이거나 판매가 없는 품목은 1."""
+    n, t = qty.shape
+    out = np.ones((n, 7))
+    if t < 7 * MIN_SEASON_WEEKS: return out
+    wd = days.weekday.to_numpy()
+    count = np.bincount(wd, minlength=7)
+    sums = np.stack([qty[:, wd == d].sum(axis=1) for d in range(7)], axis=1)
+    mean_by_day = sums / np.maximum(count, 1)
+    overall = mean_by_day.mean(axis=1, keepdims=True)
+    ok = overall[:, 0] > 0
+    out[ok] = mean_by_day[ok] / overall[ok]
+    return out
+
+def moving_average(qty, window=14):
+    return qty[:, -window:].mean(axis=1)
+
+def exp_smoothing(qty, alpha=0.3):
+    """단순지수평활 수준값. 일자 방향으로만 돌고 품목은 한 번에 갱신한다."""
+    level = qty[:, 0].astype(float).copy()
+    for t in range(1, qty.shape[1]): level += alpha * (qty[:, t] - level)
+    return level
+
+@timed()
+def forecast(matrix, horizon=7, method='ses', alpha=0.3, window=14, seasonal=True, service_level=0.95):
+    """품목별 다음 horizon 일 예측수요 / 안전재고 / 권장발주량."""
+    qty, days = matrix.qty, matrix.days
+    season = weekday_index(qty, days) if seasonal else np.ones((len(qty), 7))
+    wd = days.weekday.to_numpy()
+    base = qty / np.where(season[:, wd] > 0, season[:, wd], 1.0)  # 요일 효과를 뺀 판매량
+    level = moving_average(base, window) if method == 'ma' else exp_smoothing(base, alpha)
+
+    future = (days[-1] + pd.to_timedelta(np.arange(1, horizon + 1), unit='D')).weekday.to_numpy()
+    demand = level * season[:, future].sum(axis=1)
+    sigma = base[:, -window:].std(axis=1)
+    safety = NormalDist().inv_cdf(service_level) * sigma * np.sqrt(horizon)
+    out = matrix.keys.copy()
+    out['예측수요'] = demand
+    out['안전재고'] = safety
+    out['권장발주량'] = np.ceil(np.maximum(demand + safety, 0))
+    return out
+
+# ---------- 백테스트 ----------
+def _score(name, order, actual):
+    total = max(actual.sum(), 1e-9)
+    return {'방법': name, 'MAE': np.abs(order - actual).mean(), 'WAPE': np.abs(order - actual).sum() / total,
+            '품절률': (actual > order).mean(), '과잉수량': np.maximum(order - actual, 0).sum(),
+            '부족수량': np.maximum(actual - order, 0).sum()}
+
+@timed()
+def backtest(matrix, horizon=7, folds=3, safety=1.1, **kw):
+    """마지막 folds 개 구간을 차례로 가리고 발주량을 맞춰 본다.
+
+    기준선은 지금 방식: 직전 horizon 일 판매량 × 안전계수 (올림).
+    """
+    rows = []
+    t = matrix.qty.shape[1]
+    for f in range(folds):
+        cut = t - horizon * (f + 1)
+        if cut < horizon: break
+        hist = matrix.head(cut)
+        actual = matrix.qty[:, cut:cut + horizon].sum(axis=1)
+        rows.append(_score('현재방식(배수)', np.ceil(hist.qty[:, -horizon:].sum(axis=1) * safety), actual))
+        for m, label in METHODS.items():
+            fc = forecast(hist, horizon, method=m, **kw)
+            rows.append(_score(label, fc['권장발주량'].to_numpy(), actual))
+    if not rows: return pd.DataFrame(columns=['방법', 'MAE', 'WAPE', '품절률', '과잉수량', '부족수량'])
+    return pd.DataFrame(rows).groupby('방법', sort=False).mean().reset_index()
+
+def apply_forecast(agg, fc):
+    """발주 표(agg_item)의 발주량을 예측 권장발주량으로 바꾼다. 예측이 없는 품목은 그대로.
+
+    발주 표에는 팔린 품목만 있으므로 예측이 0 으로 떨어져도 최소 1 개는 발주한다 (문자에 '품목: 0' 이 가지 않게).
+    """
+    out = agg.merge(fc[KEY_COLS + ['예측수요', '안전재고', '권장발주량']], on=KEY_COLS, how='left')
+    out['발주량'] = out['권장발주량'].fillna(out['발주량']).clip(lower=1)
+    out['예상매입액'] = out['발주량'] * out['추정매입가']
+    return out.drop(columns=['권장발주량'])
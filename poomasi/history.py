@@ -0,0 +1,240 @@
+import contextlib
+import datetime
+import glob
+import json
+import os
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from .cleaning import clean_numbers
+from .common import detect_columns, detect_date_column, load_data_smart
+from .compact import parse_dates
+from .profiling import timed
+from .sales_agg import file_digest
+
+# ==========================================
+# [판매 이력] 월별 Parquet 로 쌓는 판매 기록
+# ==========================================
+# POS 내보내기 파일을 한 번만 읽어 판매일시 기준 월 폴더(2026-02/part-*.parquet)에 덧붙인다.
+#  - 행 키 = (판매일시, POS번호, 농가명, 품목명, 회원, 수량, 결제금액) 해시 + 같은 키 안에서 몇 번째 줄인지.
+#    기간이 겹치는 파일을 또 넣어도 이미 있는 행은 건너뛰고, 한 영수증에 같은 줄이 두 번 찍힌 건 그대로 둔다.
+#  - 기존 파일은 고치지 않는다. 새 행만 새 part 파일로 쓰므로 하루치를 넣으면 그날 행만큼만 든다.
+#  - 조회는 기간에 걸친 월 폴더만, 필요한 컬럼만 읽는다.
+#  - 앱과 `python -m poomasi ingest` 가 같은 폴더에 쓸 수 있으므로 쓰기는 폴더의 잠금 파일(_lock)로 한 번에 하나씩,
+#    월별 키 캐시는 그 달 part 파일 목록이 바뀌면(다른 프로세스가 썼으면) 새 파일의 키를 다시 읽는다.
+# 저장 컬럼 이름은 POS 내보내기와 같게 맞춘다 (품목명/수량/결제금액/농가명/판매일시/회원) → 기존 집계 함수를 그대로 쓴다.
+DATA_DIR = os.environ.get('POOMASI_DATA_DIR', 'data')
+HISTORY_DIR = os.path.join(DATA_DIR, 'sales')
+MANIFEST = '_ingested.jsonl'
+LOCK_FILE = '_lock'
+
+KEY_FIELDS = ['판매일시', 'POS번호', '농가명', '품목명', '회원', '수량', '결제금액']
+NUMBER_FIELDS = ['기본단가', '판매단가', '수량', '물품가액', '부가세', '할인금액', '결제금액']
+DROP_FIELDS = ['번호']  # 파일마다 새로 매기는 순번이라 저장하지 않음
+KEY_COL = '_key'
+
+def _text(s):
+    """문자 컬럼으로 통일. 숫자로 읽힌 번호(3911.0)는 정수 모양(3911)으로."""
+    if pd.api.types.is_float_dtype(s.dtype) and (s.dropna() == s.dropna().round()).all(): s = s.astype('Int64')
+    return s.astype('str')
+
+def normalize_sales(df):
+    """업로드 판매 프레임 → 저장 형태 (표준 컬럼 이름, 판매일시 datetime, 숫자는 정제). 판매일시 없는 행은 버림.
+
+    (frame, 버린 행 수) 반환. 상품/판매일시 컬럼을 못 찾으면 frame 은 None.
+    """
+    cols = df.columns.tolist()
+    s_item, s_qty, s_amt, s_farmer = detect_columns(cols)
+    s_date = detect_date_column(cols)
+    s_member = next((c for c in cols if any(x in c for x in ['회원', '구매자']) and '번호' not in c), None)
+    if not (s_item and s_date): return None, len(df)
+    rename = {c: name for c, name in [(s_item, '품목명'), (s_qty, '수량'), (s_amt, '결제금액'),
+                                       (s_farmer, '농가명'), (s_date, '판매일시'), (s_member, '회원')] if c}
+    out = {}
+    for c in cols:
+        name = rename.get(c, c)
+        if name in out or name in DROP_FIELDS: continue
+        s = df[c]
+        if name == '판매일시': s = parse_dates(s).astype('datetime64[us]')
+        elif name in NUMBER_FIELDS: s = clean_numbers(s)
+        else: s = _text(s)
+        out[name] = s.to_numpy()
+    frame = pd.DataFrame(out)
+    ok = frame['판매일시'].notna()
+    return frame[ok].reset_index(drop=True), int((~ok).sum())
+
+def row_keys(frame):
+    """행 키 (uint64). 같은 내용의 줄은 등장 순서(0, 1, …)를 섞어 서로 다른 키가 된다."""
+    cols = [c for c in KEY_FIELDS if c in frame.columns]
+    key = frame[cols].copy(deep=False)
+    for c in cols:  # 키 비교용: 공백 제거, 숫자만 있는 번호는 앞의 0 제거 (엑셀 '001' = CSV 1)
+        if pd.api.types.is_string_dtype(key[c].dtype): key[c] = key[c].str.strip().str.replace(r'^0+(?=\d+$)', '', regex=True)
+    base = pd.util.hash_pandas_object(key, index=False).to_numpy()
+    seq = pd.Series(base).groupby(base, sort=False).cumcount().to_numpy()
+    return pd.util.hash_pandas_object(pd.DataFrame({'k': base, 's': seq}), index=False).to_numpy()
+
+try:
+    import fcntl
+
+    def _lock_file(f): fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    def _unlock_file(f): fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_file(f):
+        f.seek(0)
+        while True:
+            try: return msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            except OSError: continue  # LK_LOCK 은 10초 기다린 뒤 실패하므로 다시 시도
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _bounds(start, end):
+    lo = pd.Timestamp(start).normalize() if start is not None else None
+    hi = pd.Timestamp(end).normalize() + pd.Timedelta(days=1) if end is not None else None  # end 는 그날 끝까지
+    return lo, hi
+
+class SalesHistory:
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+        self._keys = {}  # 월 → (읽은 part 파일 목록, 정렬된 키 배열). 그 달 _key 컬럼만 읽어 둠
+        self._lock = threading.RLock()
+        self._lock_depth, self._lock_file = 0, None
+
+    def months(self):
+        if not os.path.isdir(self.root): return []
+        return sorted(d for d in os.listdir(self.root) if len(d) == 7 and d[4] == '-' and os.path.isdir(os.path.join(self.root, d)))
+
+    def parts(self, month):
+        return sorted(glob.glob(os.path.join(self.root, month, 'part-*.parquet')))
+
+    def _month_keys(self, month):
+        """그 달의 키 배열. 디스크의 part 목록이 캐시와 다르면 새로 생긴 part 의 키만 더 읽는다 (없어진 게 있으면 다시 읽음)."""
+        parts = self.parts(month)
+        seen, keys = self._keys.get(month, ((), np.array([], dtype=np.uint64)))
+        if tuple(parts) != seen:
+            if not set(seen) <= set(parts): keys = np.array([], dtype=np.uint64)
+            new = [pd.read_parquet(p, columns=[KEY_COL])[KEY_COL].to_numpy() for p in parts if p not in set(seen)]
+            keys = np.unique(np.concatenate([keys, *new]))
+            self._keys[month] = (tuple(parts), keys)
+        return keys
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """이 프로세스의 스레드끼리 + 같은 폴더를 쓰는 다른 프로세스끼리 쓰기를 한 번에 하나씩 (다시 들어와도 됨)."""
+        with self._lock:
+            if self._lock_depth == 0:
+                os.makedirs(self.root, exist_ok=True)
+                self._lock_file = open(os.path.join(self.root, LOCK_FILE), 'a+b')
+                _lock_file(self._lock_file)
+            self._lock_depth += 1
+            try: yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    _unlock_file(self._lock_file)
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    # ---------- 쓰기 ----------
+    def ingested(self):
+        """이미 넣은 파일 기록 {내용 해시: 기록}."""
+        path = os.path.join(self.root, MANIFEST)
+        if not os.path.exists(path): return {}
+        with open(path, encoding='utf-8') as f: return {r['digest']: r for r in map(json.loads, f) if r}
+
+    @timed()
+    def append(self, frame):
+        """정규화된 프레임에서 아직 없는 행만 월별 part 파일로 쓴다. {월: 새 행 수} 반환."""
+        frame = frame.assign(**{KEY_COL: row_keys(frame)})
+        month = frame['판매일시'].dt.strftime('%Y-%m')
+        added = {}
+        with self._locked():
+            for m, part in frame.groupby(month, sort=True):
+                keys = self._month_keys(m)
+                new = part[~np.isin(part[KEY_COL].to_numpy(), keys)]
+                if new.empty: continue
+                os.makedirs(os.path.join(self.root, m), exist_ok=True)
+                stamp = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
+                target = os.path.join(self.root, m, f"part-{stamp}-{uuid.uuid4().hex[:8]}.parquet")
+                tmp = f"{target}.tmp"
+                new.reset_index(drop=True).to_parquet(tmp, index=False)
+                os.replace(tmp, target)
+                self._keys[m] = (tuple(self.parts(m)), np.union1d(keys, new[KEY_COL].to_numpy()))
+                added[m] = len(new)
+        return added
+
+    def ingest(self, file_obj, name=None, force=False):
+        """POS 내보내기 파일 하나를 넣는다. 같은 내용의 파일은 다시 읽지 않는다 (force=True 면 다시 확인).
+
+        {'file', 'rows', 'new', 'duplicate', 'dropped', 'months', 'skipped', 'error'} 반환.
+        """
+        name = name or getattr(file_obj, 'name', '')
+        digest = file_digest(file_obj)
+        summary = {'file': name, 'rows': 0, 'new': 0, 'duplicate': 0, 'dropped': 0, 'months': {}, 'skipped': False, 'error': None}
+        if not force and digest in self.ingested(): return {**summary, 'skipped': True}
+        df, err = load_data_smart(file_obj, 'sales')
+        frame, dropped = normalize_sales(df) if df is not None else (None, 0)
+        if frame is None: return {**summary, 'error': err or "상품명/판매일시 컬럼 없음"}
+        with self._locked():  # 다른 프로세스가 같은 파일을 그 사이에 넣었으면 건너뜀, 행 추가와 기록은 한 번에
+            if not force and digest in self.ingested(): return {**summary, 'skipped': True}
+            added = self.append(frame)
+            summary.update(rows=len(frame), new=sum(added.values()), dropped=dropped, months=added)
+            summary['duplicate'] = len(frame) - summary['new']
+            with open(os.path.join(self.root, MANIFEST), 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'digest': digest, 'time': datetime.datetime.now().isoformat(timespec='seconds'),
+                                    **{k: summary[k] for k in ('file', 'rows', 'new', 'duplicate')}}, ensure_ascii=False) + '\n')
+        return summary
+
+    # ---------- 읽기 ----------
+    def date_range(self):
+        """저장된 첫 / 마지막 판매일 (없으면 (None, None)). 첫 달과 마지막 달의 판매일시만 읽는다."""
+        months = self.months()
+        if not months: return None, None
+        first = self.query(months[0] + '-01', None, columns=[], months=months[:1])['판매일시']
+        last = self.query(months[-1] + '-01', None, columns=[], months=months[-1:])['판매일시']
+        return first.min().date(), last.max().date()
+
+    def _window_months(self, lo, hi, months=None):
+        return [m for m in (months or self.months())
+                if (lo is None or m >= lo.strftime('%Y-%m')) and (hi is None or m <= (hi - pd.Timedelta(days=1)).strftime('%Y-%m'))]
+
+    def signature(self, start=None, end=None):
+        """기간에 걸친 part 파일 목록. 새 행이 들어오면 바뀌므로 집계 캐시 키로 쓴다."""
+        lo, hi = _bounds(start, end)
+        return tuple(p for m in self._window_months(lo, hi) for p in self.parts(m))
+
+    @timed()
+    def query(self, start=None, end=None, columns=None, months=None, parts=None):
+        """[start, end] 기간(날짜, end 포함)의 판매 행. columns 로 읽을 컬럼을 고른다 (판매일시는 항상 포함).
+
+        기간에 걸친 월 폴더의 part 파일만, 요청한 컬럼만 읽는다. 없는 컬럼은 건너뛴다.
+        parts 를 주면 그 part 파일만 읽는다 (signature() 로 받아 둔 것 중 새로 생긴 것만 읽을 때).
+        """
+        import pyarrow.parquet as pq
+        lo, hi = _bounds(start, end)
+        if parts is None: parts = [p for m in self._window_months(lo, hi, months) for p in self.parts(m)]
+        want = None if columns is None else list(dict.fromkeys(['판매일시', *columns]))
+        frames = []
+        for p in parts:
+            names = pq.read_schema(p).names
+            cols = [c for c in names if c != KEY_COL] if want is None else [c for c in want if c in names]
+            frames.append(pd.read_parquet(p, columns=cols))
+        if not frames: return pd.DataFrame({c: [] for c in (want or ['판매일시'])})
+        df = pd.concat(frames, ignore_index=True)
+        keep = np.ones(len(df), dtype=bool)
+        if lo is not None: keep &= (df['판매일시'] >= lo).to_numpy()
+        if hi is not None: keep &= (df['판매일시'] < hi).to_numpy()
+        return df[keep].sort_values('판매일시', kind='stable').reset_index(drop=True)
+
+_default = None
+
+def get_history():
+    global _default
+    if _default is None: _default = SalesHistory()
+    return _default
@@ -0,0 +1,200 @@
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from . import profiling
+
+# ==========================================
+# [백그라운드 작업] 오래 걸리는 일을 화면 밖에서
+# ==========================================
+# 문자 대량 발송, 장바구니·RFM 분석, 발주서 엑셀 만들기처럼 오래 걸리는 일을 스레드 풀에서 돌린다.
+#  - 작업은 ID 로 등록되고 상태(대기/실행/완료/실패/취소), 진행률, 중간 결과, 최종 결과를 들고 있다.
+#  - 화면은 매 실행(rerun)마다 작업 상태를 읽어 그리기만 하므로 버튼을 눌러도 작업이 끊기지 않는다.
+#  - 같은 세션에서 같은 이름(key)의 작업이 돌고 있으면 새로 띄우지 않고 돌고 있는 작업을 돌려준다.
+# 작업 함수는 첫 인자로 Job 을 받아 job.report(…) / job.publish(…) 로 진행을 알린다. 안에서 st.* 는 부르지 않는다.
+# 파일 파싱처럼 CPU 만 쓰는 일은 안에서 parallel.py 의 프로세스 풀을 그대로 쓴다.
+#   POOMASI_JOB_WORKERS=동시에 돌 작업 수 (기본 4)
+MAX_WORKERS = int(os.environ.get('POOMASI_JOB_WORKERS', 4))
+KEEP_FINISHED = 10         # 세션마다 남겨 두는 끝난 작업 수 (결과를 다시 받을 수 있게)
+FINISHED_TTL = 60 * 60     # 끝난 지 이만큼(초) 지난 작업은 지움
+POLL_SECONDS = 1.0
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+STATUS_LABELS = {QUEUED: '대기 중', RUNNING: '실행 중', DONE: '완료', FAILED: '실패', CANCELLED: '취소됨'}
+
+class Cancelled(Exception):
+    pass
+
+class Job:
+    """등록된 작업 하나. 상태는 작업 스레드가 쓰고 화면 쪽은 읽기만 한다."""
+
+    def __init__(self, session, key, name):
+        self.id = uuid.uuid4().hex[:12]
+        self.session, self.key, self.name = session, key, name
+        self.status = QUEUED
+        self.done_count, self.total, self.message = 0, None, ''
+        self.result, self.error, self.traceback = None, None, None
+        self.created, self.started, self.finished = time.time(), None, None
+        self._partial = {}
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def progress(self):
+        """0~1 (전체 개수를 모르면 None)."""
+        if self.status == DONE: return 1.0
+        return min(self.done_count / self.total, 1.0) if self.total else None
+
+    @property
+    def seconds(self):
+        if self.started is None: return 0.0
+        return (self.finished or time.time()) - self.started
+
+    # ---------- 작업 함수 쪽 ----------
+    def update(self, done, total=None, message=None):
+        """진행 상황만 기록 (취소 확인 없음 — 문자 발송처럼 도중에 끊으면 안 되는 곳에서)."""
+        self.done_count = done
+        if total is not None: self.total = total
+        if message is not None: self.message = message
+
+    def report(self, done, total=None, message=None):
+        """진행 상황 알림. 취소 요청이 있으면 여기서 Cancelled 를 던져 작업을 멈춘다."""
+        self.update(done, total, message)
+        if self._cancel.is_set(): raise Cancelled()
+
+    def publish(self, name, value):
+        """중간 결과를 올린다 (화면은 partial() 로 먼저 보여줄 수 있음)."""
+        with self._lock: self._partial[name] = value
+
+    # ---------- 화면 쪽 ----------
+    def partial(self):
+        with self._lock: return dict(self._partial)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def status_text(self):
+        text = f"{self.name}: {STATUS_LABELS[self.status]}"
+        if self.total: text += f" ({self.done_count:,}/{self.total:,})"
+        if self.message and self.active: text += f" · {self.message}"
+        if self.started: text += f" · {self.seconds:.1f}초"
+        return text
+
+class JobRunner:
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.max_workers = max_workers
+        self._pool = None
+        self._jobs = {}     # 작업 ID → Job
+        self._latest = {}   # (세션, key) → 작업 ID (가장 최근)
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='poomasi-job')
+        return self._pool
+
+    def submit(self, session, key, fn, *args, name=None, **kwargs):
+        """fn(job, *args, **kwargs) 를 풀에서 돌린다. 같은 (세션, key) 작업이 아직 돌고 있으면 그 작업을 돌려준다."""
+        with self._lock:
+            self._prune()
+            running = self._jobs.get(self._latest.get((session, key)))
+            if running is not None and running.active: return running
+            job = Job(session, key, name or key)
+            self._jobs[job.id] = job
+            self._latest[(session, key)] = job.id
+            self._executor().submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _finish(self, job, status):
+        # finished 를 status 보다 먼저 (같은 잠금 안에서) 써야 _prune 이 끝난 작업의 finished=None 을 보지 않는다
+        with self._lock: job.finished, job.status = time.time(), status
+
+    def _run(self, job, fn, args, kwargs):
+        if job._cancel.is_set():
+            self._finish(job, CANCELLED)
+            return
+        job.status, job.started = RUNNING, time.time()
+        profiling.begin_run(f"작업:{job.name}")  # 작업 스레드 안의 @timed 단계는 이 실행으로 기록
+        status = FAILED
+        try:
+            job.result = fn(job, *args, **kwargs)
+            status = DONE
+        except Cancelled:
+            status = CANCELLED
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.traceback = traceback.format_exc()
+        finally:
+            profiling.end_run()
+            self._finish(job, status)
+
+    # ---------- 조회 ----------
+    def get(self, job_id):
+        with self._lock: return self._jobs.get(job_id)
+
+    def latest(self, session, key):
+        """이 세션에서 key 로 띄운 가장 최근 작업 (없으면 None)."""
+        with self._lock: return self._jobs.get(self._latest.get((session, key)))
+
+    def jobs(self, session=None):
+        """작업 목록 (최신 먼저). session 을 주면 그 세션 것만."""
+        with self._lock: jobs = [j for j in self._jobs.values() if session is None or j.session == session]
+        return sorted(jobs, key=lambda j: j.created, reverse=True)
+
+    def forget(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.active: return
+            del self._jobs[job_id]
+            if self._latest.get((job.session, job.key)) == job_id: del self._latest[(job.session, job.key)]
+
+    def _prune(self):
+        # 끝난 작업은 세션마다 최근 KEEP_FINISHED 개, FINISHED_TTL 안의 것만 남긴다 (결과가 메모리를 잡고 있으므로)
+        now, kept = time.time(), {}
+        for job in sorted(self._jobs.values(), key=lambda j: j.created, reverse=True):
+            if job.active or job.finished is None: continue
+            kept[job.session] = kept.get(job.session, 0) + 1
+            if kept[job.session] > KEEP_FINISHED or now - job.finished > FINISHED_TTL:
+                del self._jobs[job.id]
+                if self._latest.get((job.session, job.key)) == job.id: del self._latest[(job.session, job.key)]
+
+_default = None
+_default_lock = threading.Lock()
+
+def get_runner():
+    global _default
+    with _default_lock:
+        if _default is None: _default = JobRunner()
+    return _default
+
+# ---------- 화면 (Streamlit) ----------
+def watch(job, render, every=POLL_SECONDS):
+    """작업 상태를 그린다. 돌고 있는 동안은 이 부분만 every 초마다 다시 그리고, 끝나면 화면 전체를 한 번 다시 그린다.
+
+    render(job) 는 상태·중간 결과·최종 결과를 그리는 함수. (Streamlit 스크립트 안에서 호출)
+    """
+    import streamlit as st
+    polling = job.active
+
+    @st.fragment(run_every=every if polling else None)
+    def _view():
+        render(job)
+        if polling and not job.active: st.rerun()
+    _view()
+
+def status_line(job, cancel=True):
+    """진행 막대 / 상태 문구. cancel=True 면 돌고 있는 동안 취소 버튼도."""
+    import streamlit as st
+    if job.active:
+        st.progress(job.progress or 0.0, text=job.status_text())
+        if cancel and st.button("⏹️ 취소", key=f"job_cancel_{job.id}"): job.cancel()
+    elif job.status == FAILED: st.error(job.status_text() + f" — {job.error}")
+    elif job.status == CANCELLED: st.warning(job.status_text())
+    else: st.caption(job.status_text())
@@ -0,0 +1,120 @@
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .profiling import timed
+from .ref_cache import load_reference, source_signature
+
+# ==========================================
+# [회원 검색 인덱스] 이름 n-gram + 전화번호 뒷자리
+# ==========================================
+# 명부 버전(파일 수정시각·크기)마다 한 번만 만들고 모든 세션이 같이 쓴다.
+# 이름은 글자 1-gram/2-gram 역색인으로 후보를 좁힌 뒤 부분일치를 확인하고,
+# 전화번호는 뒷 4자리 색인 + 숫자 3-gram 역색인으로 찾는다.
+# 순위: 완전일치 < 앞/뒷자리 일치 < 부분일치, 같은 순위는 이름순.
+PHONE_SUFFIX = 4
+EXACT, AFFIX, CONTAINS = 0, 1, 2
+_NON_DIGIT = re.compile(r'\D')
+_EMPTY = np.array([], dtype=np.int32)
+
+def normalize_name(s):
+    return str(s).replace(' ', '').lower()
+
+def _postings(keys_per_row):
+    """행별 키 목록 → {키: 정렬된 행 번호 배열} 역색인."""
+    index = {}
+    for i, keys in enumerate(keys_per_row):
+        for k in keys: index.setdefault(k, []).append(i)
+    out = {k: np.array(v, dtype=np.int32) for k, v in index.items()}
+    for v in out.values(): v.flags.writeable = False  # 모든 세션이 같이 쓰는 색인
+    return out
+
+def _grams(s, n):
+    return {s[i:i + n] for i in range(len(s) - n + 1)}
+
+class MemberIndex:
+    def __init__(self, names, phones):
+        self.names = ['' if pd.isna(n) else normalize_name(n) for n in names]
+        self.phones = ['' if pd.isna(p) else _NON_DIGIT.sub('', str(p)) for p in phones]
+        self.size = len(self.names)
+        self.name_uni = _postings(set(n) for n in self.names)
+        self.name_bi = _postings(_grams(n, 2) for n in self.names)
+        self.phone_tri = _postings(_grams(p, 3) for p in self.phones)
+        self.phone_suffix = _postings([p[-PHONE_SUFFIX:]] if len(p) >= PHONE_SUFFIX else [] for p in self.phones)
+        # 같은 순위 안에서는 이름순 (미리 정렬 순번을 만들어 둠)
+        self.name_order = np.empty(self.size, dtype=np.int64)
+        self.name_order[np.argsort(np.array(self.names, dtype=object), kind='stable')] = np.arange(self.size)
+
+    @staticmethod
+    def _intersect(index, grams):
+        lists = sorted((index.get(g, _EMPTY) for g in grams), key=len)
+        if not lists: return _EMPTY
+        out = lists[0]
+        for other in lists[1:]:
+            if len(out) == 0: break
+            out = np.intersect1d(out, other, assume_unique=True)
+        return out
+
+    def _match_names(self, q):
+        cand = self.name_uni.get(q, _EMPTY) if len(q) == 1 else self._intersect(self.name_bi, _grams(q, 2))
+        rows, ranks = [], []
+        for i in cand.tolist():
+            n = self.names[i]
+            if q not in n: continue
+            rows.append(i)
+            ranks.append(EXACT if n == q else AFFIX if n.startswith(q) else CONTAINS)
+        return rows, ranks
+
+    def _match_phones(self, d):
+        rows, ranks = [], []
+        if len(d) == PHONE_SUFFIX:
+            for i in self.phone_suffix.get(d, _EMPTY).tolist(): rows.append(i); ranks.append(AFFIX)
+        if len(d) >= 3: cand = self._intersect(self.phone_tri, _grams(d, 3))
+        else: cand = np.array([i for i, p in enumerate(self.phones) if d in p], dtype=np.int32)
+        for i in cand.tolist():
+            p = self.phones[i]
+            if d not in p: continue
+            rows.append(i)
+            ranks.append(EXACT if p == d else AFFIX if p.endswith(d) else CONTAINS)
+        return rows, ranks
+
+    @timed()
+    def search(self, query, limit=100):
+        """(행 번호 배열, 전체 일치 수). 행 번호는 순위순이며 최대 limit개."""
+        q = normalize_name(query)
+        if not q: return _EMPTY, 0
+        rows, ranks = self._match_names(q)
+        digits = _NON_DIGIT.sub('', q)
+        if digits and len(digits) == len(q.replace('-', '')):  # 숫자(와 '-')만 입력했으면 전화번호 검색
+            r, k = self._match_phones(digits)
+            rows += r; ranks += k
+        if not rows: return _EMPTY, 0
+        rows, ranks = np.array(rows, dtype=np.int64), np.array(ranks)
+        # 행마다 가장 좋은 순위만 남김
+        order = np.lexsort((ranks, rows))
+        rows, ranks = rows[order], ranks[order]
+        first = np.r_[True, rows[1:] != rows[:-1]]
+        rows, ranks = rows[first], ranks[first]
+        order = np.lexsort((self.name_order[rows], ranks))
+        return rows[order][:limit], len(rows)
+
+_memo = {}
+_lock = threading.Lock()
+
+@timed()
+def load_member_index(path):
+    """회원 명부 + 검색 인덱스. 명부 파일이 바뀔 때만 다시 만든다. (df, index, err) 반환."""
+    if not os.path.exists(path): return None, None, "파일 없음"
+    key, sig = os.path.abspath(path), source_signature(path)
+    with _lock:
+        hit = _memo.get(key)
+        if hit and hit[0] == sig: return hit[1].copy(deep=False), hit[2], None
+    df, err = load_reference(path, 'member')
+    if df is None: return None, None, err
+    index = MemberIndex(df['clean_name'] if 'clean_name' in df.columns else [''] * len(df),
+                        df['clean_phone'] if 'clean_phone' in df.columns else [''] * len(df))
+    with _lock: _memo[key] = (sig, df, index)
+    return df.copy(deep=False), index, None
@@ -0,0 +1,272 @@
+import datetime
+import hashlib
+import os
+import sqlite3
+import threading
+
+from .profiling import timed
+
+# ==========================================
+# [발송함] SQLite 기반 문자 발송 기록
+# ==========================================
+# 모든 문자는 멱등 키(종류 + 업체/수신자 + 내용 해시 + 날짜)로 한 줄씩 기록된다.
+#  - 같은 키는 다시 넣어도 무시되므로 재실행·새로고침해도 중복 발송이 없고
+#  - 대량 발송이 중간에 끊기면 pending 으로 남은 것만 이어서 보내면 된다.
+# 여러 직원(세션)이 같은 파일을 보므로 "발송 완료" 상태가 바로 공유된다.
+DATA_DIR = os.environ.get('POOMASI_DATA_DIR', 'data')
+OUTBOX_PATH = os.path.join(DATA_DIR, 'outbox.sqlite3')
+
+PENDING, SENDING, SENT, FAILED = 'pending', 'sending', 'sent', 'failed'
+SENDING_TIMEOUT = 15 * 60  # 초. 'sending' 이 이보다 오래되면 발송하던 프로세스가 죽은 것으로 보고 다시 보낼 수 있게 함
+UNKNOWN = 'unknown'  # 응답을 못 받음(읽기 타임아웃·5xx) → 나갔을 수 있어서 자동으로 다시 보내지 않음, 상세 조회로 확인
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    idem_key    TEXT NOT NULL UNIQUE,
+    kind        TEXT NOT NULL,
+    campaign    TEXT,
+    target      TEXT NOT NULL,
+    receiver    TEXT NOT NULL,
+    text        TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    day         TEXT NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'pending',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    message_id  TEXT,
+    error       TEXT,
+    created_at  TEXT NOT NULL,
+    updated_at  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_outbox_lookup ON outbox (kind, day, status, target);
+CREATE INDEX IF NOT EXISTS ix_outbox_campaign ON outbox (campaign, status);
+"""
+
+def content_hash(text):
+    return hashlib.sha1(str(text).encode('utf-8')).hexdigest()[:16]
+
+def idempotency_key(kind, target, text, day):
+    return hashlib.sha1(f"{kind}|{target}|{content_hash(text)}|{day}".encode('utf-8')).hexdigest()
+
+def today():
+    return datetime.date.today().isoformat()
+
+def _now(offset=0):
+    return (datetime.datetime.now() - datetime.timedelta(seconds=offset)).isoformat(timespec='seconds')
+
+def _result_status(ok, unknown=False):
+    return SENT if ok else UNKNOWN if unknown else FAILED
+
+class Outbox:
+    def __init__(self, path=OUTBOX_PATH):
+        self.path = path
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def connect(self):
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    d = os.path.dirname(self.path)
+                    if d: os.makedirs(d, exist_ok=True)
+                    with sqlite3.connect(self.path, timeout=30) as con:
+                        con.execute("PRAGMA journal_mode=WAL")
+                        con.executescript(SCHEMA)
+                    self._ready = True
+        con = sqlite3.connect(self.path, timeout=30)
+        con.row_factory = sqlite3.Row
+        return con
+
+    # ---------- 기록 ----------
+    def enqueue(self, messages, kind, campaign=None, day=None):
+        """messages: [(target, receiver, text), ...] → 같은 순서의 멱등 키 목록. 이미 있는 키는 그대로 둔다."""
+        day = day or today()
+        now = _now()
+        rows, keys = [], []
+        for target, receiver, text in messages:
+            key = idempotency_key(kind, target, text, day)
+            keys.append(key)
+            rows.append((key, kind, campaign, str(target), str(receiver), text, content_hash(text), day, now, now))
+        con = self.connect()
+        try:
+            with con:
+                con.executemany("""INSERT OR IGNORE INTO outbox
+                    (idem_key, kind, campaign, target, receiver, text, content_hash, day, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", rows)
+        finally: con.close()
+        return keys
+
+    def enqueue_one(self, kind, target, receiver, text, campaign=None, day=None):
+        return self.enqueue([(target, receiver, text)], kind, campaign, day)[0]
+
+    def claim(self, keys, from_status=(PENDING, FAILED), stale_after=SENDING_TIMEOUT):
+        """keys 를 'sending' 으로 바꾸고 실제로 바꾼 키만 돌려준다 (다른 세션과 동시에 보내도 한 번만).
+
+        stale_after 초보다 오래 'sending' 에 머문 키도 가져온다. 발송 한 번은 타임아웃·재시도를 다 해도
+        이보다 훨씬 짧고, 응답을 못 받은 건은 'unknown' 으로 따로 남으므로 이런 키는 기록 전에 멈춘 것이다.
+        """
+        claimed = []
+        marks = ','.join('?' * len(from_status))
+        stale = _now(stale_after) if stale_after else ''
+        con = self.connect()
+        try:
+            with con:
+                for k in keys:
+                    cur = con.execute(f"""UPDATE outbox SET status = ?, attempts = attempts + 1, updated_at = ?
+                        WHERE idem_key = ? AND (status IN ({marks}) OR (status = ? AND updated_at < ?))""",
+                        (SENDING, _now(), k, *from_status, SENDING, stale))
+                    if cur.rowcount: claimed.append(k)
+        finally: con.close()
+        return claimed
+
+    def release(self, keys, error):
+        """claim 했지만 결과를 기록하지 못한 키 ('sending' 인 것만) → 'unknown'.
+
+        보내는 도중에 끊긴 배치는 이미 나갔을 수 있어서 다시 보내지 않고 확인 대상으로 남긴다.
+        """
+        if not keys: return
+        con = self.connect()
+        try:
+            with con:
+                con.executemany("UPDATE outbox SET status = ?, error = ?, updated_at = ? WHERE idem_key = ? AND status = ?",
+                                [(UNKNOWN, error, _now(), k, SENDING) for k in keys])
+        finally: con.close()
+
+    def mark(self, key, ok, message_id=None, error=None, receiver=None, unknown=False):
+        con = self.connect()
+        try:
+            with con:
+                con.execute("""UPDATE outbox SET status = ?, message_id = ?, error = ?,
+                    receiver = COALESCE(?, receiver), updated_at = ? WHERE idem_key = ?""",
+                    (_result_status(ok, unknown), message_id, error, receiver, _now(), key))
+        finally: con.close()
+
+    def mark_many(self, results):
+        """results: [(key, ok, message_id, error) 또는 (key, ok, message_id, error, unknown), ...]"""
+        now = _now()
+        con = self.connect()
+        try:
+            with con:
+                con.executemany("UPDATE outbox SET status = ?, message_id = ?, error = ?, updated_at = ? WHERE idem_key = ?",
+                                [(_result_status(r[1], r[4] if len(r) > 4 else False), r[2], r[3], now, r[0]) for r in results])
+        finally: con.close()
+
+    # ---------- 조회 ----------
+    def pending_keys(self, kind=None, day=None, statuses=(PENDING, FAILED)):
+        """보낼 차례인 키 목록 (id 순). kind / day 로 좁힌다."""
+        where, params = [f"status IN ({','.join('?' * len(statuses))})"], list(statuses)
+        if kind is not None: where.append("kind = ?"); params.append(kind)
+        if day is not None: where.append("day = ?"); params.append(day)
+        con = self.connect()
+        try: return [r['idem_key'] for r in con.execute(f"SELECT idem_key FROM outbox WHERE {' AND '.join(where)} ORDER BY id", params)]
+        finally: con.close()
+
+    def statuses(self, keys):
+        if not keys: return {}
+        con = self.connect()
+        try:
+            out = {}
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                q = f"SELECT idem_key, status FROM outbox WHERE idem_key IN ({','.join('?' * len(chunk))})"
+                out.update({r['idem_key']: r['status'] for r in con.execute(q, chunk)})
+            return out
+        finally: con.close()
+
+    def stale_sending(self, keys, stale_after=SENDING_TIMEOUT):
+        """keys 중 stale_after 초보다 오래 'sending' 에 머문 키 집합."""
+        if not keys: return set()
+        con = self.connect()
+        try:
+            out = set()
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                q = f"SELECT idem_key FROM outbox WHERE status = ? AND updated_at < ? AND idem_key IN ({','.join('?' * len(chunk))})"
+                out.update(r['idem_key'] for r in con.execute(q, [SENDING, _now(stale_after), *chunk]))
+            return out
+        finally: con.close()
+
+    def sent_targets(self, kind, day=None):
+        """오늘(day) 발송 완료된 업체/수신자 집합."""
+        con = self.connect()
+        try:
+            rows = con.execute("SELECT DISTINCT target FROM outbox WHERE kind = ? AND day = ? AND status = ?",
+                               (kind, day or today(), SENT))
+            return {r['target'] for r in rows}
+        finally: con.close()
+
+    def rows(self, keys=None, campaign=None, status=None):
+        con = self.connect()
+        try:
+            where, params = [], []
+            if campaign is not None: where.append("campaign = ?"); params.append(campaign)
+            if status is not None: where.append("status = ?"); params.append(status)
+            if keys is None: chunks = [None]
+            else: chunks = [keys[i:i + 500] for i in range(0, len(keys), 500)]
+            out = []
+            for chunk in chunks:
+                w, p = list(where), list(params)
+                if chunk is not None:
+                    w.append(f"idem_key IN ({','.join('?' * len(chunk))})"); p.extend(chunk)
+                q = "SELECT * FROM outbox" + (" WHERE " + " AND ".join(w) if w else "") + " ORDER BY id"
+                out.extend(dict(r) for r in con.execute(q, p))
+            return out
+        finally: con.close()
+
+    # ---------- 발송 ----------
+    @timed()
+    def send_pending(self, dispatcher, keys, retry_failed=True, on_progress=None):
+        """keys 중 아직 안 보낸 것만 dispatcher 로 보내고 결과를 기록한다.
+
+        dispatcher 한 바퀴 분량씩 끊어서 보내고 배치가 끝날 때마다 바로 기록하므로, 중간에 끊겨도 다시 부르면
+        남은 것부터 이어진다. 'unknown'(응답을 못 받음)은 실제로 나갔을 수 있어서 자동으로 다시 보내지 않고,
+        'sending' 은 SENDING_TIMEOUT 이 지나야 다시 보낸다 (다른 세션이 보내는 중일 수 있으므로).
+        dispatcher 가 예외를 던지면 결과를 기록하지 못한 키만 'unknown' 으로 남기고 예외를 그대로 올린다
+        (그 앞에 끝난 배치는 이미 'sent'/'failed' 로 기록됨).
+        반환: {'sent', 'failed', 'skipped', 'unknown'} 건수.
+        """
+        keys = list(dict.fromkeys(keys))
+        from_status = (PENDING, FAILED) if retry_failed else (PENDING,)
+        status = self.statuses(keys)
+        stale = self.stale_sending([k for k in keys if status.get(k) == SENDING])
+        todo = [k for k in keys if status.get(k) in from_status or k in stale]
+        summary = {'sent': 0, 'failed': 0,
+                   'skipped': sum(1 for k in keys if status.get(k) == SENT),
+                   'unknown': sum(1 for k in keys if status.get(k) in (SENDING, UNKNOWN) and k not in stale)}
+
+        step = max(1, dispatcher.batch_size * dispatcher.max_workers)
+        done = 0
+        for i in range(0, len(todo), step):
+            chunk = self.claim(todo[i:i + step], from_status)
+            if chunk:
+                by_key = {r['idem_key']: r for r in self.rows(keys=chunk)}
+                offset = done
+                progress = (lambda d, t, o=offset: on_progress(o + d, len(todo))) if on_progress else None
+                results = [None] * len(chunk)
+
+                def record(positions, res, chunk=chunk, results=results):
+                    self.mark_many([(chunk[j], r['ok'], r.get('message_id'), r.get('error'), r.get('unknown', False)) for j, r in zip(positions, res)])
+                    for j, r in zip(positions, res): results[j] = r
+
+                try: returned = dispatcher.send_messages([(by_key[k]['receiver'], by_key[k]['text']) for k in chunk], on_progress=progress, on_result=record)
+                except BaseException as e:
+                    # 도중에 끊긴 배치는 나갔는지 알 수 없음 → 기록 못 한 키만 'unknown' (다시 보내면 중복일 수 있음)
+                    self.release(chunk, f"발송 중 오류: {type(e).__name__}: {e}")
+                    raise
+                missing = [j for j, r in enumerate(results) if r is None]
+                if missing: record(missing, [returned[j] for j in missing])
+                ok = sum(1 for r in results if r['ok'])
+                unknown = sum(1 for r in results if not r['ok'] and r.get('unknown'))
+                summary['sent'] += ok
+                summary['unknown'] += unknown
+                summary['failed'] += len(results) - ok - unknown
+            done += len(todo[i:i + step])
+            if on_progress: on_progress(done, len(todo))
+        return summary
+
+_default = None
+
+def get_outbox():
+    global _default
+    if _default is None: _default = Outbox()
+    return _default
@@ -0,0 +1,96 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from .common import load_data_smart
+from .profiling import timed
+from .sales_agg import KEY_COLS, SUM_COLS, _cache, partial_aggregate, read_bytes
+
+# ==========================================
+# [병렬 파싱] 여러 판매 파일을 프로세스 풀로
+# ==========================================
+# openpyxl 파싱은 CPU 를 많이 쓰고 GIL 때문에 스레드로는 빨라지지 않는다.
+# 캐시에 없는 파일만 골라 프로세스 풀에 나눠 주고, 워커는 부분 집계를
+# (코드 배열 + 고유값 목록 + 숫자 배열) 형태로 돌려준다. 순서는 입력 순서 그대로.
+MAX_WORKERS = int(os.environ.get('POOMASI_PARSE_WORKERS', min(os.cpu_count() or 1, 4)))
+
+_pool = None
+_pool_broken = False  # 풀을 한 번 못 띄운 환경이면 이후로는 직렬로만
+_pool_lock = threading.Lock()
+
+def encode_partial(part):
+    out = {}
+    for c in KEY_COLS:
+        codes, uniques = pd.factorize(part[c])
+        out[c] = (codes.astype(np.int32), list(uniques))
+    for c in SUM_COLS: out[c] = part[c].to_numpy(dtype='float64')
+    return out
+
+def decode_partial(payload):
+    cols = {}
+    for c in KEY_COLS:
+        codes, uniques = payload[c]
+        cols[c] = np.asarray(uniques, dtype=object)[codes]
+    for c in SUM_COLS: cols[c] = payload[c]
+    return pd.DataFrame(cols)
+
+def _parse_bytes(data):
+    # 워커 프로세스에서 실행: 파싱 + 헤더 감지 + 정제 + 부분 집계
+    df, err = load_data_smart(io.BytesIO(data), 'sales', columns='order')
+    if df is None: return None, err
+    part = partial_aggregate(df)
+    if part is None: return None, "필수 컬럼 없음"
+    return encode_partial(part), None
+
+def _get_pool(max_workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Streamlit 서버는 스레드가 많아 fork 대신 spawn 으로 띄운다 (한 번 띄운 풀은 재사용)
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+def _reset_pool(broken=False):
+    global _pool, _pool_broken
+    with _pool_lock:
+        if _pool is not None: _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        _pool_broken = _pool_broken or broken
+
+def parse_many(datas, max_workers=MAX_WORKERS, parallel=True):
+    """바이트 목록 → [(부분 집계, 오류), ...] (입력 순서). 풀을 못 쓰면 직렬로 처리."""
+    results = None
+    if parallel and not _pool_broken and max_workers > 1 and len(datas) > 1:
+        try:
+            pool = _get_pool(max_workers)
+            results = list(pool.map(_parse_bytes, datas))
+        except (BrokenProcessPool, OSError, RuntimeError):
+            _reset_pool(broken=True)
+            results = None
+    if results is None: results = [_parse_bytes(d) for d in datas]
+    return [(decode_partial(p) if p is not None else None, err) for p, err in results]
+
+@timed()
+def load_partials(files, max_workers=MAX_WORKERS, parallel=True, cache=_cache):
+    """sales_agg.load_partial 의 여러 파일 버전. 캐시에 없는 파일만 병렬로 파싱."""
+    out = [None] * len(files)
+    misses = []
+    for i, f in enumerate(files):
+        data = read_bytes(f)
+        key = hashlib.sha1(data).hexdigest()
+        hit = cache.get(key) if cache is not None else None
+        if hit is not None: out[i] = (hit, None)
+        else: misses.append((i, key, data))
+
+    parsed = parse_many([data for _, _, data in misses], max_workers=max_workers, parallel=parallel)
+    for (i, key, _), (part, err) in zip(misses, parsed):
+        if part is not None and cache is not None: cache.put(key, part)
+        out[i] = (part, err)
+    return out
@@ -0,0 +1,268 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from .common import clean_phone_number, detect_columns, load_data_smart
+from .config import SERVER_CONTACT_FILE, SERVER_MEMBER_FILE, VALID_SUPPLIERS
+from .parallel import load_partials
+from .sales_agg import PartialCache, apply_order_params, classify_and_join, merge_partials, partial_aggregate, vendor_index
+from .suppliers import get_supplier_resolver
+
+# ==========================================
+# [파이프라인] 화면 없이 도는 발주 / 마케팅 흐름
+# ==========================================
+# 로드 → 컬럼 감지 → 정제 → 집계 → 발주 문자 까지를 Streamlit 없이 부를 수 있게 묶는다.
+# 두 Streamlit 앱과 배치 CLI(python -m poomasi)가 같은 함수를 쓴다.
+# 파일 대신 판매 이력(poomasi.history)의 기간을 넘기면 그 기간 월 파일의 필요한 컬럼만 읽는다.
+ORDER_GROUPS = {'ext': ["일반업체", "일반업체(강제)"], 'int': ["지족(사입)"]}
+SALES_EXTS = ('.xlsx', '.csv')
+
+def sales_files(paths):
+    """파일/폴더 경로 목록 → 판매 파일 경로 목록 (폴더는 안의 .xlsx/.csv, 이름순, 임시파일 제외)."""
+    out = []
+    for p in paths:
+        if os.path.isdir(p):
+            out += sorted(os.path.join(p, f) for f in os.listdir(p)
+                          if f.lower().endswith(SALES_EXTS) and not f.startswith(('~$', '.')))
+        else: out.append(p)
+    return out
+
+def open_files(paths):
+    files = []
+    for p in paths:
+        with open(p, 'rb') as f:
+            buf = io.BytesIO(f.read())
+        buf.name = os.path.basename(p)
+        files.append(buf)
+    return files
+
+def load_sales(files, parallel=True):
+    """판매 파일들 → (업체, 상품)별 합계와 파일별 오류 목록."""
+    results = load_partials(files, parallel=parallel)
+    errors = [(getattr(f, 'name', str(i)), err) for i, (f, (part, err)) in enumerate(zip(files, results)) if part is None]
+    return merge_partials([part for part, _ in results]), errors
+
+# ---------- 판매 이력 (기간 조회) ----------
+ORDER_COLUMNS = ['농가명', '품목명', '수량', '결제금액']
+MEMBER_COLUMNS = ['회원', '품목명', '결제금액']
+_window_aggs = PartialCache(maxsize=16)
+
+def history_frame(start, end, columns=None, history=None):
+    """판매 이력에서 [start, end] 기간의 행 (판매일시 + columns)."""
+    from .history import get_history
+    return (history or get_history()).query(start, end, columns)
+
+def load_sales_window(start, end, history=None):
+    """판매 이력 기간 → load_sales 와 같은 (합계, 오류 목록). 이력이 바뀌지 않으면 캐시된 합계."""
+    from .history import get_history
+    history = history or get_history()
+    key = (str(start), str(end), history.signature(start, end))
+    agg = _window_aggs.get(key)
+    if agg is None:
+        df = history.query(start, end, ORDER_COLUMNS)
+        agg = partial_aggregate(df) if len(df) else None
+        if agg is None: return None, [('판매 이력', f"{start} ~ {end} 기간에 판매 기록이 없습니다.")]
+        _window_aggs.put(key, agg)
+    return agg.copy(deep=False), []
+
+_rfm_states = PartialCache(maxsize=16)
+
+def rfm_state_window(start, end, history=None):
+    """판매 이력 [start, end] 기간의 회원 상태 (rfm.build_state 결과).
+
+    지난번에 본 part 파일은 다시 읽지 않고 새로 생긴 part 의 행만 update_state 로 합친다.
+    새 행이 기존 마지막 방문보다 앞선 날짜를 담고 있거나(과거 파일을 넣은 경우) part 가 바뀌었으면 다시 만든다.
+    """
+    from .history import get_history
+    from .rfm import STATE_COLS, build_state, update_state
+    history = history or get_history()
+    key = (history.root, str(start), str(end))
+    parts = history.signature(start, end)
+    cached = _rfm_states.get(key)
+    if cached is not None and cached[0] == parts: return cached[1]
+    state = None
+    if cached is not None and set(cached[0]) <= set(parts):
+        seen, old = set(cached[0]), cached[1]
+        new = history.query(start, end, MEMBER_COLUMNS, parts=[p for p in parts if p not in seen])
+        if '회원' not in new.columns: new = new.assign(회원=pd.Series(dtype=object))
+        new = new[new['회원'].notna()]
+        if new.empty: state = old
+        elif old.empty or new['판매일시'].min().normalize() >= old['마지막방문'].max().normalize():
+            state = update_state(old, new)
+    if state is None:
+        df = history.query(start, end, MEMBER_COLUMNS)
+        state = build_state(df) if '회원' in df.columns else pd.DataFrame(columns=STATE_COLS)
+    _rfm_states.put(key, (parts, state))
+    return state
+
+def order_table(agg_sales, safety=1.1, purchase_rate=0.7, show_all=False, resolver=None):
+    """합계 → 업체 구분·연락처·발주량이 붙은 발주 표 (앱의 agg_item)."""
+    resolver = resolver or get_supplier_resolver(VALID_SUPPLIERS, SERVER_CONTACT_FILE)
+    return apply_order_params(classify_and_join(agg_sales, resolver, show_all), safety, purchase_rate)
+
+def forecast_orders(agg_item, files, horizon=7, method='ses', service_level=0.95, window=None):
+    """발주량을 수요예측 권장량으로 바꾼다. 판매일시가 없으면 (원래 표, None).
+
+    window=(start, end) 면 files 대신 판매 이력의 그 기간으로 예측한다.
+    """
+    from .forecast import apply_forecast, build_matrix, daily_aggregate, forecast, load_daily
+    daily = daily_aggregate(history_frame(*window, ORDER_COLUMNS)) if window else load_daily(files)
+    if daily is None: return agg_item, None
+    matrix = build_matrix(daily)
+    return apply_forecast(agg_item, forecast(matrix, horizon, method=method, service_level=service_level)), matrix
+
+def budget_orders(agg_item, budget=None, supplier_min=None):
+    """총액이 예산을 넘거나 업체별 최소 주문금액이 있으면 다시 정하고, 0 이 된 품목은 뺀다.
+
+    예산 안이어도 최소 주문금액을 못 채운 업체는 빠진다. budget=None 이면 예산 제한 없음.
+    """
+    total = agg_item['예상매입액'].sum()
+    if budget is None: budget = total
+    if total <= budget and not supplier_min: return agg_item
+    from .allocation import allocate
+    out = allocate(agg_item, budget, supplier_min=supplier_min)
+    return out[out['발주량'] > 0].reset_index(drop=True)
+
+def run_order(files, safety=1.1, purchase_rate=0.7, show_all=False, horizon=None, method='ses',
+              service_level=0.95, budget=None, supplier_min=None, parallel=True, window=None):
+    """배치용 한 번에 돌리기: 파일(또는 판매 이력 기간 window=(start, end)) → 발주 표. (agg_item, 오류 목록) 반환."""
+    agg_sales, errors = load_sales_window(*window) if window else load_sales(files, parallel=parallel)
+    if agg_sales is None: return None, errors
+    agg_item = order_table(agg_sales, safety, purchase_rate, show_all)
+    if horizon: agg_item, _ = forecast_orders(agg_item, files, horizon, method, service_level, window=window)
+    if budget or supplier_min: agg_item = budget_orders(agg_item, budget or None, supplier_min)
+    return agg_item, errors
+
+def enqueue_orders(agg_item, groups=None, outbox=None, day=None):
+    """업체별 발주 문자를 발송함에 넣는다 (보내지는 않음). (키 목록, 번호 없는 업체 목록) 반환."""
+    from .outbox import get_outbox
+    vidx = vendor_index(agg_item)
+    if groups: vidx = vidx[vidx['구분'].isin(groups)]
+    phones = vidx['전화번호'].map(clean_phone_number)
+    ok = phones.str.len() >= 10
+    messages = list(zip(vidx.index[ok], phones[ok], vidx['메시지'][ok]))
+    keys = (outbox or get_outbox()).enqueue(messages, 'order', campaign='batch', day=day)
+    return keys, vidx.index[~ok].tolist()
+
+def write_order_sheets(agg_item, path=None, per_vendor_zip=False):
+    """발주 표를 업체별 시트 엑셀(또는 업체별 파일 zip)로. path 가 없으면 BytesIO 반환."""
+    from .export import write_farmer_zip, write_order_workbook
+    cols = [c for c in ['구분', '업체명', '상품명', '판매량', '발주량', '추정매입가', '예상매입액', '전화번호'] if c in agg_item.columns]
+    df = agg_item[cols]
+    out = write_farmer_zip(df, '업체명', '발주량') if per_vendor_zip else \
+        write_order_workbook(df, '업체명', '발주량', summary_sheet='전체발주')
+    if path is None: return out
+    with open(path, 'wb') as f: f.write(out.getvalue())
+    return path
+
+# ---------- main.py (기준표 × 판매) ----------
+def popularity_table(df_std, df_sales):
+    """기준표(품목명)에 판매 수량·금액·건수를 붙이고 판매건수 순으로 정렬."""
+    sales_cols = df_sales.columns
+    item_col = '품목명' if '품목명' in sales_cols else '상품명'
+    qty_col = '수량'
+    amt_col = '결제금액' if '결제금액' in sales_cols else '합계'
+
+    sales_summary = df_sales.groupby(item_col)[[qty_col, amt_col]].sum().reset_index()
+    sales_summary.rename(columns={item_col: '품목명', qty_col: '총판매수량', amt_col: '총판매금액'}, inplace=True)
+    sales_count = df_sales[item_col].value_counts().reset_index()
+    sales_count.columns = ['품목명', '판매건수(인기)']
+
+    final_sales = pd.merge(sales_summary, sales_count, on='품목명', how='left')
+    merged_df = pd.merge(df_std, final_sales, on='품목명', how='left')
+    merged_df['총판매수량'] = merged_df['총판매수량'].fillna(0)
+    merged_df['판매건수(인기)'] = merged_df['판매건수(인기)'].fillna(0)
+    return merged_df.sort_values(by='판매건수(인기)', ascending=False)
+
+# ---------- 마케팅 ----------
+def rfm_targets(files, segments, roster_path=SERVER_MEMBER_FILE, window=None):
+    """판매 파일들(또는 판매 이력 기간 window=(start, end)) → 선택한 RFM 세그먼트 회원과 명부 전화번호 (이름/전화번호/세그먼트)."""
+    from .member_search import load_member_index
+    from .rfm import build_state, score_rfm, segment_members
+    if window: state = rfm_state_window(*window)
+    else:
+        frames = [df for df in (load_data_smart(f, 'sales')[0] for f in files) if df is not None and len(df)]
+        if not frames: return pd.DataFrame(columns=['이름', '전화번호', '세그먼트'])
+        df = pd.concat(frames, ignore_index=True)
+        cols = df.columns.tolist()
+        buyer = next((c for c in cols if any(x in c for x in ['회원', '구매자'])), None)
+        when = next((c for c in cols if any(x in c for x in ['판매일시', '일시', '일자'])), None)
+        if not (buyer and when): return pd.DataFrame(columns=['이름', '전화번호', '세그먼트'])
+        state = build_state(df, buyer, when, detect_columns(cols)[2])
+    if state.empty: return pd.DataFrame(columns=['이름', '전화번호', '세그먼트'])
+    seg = segment_members(score_rfm(state), segments)
+    df_mm, _, _ = load_member_index(roster_path)
+    phone = pd.Series(np.nan, index=seg.index, dtype=object)
+    if df_mm is not None and 'clean_name' in df_mm.columns and 'clean_phone' in df_mm.columns:
+        book = df_mm.drop_duplicates('clean_name').set_index('clean_name')['clean_phone']
+        phone = seg['회원'].astype(str).str.replace(' ', '').map(book)
+    return pd.DataFrame({'이름': seg['회원'], '전화번호': phone, '세그먼트': seg['세그먼트']})
+
+def enqueue_marketing(targets, text, campaign, outbox=None, day=None):
+    """마케팅 문자를 발송함에 넣는다. 번호가 없거나 짧은 회원은 뺀다."""
+    from .cleaning import clean_phones
+    from .outbox import content_hash, get_outbox
+    phones = clean_phones(targets['전화번호'])
+    phones = phones[phones.str.len() >= 10].drop_duplicates()
+    return (outbox or get_outbox()).enqueue([(p, p, text) for p in phones], 'marketing',
+                                            campaign=f"{campaign}:{content_hash(text)}", day=day)
+
+# ---------- 백그라운드 작업 (poomasi.jobs) ----------
+# 첫 인자로 Job 을 받아 단계마다 진행률과 중간 결과를 올린다. 화면은 job.partial() 을 그리기만 한다.
+def order_report_job(job, df_std, df_sales):
+    """main.py 발주 탭: 인기 순 발주 표 → 발주서 엑셀. 농가별 zip 은 따로 눌렀을 때만 (farmer_zip_job)."""
+    from .export import write_order_workbook
+    job.report(0, 2, '판매 집계')
+    result_df = popularity_table(df_std, df_sales)
+    job.publish('result', result_df)
+    job.report(1, 2, '발주서 엑셀')
+    job.publish('workbook', write_order_workbook(result_df).getvalue())
+    job.report(2, 2)
+    return job.partial()
+
+def farmer_zip_job(job, result_df):
+    """main.py 발주 탭: 발주 분석 결과 → 농가별 발주서 묶음(zip)."""
+    from .export import write_farmer_zip
+    job.report(0, 1, '농가별 zip')
+    job.publish('zip', write_farmer_zip(result_df).getvalue())
+    job.report(1, 1)
+    return job.partial()
+
+def marketing_report_job(job, df_sales, window=None):
+    """main.py 마케팅 탭: 짝꿍 상품(그림·추천·묶음) → RFM 분포도·세그먼트 요약.
+
+    window=(start, end) 면 RFM 회원 상태는 판매 이력에서 새 행만 합쳐 만든다 (rfm_state_window).
+    """
+    from .basket import build_basket_model, frequent_itemsets
+    from .charts import pair_chart, rfm_chart
+    from .rfm import build_state, score_rfm, segment_summary
+    df_member = df_sales[df_sales['회원'].notna()].copy()
+    df_member['결제금액'] = pd.to_numeric(df_member['결제금액'], errors='coerce').fillna(0)
+    df_member['판매일시'] = pd.to_datetime(df_member['판매일시'])
+
+    job.report(0, 4, '장바구니 분석')
+    model = build_basket_model(df_member)
+    if len(model.pair_count):
+        top_pairs = model.top_pairs(10)
+        df_pairs = pd.DataFrame({'조합': top_pairs['상품A'].astype(str) + " + " + top_pairs['상품B'].astype(str), '횟수': top_pairs['횟수']})
+        job.publish('pairs_png', pair_chart(df_pairs))
+        job.report(1, 4, '추천 짝꿍')
+        job.publish('rules', model.rules(min_count=3, k=3))
+        job.publish('triples', frequent_itemsets(model, min_support=0.002, max_len=3, min_len=3))
+    else: job.publish('pairs_png', None)
+
+    job.report(2, 4, 'RFM')
+    rfm = score_rfm(rfm_state_window(*window) if window else build_state(df_member))
+    job.publish('rfm_summary', segment_summary(rfm))
+    job.report(3, 4, '분포도')
+    job.publish('rfm_png', rfm_chart(rfm))
+    job.report(4, 4)
+    return job.partial()
+
+def send_job(job, dispatcher, keys, outbox=None):
+    """발송함의 keys 를 보낸다. 발송 도중에는 취소를 받지 않는다 (보낸 것과 기록이 어긋나지 않게)."""
+    from .outbox import get_outbox
+    job.publish('keys', keys)
+    return (outbox or get_outbox()).send_pending(dispatcher, keys, on_progress=lambda done, total: job.update(done, total))
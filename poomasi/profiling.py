@@ -0,0 +1,214 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+# ==========================================
+# [계측] 단계별 시간 / 행 수 / 메모리
+# ==========================================
+# 화면 한 번 실행(rerun)마다 주요 단계(파일 읽기, 헤더 찾기, 정제, 집계, 화면 그리기, 문자 발송)의
+# 걸린 시간·결과 행 수·메모리 최고치를 모아 최근 N 번을 프로세스 메모리에 남긴다 (모든 세션 공유).
+# 꺼져 있으면 @timed 는 플래그 하나만 보고 원래 함수를 바로 부른다.
+# 메모리는 tracemalloc 을 켰을 때만 잰다. 프로세스 전체 기준이라 세션이 동시에 돌면 섞일 수 있다.
+#   POOMASI_PROFILE=1 (켜기) / mem (메모리까지), POOMASI_PROFILE_LOG=경로 (JSON-lines 로그, 용량 넘으면 교체)
+HISTORY_SIZE = 50
+LOG_MAX_BYTES = 5 * 2**20
+LOG_BACKUPS = 3
+
+class Settings:
+    enabled = os.environ.get('POOMASI_PROFILE', '') not in ('', '0')
+    log_path = os.environ.get('POOMASI_PROFILE_LOG', '')
+
+settings = Settings()
+if os.environ.get('POOMASI_PROFILE') == 'mem': tracemalloc.start()
+_local = threading.local()
+_history = deque(maxlen=HISTORY_SIZE)
+_open = {}  # 세션 → 아직 안 끝난 실행 (st.stop / st.rerun 으로 끊긴 것은 다음 실행 때 마감)
+_lock = threading.Lock()
+_logger = None
+
+def configure(enabled=None, memory=None, log_path=None):
+    if enabled is not None: settings.enabled = enabled
+    if memory is not None:
+        if memory and not tracemalloc.is_tracing(): tracemalloc.start()
+        elif not memory and tracemalloc.is_tracing(): tracemalloc.stop()
+    if log_path is not None: settings.log_path = log_path
+
+def count_rows(out):
+    """반환값의 행 수. (df, err) 같은 튜플은 첫 값 기준, 길이가 없으면 None."""
+    if isinstance(out, tuple) and out: out = out[0]
+    if out is None or isinstance(out, (str, bytes, dict)) or not hasattr(out, '__len__'): return None
+    return len(out)
+
+class Run:
+    """한 번의 실행에서 기록된 단계 목록."""
+
+    def __init__(self, name, session=None):
+        self.name, self.session = name, session
+        self.started = time.time()
+        self.t0 = self.last = time.perf_counter()
+        self.stages, self.stack = [], []
+        self.seconds, self.interrupted = None, False
+
+    def finish(self, interrupted=False):
+        if self.seconds is not None: return
+        # 끊긴 실행은 마지막 단계가 끝난 시각까지만 센다
+        self.seconds = (self.last if interrupted else time.perf_counter()) - self.t0
+        self.interrupted = interrupted
+        with _lock: _history.append(self)
+        if settings.log_path: _log(self.to_dict())
+
+    def to_dict(self):
+        return {'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)), 'name': self.name,
+                'session': self.session, 'seconds': self.seconds, 'interrupted': self.interrupted,
+                'stages': sorted(self.stages, key=lambda s: s['start'])}
+
+class _Stage:
+    def __init__(self, run, name, rows=None):
+        self.run, self.name, self.rows = run, name, rows
+
+    def __enter__(self):
+        run = self.run
+        self.depth, self.mem0, self.peak = len(run.stack), None, 0  # mem0 None = 메모리 안 잼 (들어올 때 tracemalloc 꺼짐)
+        if tracemalloc.is_tracing():
+            # 안쪽 단계가 peak 를 초기화하므로 바깥 단계의 최고치는 따로 들고 간다
+            current, peak = tracemalloc.get_traced_memory()
+            if run.stack: run.stack[-1].peak = max(run.stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.mem0 = self.peak = current
+        run.stack.append(self)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        run = self.run
+        run.stack.pop()
+        peak_mb = None
+        if self.mem0 is not None and tracemalloc.is_tracing():
+            peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            peak_mb = (peak - self.mem0) / 2**20
+            if run.stack: run.stack[-1].peak = max(run.stack[-1].peak, peak)
+        run.stages.append({'stage': self.name, 'depth': self.depth, 'start': self.t0 - run.t0,
+                           'seconds': end - self.t0, 'rows': self.rows, 'peak_mb': peak_mb})
+        run.last = end
+        return False
+
+class _NullStage:
+    rows = None
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULL = _NullStage()
+
+def stage(name, rows=None):
+    """with stage('이름') as s: ... (s.rows = n 으로 행 수 기록). 꺼져 있거나 실행 밖이면 아무것도 안 함."""
+    run = getattr(_local, 'run', None) if settings.enabled else None
+    return _NULL if run is None else _Stage(run, name, rows)
+
+def timed(name=None, rows=count_rows):
+    """함수 전체를 한 단계로 기록하는 데코레이터. 이름 기본값은 '모듈.함수'."""
+    def deco(fn):
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not settings.enabled: return fn(*args, **kwargs)
+            run = getattr(_local, 'run', None)
+            if run is None: return fn(*args, **kwargs)
+            with _Stage(run, label) as s:
+                out = fn(*args, **kwargs)
+                s.rows = rows(out) if rows else None
+            return out
+        return wrapper
+    return deco
+
+def begin_run(name, session=None):
+    """실행 시작. 같은 세션에서 끝나지 않은 이전 실행은 '중단'으로 마감한다."""
+    with _lock: prev = _open.pop(session, None) if session else None
+    if prev is not None: prev.finish(interrupted=True)
+    if not settings.enabled:
+        _local.run = None
+        return None
+    run = _local.run = Run(name, session)
+    if session:
+        with _lock: _open[session] = run
+    return run
+
+def end_run():
+    run = getattr(_local, 'run', None)
+    _local.run = None
+    if run is None: return None
+    with _lock:
+        if _open.get(run.session) is run: del _open[run.session]
+    run.finish()
+    return run
+
+def history(n=HISTORY_SIZE):
+    """최근 실행 n 개 (최신 먼저)."""
+    with _lock: return list(_history)[::-1][:n]
+
+def clear_history():
+    with _lock: _history.clear()
+
+def _log(record):
+    global _logger
+    with _lock:
+        if _logger is None or _logger.handlers[0].baseFilename != os.path.abspath(settings.log_path):
+            try: os.makedirs(os.path.dirname(os.path.abspath(settings.log_path)), exist_ok=True)
+            except OSError: return
+            _logger = logging.getLogger('poomasi.profile')
+            _logger.propagate = False
+            for h in list(_logger.handlers): _logger.removeHandler(h); h.close()
+            handler = RotatingFileHandler(settings.log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            _logger.addHandler(handler)
+            _logger.setLevel(logging.INFO)
+    _logger.info(json.dumps(record, ensure_ascii=False))
+
+# ---------- 표 (관리자 패널용) ----------
+def stage_table(runs):
+    """실행 목록 → 실행 × 단계 표. 같은 단계를 여러 번 부른 것은 합친다 (시간·행 합, 메모리 최대)."""
+    import pandas as pd
+    rows = [{'실행': f"#{i + 1} {time.strftime('%H:%M:%S', time.localtime(r.started))}",
+             '단계': '  ' * s['depth'] + s['stage'], 'start': s['start'], '초': s['seconds'],
+             '행': s['rows'], '메모리(MB)': s['peak_mb']}
+            for i, r in enumerate(runs) for s in sorted(r.stages, key=lambda s: s['start'])]
+    if not rows: return pd.DataFrame(columns=['실행', '단계', '호출', '초', '행', '메모리(MB)'])
+    df = pd.DataFrame(rows)
+    return df.groupby(['실행', '단계'], sort=False).agg(
+        호출=('초', 'size'), 초=('초', 'sum'), 행=('행', lambda x: x.sum(min_count=1)), **{'메모리(MB)': ('메모리(MB)', 'max')}).reset_index()
+
+def run_table(runs):
+    import pandas as pd
+    return pd.DataFrame([{
+        '실행': f"#{i + 1} {time.strftime('%H:%M:%S', time.localtime(r.started))}", '화면': r.name,
+        '총(초)': r.seconds, '중단': r.interrupted,
+        '가장 느린 단계': max(r.stages, key=lambda s: s['seconds'])['stage'] if r.stages else '',
+    } for i, r in enumerate(runs)])
+
+def sidebar_panel(n_default=10):
+    """사이드바 관리자 패널: 켜기/끄기, 최근 실행 요약, 단계별 시간. (Streamlit 스크립트 안에서 호출)"""
+    import streamlit as st
+    st.checkbox("계측 켜기 (모든 세션)", value=settings.enabled, key='perf_on',
+                on_change=lambda: configure(enabled=st.session_state.perf_on))
+    st.checkbox("메모리도 측정 (느려짐)", value=tracemalloc.is_tracing(), key='perf_mem',
+                on_change=lambda: configure(memory=st.session_state.perf_mem))
+    if settings.log_path: st.caption(f"로그: {settings.log_path}")
+    n = st.number_input("최근 실행 수", min_value=1, max_value=HISTORY_SIZE, value=n_default, key='perf_n')
+    runs = history(n)
+    if not runs:
+        st.caption("기록 없음 (켠 뒤 화면을 한 번 더 실행하면 쌓입니다)")
+        return
+    st.dataframe(run_table(runs), hide_index=True)
+    table = stage_table(runs)
+    pick = st.selectbox("실행 상세", table['실행'].unique().tolist(), key='perf_pick')
+    st.dataframe(table[table['실행'] == pick].drop(columns='실행'), hide_index=True)
+    with st.expander("단계 × 실행 (초)"):
+        st.dataframe(table.pivot_table(index='단계', columns='실행', values='초', aggfunc='sum', sort=False))
+    if st.button("기록 지우기", key='perf_clear'): clear_history()
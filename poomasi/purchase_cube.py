@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from .cleaning import clean_numbers
+from .profiling import timed
+from .sales_agg import PartialCache, file_digest
+
+# ==========================================
+# [구매 큐브] 농가 × 상품 × 구매자
+# ==========================================
+# 판매 파일을 한 번만 정수 코드(농가, 상품, 구매자)로 바꾸고 (농가, 상품, 구매자)별
+# 구매횟수·금액을 희소(COO, 농가→상품→구매자 순 정렬) 형태로 모아 둔다.
+# "농가 X / 상품 Y 를 누가 몇 번 샀나" 는 전체 스캔 + 명부 merge 대신 배열 슬라이스 + bincount 다.
+# 구매자 → 전화번호는 명부 버전이 바뀔 때만 한 번 붙여 둔다.
+
+class PurchaseCube:
+    def __init__(self, farmers, items, buyers, f, i, b, count, amount):
+        self.farmers = np.asarray(farmers, dtype=object)
+        self.items = np.asarray(items, dtype=object)
+        self.buyers = np.asarray(buyers, dtype=object)
+        self.f, self.i, self.b = f, i, b
+        self.count, self.amount = count, amount
+        # 농가별 시작 위치 (f 로 정렬되어 있으므로 농가 선택은 연속 구간)
+        self.farmer_ptr = np.searchsorted(f, np.arange(len(self.farmers) + 1))
+        self.buyer_phone = None
+        self._phone_version = None
+
+    def _rows(self, farmers):
+        codes = self._codes(self.farmers, farmers)
+        if codes is None: return np.arange(len(self.f))
+        return np.concatenate([np.arange(self.farmer_ptr[c], self.farmer_ptr[c + 1]) for c in codes] or [np.array([], dtype=np.int64)])
+
+    @staticmethod
+    def _codes(names, selected):
+        if selected is None: return None
+        lookup = pd.Index(names)
+        codes = lookup.get_indexer(list(selected))
+        return np.unique(codes[codes >= 0])
+
+    def items_for(self, farmers=None):
+        """선택 농가들이 판 상품 목록 (이름순)."""
+        return sorted(self.items[np.unique(self.i[self._rows(farmers)])].tolist())
+
+    def buyers_for(self, farmers=None, items=None, min_count=1):
+        """선택 농가·상품(합집합)을 산 구매자별 구매횟수/구매금액. 구매횟수 내림차순."""
+        rows = self._rows(farmers)
+        item_codes = self._codes(self.items, items)
+        if item_codes is not None and len(rows): rows = rows[np.isin(self.i[rows], item_codes)]
+        n = len(self.buyers)
+        cnt = np.bincount(self.b[rows], weights=self.count[rows], minlength=n)
+        amt = np.bincount(self.b[rows], weights=self.amount[rows], minlength=n)
+        hit = np.flatnonzero((cnt >= max(min_count, 1)))
+        order = np.lexsort((hit, -cnt[hit]))
+        hit = hit[order]
+        out = pd.DataFrame({'회원': self.buyers[hit], '구매횟수': cnt[hit].astype(np.int64), '구매금액': amt[hit]})
+        if self.buyer_phone is not None: out['전화번호'] = self.buyer_phone[hit]
+        return out
+
+    def attach_phones(self, roster, name_col, phone_col, version=None):
+        """구매자 이름(공백 제거) → 명부 전화번호를 미리 붙인다. 같은 명부 버전이면 다시 하지 않는다."""
+        if version is not None and version == self._phone_version: return self
+        keys = pd.Series(self.buyers).astype(str).str.replace(' ', '')
+        book = roster.assign(_key=roster[name_col].astype(str).str.replace(' ', '')).drop_duplicates('_key')
+        self.buyer_phone = keys.map(book.set_index('_key')[phone_col]).to_numpy(dtype=object)
+        self._phone_version = version
+        return self
+
+@timed()
+def build_purchase_cube(df, farmer_col, item_col, buyer_col, amount_col=None):
+    """판매 행 → PurchaseCube. 농가·상품·구매자 중 하나라도 비어 있는 행은 제외 (groupby 와 같음)."""
+    keys = [c for c in (farmer_col, item_col, buyer_col) if c]
+    df = df[df[keys].notna().all(axis=1)]
+    f_codes, farmers = pd.factorize(df[farmer_col].astype(str), sort=True)
+    if item_col: i_codes, items = pd.factorize(df[item_col].astype(str), sort=True)
+    else: i_codes, items = np.zeros(len(df), dtype=np.int64), np.array(['전체'], dtype=object)
+    b_codes, buyers = pd.factorize(df[buyer_col], sort=True)
+    # 코드가 -1 이면 칸 번호가 다른 칸과 겹친다 (python -O 에서도 확인하도록 assert 대신 예외)
+    if (f_codes < 0).any() or (i_codes < 0).any() or (b_codes < 0).any():
+        raise ValueError("농가/상품/구매자 코드에 빈 값이 남아 있습니다.")
+    amount = clean_numbers(df[amount_col]).to_numpy(dtype=float) if amount_col else np.zeros(len(df))
+
+    # (농가, 상품, 구매자) 한 칸으로 묶어 정렬 + 합계
+    n_i, n_b = max(len(items), 1), max(len(buyers), 1)
+    cell = (f_codes.astype(np.int64) * n_i + i_codes) * n_b + b_codes
+    keys, inverse = np.unique(cell, return_inverse=True)
+    count = np.bincount(inverse, minlength=len(keys)).astype(np.float64)
+    total = np.bincount(inverse, weights=amount, minlength=len(keys))
+    b, rest = keys % n_b, keys // n_b
+    return PurchaseCube(farmers, items, buyers, rest // n_i, rest % n_i, b, count, total)
+
+_cubes = PartialCache(maxsize=8)
+
+def load_purchase_cube(file_obj, df, farmer_col, item_col, buyer_col, amount_col=None, cache=_cubes):
+    """업로드 파일 내용 해시 + 컬럼 조합마다 한 번만 만든다 (프로세스 공유)."""
+    key = (file_digest(file_obj), farmer_col, item_col, buyer_col, amount_col)
+    cube = cache.get(key)
+    if cube is None:
+        cube = build_purchase_cube(df, farmer_col, item_col, buyer_col, amount_col)
+        cache.put(key, cube)
+    return cube
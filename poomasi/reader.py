@@ -0,0 +1,103 @@
+import csv
+import io
+
+import pandas as pd
+
+from .profiling import timed
+
+# ==========================================
+# [스트리밍 리더] 헤더 탐색 + 컬럼 투영
+# ==========================================
+# openpyxl read-only 모드로 행을 한 번만 훑는다.
+#  1) 앞쪽 N행을 버퍼링하며 키워드가 2개 이상 들어간 첫 행을 헤더로 잡고
+#  2) 나머지 행은 필요한 컬럼만 골라 컬럼별 버퍼에 바로 쌓는다.
+# 헤더를 못 찾으면 첫 행을 헤더로 쓴다 (pd.read_excel 기본 동작과 같음).
+HEADER_SCAN_ROWS = 20
+
+def clean_header(value):
+    if value is None: return None
+    name = str(value).replace(' ', '').replace('\n', '')
+    if name in ('', 'nan') or name.startswith('Unnamed'): return None
+    return name
+
+@timed()
+def find_header_row(rows, keywords):
+    for idx, row in enumerate(rows):
+        row_str = ' '.join(str(v) for v in row if v is not None)
+        if sum(1 for k in keywords if k in row_str) >= 2: return idx
+    return -1
+
+def _iter_xlsx_rows(file_obj):
+    from openpyxl import load_workbook
+    wb = load_workbook(file_obj, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()  # POS 내보내기 파일은 dimension 정보가 틀린 경우가 많음
+        for row in ws.iter_rows(values_only=True): yield row
+    finally: wb.close()
+
+def _iter_csv_rows(file_obj):
+    if hasattr(file_obj, 'seek'): file_obj.seek(0)
+    text = io.TextIOWrapper(file_obj, encoding='utf-8', newline='')
+    try:
+        for row in csv.reader(text): yield tuple(v if v != '' else None for v in row)
+    finally: text.detach()
+
+def _resolve_projection(header, columns):
+    names = [c for c in header if c is not None]
+    wanted = names if columns is None else columns(names) if callable(columns) else columns
+    wanted = {c for c in wanted if c}
+    return [(p, c) for p, c in enumerate(header) if c in wanted]
+
+def _stream(rows, keywords, header_scan, columns):
+    head = []
+    for row in rows:
+        head.append(row)
+        if len(head) >= header_scan: break
+
+    header_idx = find_header_row(head, keywords)
+    err = None
+    if header_idx == -1:
+        if not head: return None, "헤더 못 찾음"
+        header_idx, err = 0, "헤더 못 찾음(기본로드)"
+
+    header = [clean_header(v) for v in head[header_idx]]
+    keep = _resolve_projection(header, columns)
+    positions = [p for p, _ in keep]
+    buffers = [[] for _ in keep]
+
+    def feed(row):
+        width = len(row)
+        values = [row[p] if p < width else None for p in positions]
+        values = [None if v == '' else v for v in values]  # 빈 문자열은 pandas 처럼 결측 처리
+        if all(v is None for v in values): return
+        for buf, v in zip(buffers, values): buf.append(v)
+
+    for row in head[header_idx + 1:]: feed(row)
+    for row in rows: feed(row)
+
+    df = pd.DataFrame({i: pd.Series(buf) for i, buf in enumerate(buffers)})
+    df.columns = [c for _, c in keep]
+    return df, err
+
+@timed()
+def read_table(file_obj, keywords, header_scan=HEADER_SCAN_ROWS, columns=None):
+    """엑셀(xlsx)/CSV 를 한 번만 읽어 (df, err) 반환.
+
+    columns: 남길 컬럼 이름 목록, 또는 헤더 목록을 받아 남길 컬럼을 돌려주는 함수.
+    """
+    if file_obj is None: return None, "파일 없음"
+    try:
+        if hasattr(file_obj, 'seek'): file_obj.seek(0)
+        return _stream(_iter_xlsx_rows(file_obj), keywords, header_scan, columns)
+    except Exception:
+        pass
+    try:
+        df, err = _stream(_iter_csv_rows(file_obj), keywords, header_scan, columns)
+        if df is not None:
+            for c in df.columns:
+                num = pd.to_numeric(df[c], errors='coerce')
+                if num.notna().sum() == df[c].notna().sum(): df[c] = num
+        return df, err
+    except Exception:
+        return None, "읽기 실패"
@@ -0,0 +1,99 @@
+import glob
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+from .cleaning import clean_phones
+from .common import load_data_smart
+from .compact import compact_frame
+from .profiling import timed
+
+# ==========================================
+# [참조 파일 스냅샷] 업체 연락처 / 회원 명부
+# ==========================================
+# 서버에 놓인 참조 엑셀은 (경로, 수정시각, 크기)가 바뀔 때만 다시 파싱하고,
+# 그 사이에는 정규화된 Parquet 스냅샷(디스크)과 프로세스 메모리에서 바로 꺼내 쓴다.
+CACHE_DIR = os.environ.get('POOMASI_CACHE_DIR', '.cache')
+SNAPSHOT_VERSION = 2  # 로더/정규화 방식이 바뀌면 올려서 기존 스냅샷을 버린다
+
+# 타입별 이름/전화 컬럼 감지 규칙 (app.py 에서 쓰던 것과 동일)
+NAME_KEYS = {'info': ['농가명'], 'member': ['이름', '회원명']}
+PHONE_KEYS = {'info': ['휴대전화', '전화'], 'member': ['휴대전화', '전화']}
+
+_memo = {}
+_lock = threading.Lock()
+
+def source_signature(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+def _snapshot_prefix(path, type):
+    path_hash = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:10]
+    return os.path.join(CACHE_DIR, 'ref', f"v{SNAPSHOT_VERSION}-{type}-{path_hash}")
+
+def find_column(columns, keys):
+    return next((c for c in columns if any(k in c for k in keys)), None)
+
+def normalize_reference(df, type):
+    """감지된 헤더 기준 프레임을 스냅샷 형태로 정규화.
+
+    문자열 컬럼(반복 많은 값은 category) + 미리 만든 clean_name/clean_phone. 프로세스 안에서 한 벌만 두고
+    모든 세션이 얕은 복사로 나눠 쓰므로 값을 직접 바꾸지 않는다.
+    """
+    out = pd.DataFrame(index=pd.RangeIndex(len(df)))
+    seen = {}
+    for i, col in enumerate(df.columns):
+        name = '' if pd.isna(col) else str(col)
+        if name in ('', 'nan'): continue  # 헤더 없는 빈 컬럼
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else: seen[name] = 0
+        out[name] = df.iloc[:, i].astype('string').to_numpy()
+
+    name_col = find_column(out.columns, NAME_KEYS.get(type, []))
+    phone_col = find_column(out.columns, PHONE_KEYS.get(type, []))
+    if name_col: out['clean_name'] = out[name_col].astype(str).str.replace(' ', '')
+    if phone_col: out['clean_phone'] = clean_phones(out[phone_col]).astype('str')
+    return compact_frame(out, keep=('clean_name', 'clean_phone'))
+
+def _write_snapshot(df, prefix, sig):
+    target = f"{prefix}-{sig[0]}-{sig[1]}.parquet"
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, target)
+        for old in glob.glob(f"{prefix}-*.parquet"):
+            if old != target: os.remove(old)
+    except OSError: pass  # 읽기 전용 서버면 메모리 캐시만 사용
+
+@timed()
+def load_reference(path, type='info'):
+    """참조 엑셀을 스냅샷에서 읽는다. 원본이 바뀐 경우에만 다시 파싱. (df, err) 반환."""
+    if not os.path.exists(path): return None, "파일 없음"
+    sig = source_signature(path)
+    key = (os.path.abspath(path), type)
+
+    with _lock:
+        hit = _memo.get(key)
+        if hit and hit[0] == sig: return hit[1].copy(deep=False), None
+
+        prefix = _snapshot_prefix(path, type)
+        snap_path = f"{prefix}-{sig[0]}-{sig[1]}.parquet"
+        df = None
+        if os.path.exists(snap_path):
+            try: df = pd.read_parquet(snap_path)
+            except Exception: df = None
+
+        if df is None:
+            with open(path, 'rb') as f:
+                df_raw, err = load_data_smart(f, type)
+            if df_raw is None or err: return df_raw, err  # 헤더를 못 찾은 파일은 스냅샷하지 않음
+            df = normalize_reference(df_raw, type)
+            _write_snapshot(df, prefix, sig)
+
+        _memo[key] = (sig, df)
+        return df.copy(deep=False), None
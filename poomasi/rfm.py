@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+from .compact import parse_dates
+from .profiling import timed
+
+# ==========================================
+# [RFM] 최근성 / 방문빈도 / 구매금액 + 세그먼트
+# ==========================================
+# 회원별 상태(마지막 방문, 방문일수, 누적 구매액)를 groupby 한 번으로 만들고,
+# 새 판매일이 들어오면 그날 행만 집계해서 기존 상태에 합친다.
+STATE_COLS = ['회원', '첫방문', '마지막방문', '방문횟수', '총구매액']
+SCORE_BINS = 5
+
+# R 점수(행) × F 점수(열) → 세그먼트 (RFM 분석에서 흔히 쓰는 RF 격자)
+SEGMENT_GRID = np.array([
+    # F=1          2            3            4            5
+    ['휴면',       '휴면',       '이탈 위험',   '이탈 위험',   '놓치면 안 될 고객'],  # R=1
+    ['휴면',       '휴면',       '이탈 위험',   '이탈 위험',   '놓치면 안 될 고객'],  # R=2
+    ['잠들기 직전', '잠들기 직전', '관심 필요',   '충성 고객',   '충성 고객'],          # R=3
+    ['유망 고객',   '잠재 충성',   '잠재 충성',   '충성 고객',   '충성 고객'],          # R=4
+    ['신규 고객',   '잠재 충성',   '잠재 충성',   '챔피언',      '챔피언'],            # R=5
+], dtype=object)
+SEGMENTS = list(dict.fromkeys(SEGMENT_GRID[::-1].ravel()))
+
+def _prepare(df, member_col, time_col, amount_col):
+    out = pd.DataFrame({
+        '회원': df[member_col],
+        '판매일시': parse_dates(df[time_col]),
+        '결제금액': pd.to_numeric(df[amount_col], errors='coerce').astype('float64').fillna(0) if amount_col else 0.0,
+    })
+    out = out[out['회원'].notna() & out['판매일시'].notna()]
+    out['date'] = out['판매일시'].dt.normalize()
+    return out
+
+@timed()
+def build_state(df, member_col='회원', time_col='판매일시', amount_col='결제금액'):
+    """판매 행 → 회원별 상태 (groupby 리덕션만 사용)."""
+    d = _prepare(df, member_col, time_col, amount_col)
+    g = d.groupby('회원', sort=False)
+    state = pd.DataFrame({
+        '첫방문': g['판매일시'].min(),
+        '마지막방문': g['판매일시'].max(),
+        '방문횟수': g['date'].nunique(),
+        '총구매액': g['결제금액'].sum(),
+    }).reset_index()
+    return state[STATE_COLS]
+
+def update_state(state, new_rows, member_col='회원', time_col='판매일시', amount_col='결제금액'):
+    """새로 들어온 판매 행만 집계해서 기존 상태에 합친다.
+
+    new_rows 는 아직 합치지 않은 행이어야 한다. 날짜는 기존 마지막 날과 겹쳐도 되고
+    (하루치를 나눠 올리는 경우), 그날은 방문일수에 한 번만 센다.
+    """
+    d = _prepare(new_rows, member_col, time_col, amount_col)
+    if d.empty: return state.copy()
+    # 회원의 기존 마지막 방문일과 같은 날은 이미 센 방문일
+    prev_last = d['회원'].map(state.set_index('회원')['마지막방문'].dt.normalize()) if len(state) else pd.Series(pd.NaT, index=d.index)
+    d['new_day'] = d['date'] != prev_last
+    g = d.groupby('회원', sort=False)
+    inc = pd.DataFrame({
+        '첫방문': g['판매일시'].min(),
+        '마지막방문': g['판매일시'].max(),
+        '방문횟수': d[d['new_day']].groupby('회원', sort=False)['date'].nunique(),
+        '총구매액': g['결제금액'].sum(),
+    })
+    inc['방문횟수'] = inc['방문횟수'].fillna(0).astype(int)
+
+    # 회원 수 만큼의 작은 표끼리 합침 (전체 이력 재계산 없음)
+    g = pd.concat([state, inc.reset_index()], ignore_index=True).groupby('회원', sort=False)
+    out = pd.DataFrame({
+        '첫방문': g['첫방문'].min(),
+        '마지막방문': g['마지막방문'].max(),
+        '방문횟수': g['방문횟수'].sum(),
+        '총구매액': g['총구매액'].sum(),
+    }).reset_index()
+    return out[STATE_COLS]
+
+def _score(values, higher_is_better=True, bins=SCORE_BINS):
+    # 순위 백분위 → 1..bins 점수 (동점이 많아도 qcut 처럼 경계가 겹치지 않음)
+    pct = pd.Series(values).rank(method='average', pct=True, ascending=higher_is_better).to_numpy()
+    return np.clip(np.ceil(pct * bins), 1, bins).astype(int)
+
+@timed()
+def score_rfm(state, as_of=None, bins=SCORE_BINS):
+    """회원 상태 → R/F/M 점수와 세그먼트. as_of 기본값은 가장 최근 판매 시각."""
+    if as_of is None: as_of = state['마지막방문'].max()
+    rfm = pd.DataFrame({
+        '회원': state['회원'].to_numpy(),
+        '최근방문(일전)': (pd.Timestamp(as_of) - state['마지막방문']).dt.days.to_numpy(),
+        '방문횟수': state['방문횟수'].to_numpy(),
+        '총구매액': state['총구매액'].to_numpy(),
+    })
+    if rfm.empty:
+        return rfm.assign(R=pd.Series(dtype=int), F=pd.Series(dtype=int), M=pd.Series(dtype=int), RFM='', 세그먼트='')
+    rfm['R'] = _score(rfm['최근방문(일전)'], higher_is_better=False, bins=bins)
+    rfm['F'] = _score(rfm['방문횟수'], bins=bins)
+    rfm['M'] = _score(rfm['총구매액'], bins=bins)
+    rfm['RFM'] = rfm['R'].astype(str) + rfm['F'].astype(str) + rfm['M'].astype(str)
+    r5 = np.ceil(rfm['R'].to_numpy() * 5 / bins).astype(int) - 1
+    f5 = np.ceil(rfm['F'].to_numpy() * 5 / bins).astype(int) - 1
+    rfm['세그먼트'] = SEGMENT_GRID[r5, f5]
+    return rfm
+
+def segment_summary(rfm):
+    g = rfm.groupby('세그먼트')
+    out = pd.DataFrame({'회원수': g.size(), '평균방문': g['방문횟수'].mean(), '평균구매액': g['총구매액'].mean(),
+                        '평균최근방문(일전)': g['최근방문(일전)'].mean()})
+    return out.reindex([s for s in SEGMENTS if s in out.index]).reset_index()
+
+def segment_members(rfm, segments):
+    """선택한 세그먼트의 회원 목록 (문자 발송 대상용)."""
+    return rfm[rfm['세그먼트'].isin(segments)].sort_values(['R', 'F', 'M'], ascending=False).reset_index(drop=True)
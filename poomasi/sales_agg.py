@@ -0,0 +1,128 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .cleaning import clean_numbers
+from .common import detect_columns, load_data_smart
+from .profiling import timed
+
+# ==========================================
+# [발주 집계] 파일별 부분 집계 캐시
+# ==========================================
+# 판매 파일마다 내용 해시 → (업체, 상품)별 수량·금액 합계를 한 번만 만들어 둔다.
+# 여러 파일의 최종 표는 부분 집계를 다시 더하기만 하면 되고,
+# 업체 구분(모든 데이터 보기)·연락처·안전계수·원가율은 집계된 표 위에서만 계산한다.
+KEY_COLS = ['업체명', '상품명']
+SUM_COLS = ['판매량', '총판매액']
+PARTIAL_CACHE_SIZE = 64
+
+def read_bytes(file_obj):
+    if hasattr(file_obj, 'getvalue'): return file_obj.getvalue()
+    if hasattr(file_obj, 'seek'): file_obj.seek(0)
+    data = file_obj.read()
+    if hasattr(file_obj, 'seek'): file_obj.seek(0)
+    return data
+
+def file_digest(file_obj):
+    return hashlib.sha1(read_bytes(file_obj)).hexdigest()
+
+@timed()
+def partial_aggregate(df):
+    """파싱된 판매 프레임 → 업체명/상품명/판매량/총판매액 부분 집계. 필수 컬럼이 없으면 None."""
+    s_item, s_qty, s_amt, s_farmer = detect_columns(df.columns.tolist())
+    if not (s_item and s_qty and s_amt): return None
+    part = pd.DataFrame({
+        '업체명': df[s_farmer] if s_farmer else '',
+        '상품명': df[s_item],
+        '판매량': clean_numbers(df[s_qty]),
+        '총판매액': clean_numbers(df[s_amt]),
+    })
+    return part.groupby(KEY_COLS)[SUM_COLS].sum().reset_index()
+
+class PartialCache:
+    """내용 해시 → 부분 집계. 프로세스 안에서 모든 세션이 같이 쓴다 (LRU)."""
+
+    def __init__(self, maxsize=PARTIAL_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.items: return None
+            self.items.move_to_end(key)
+            return self.items[key]
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize: self.items.popitem(last=False)
+
+_cache = PartialCache()
+
+def load_partial(file_obj, cache=_cache):
+    """(부분 집계, 오류) 반환. 같은 내용의 파일은 다시 파싱하지 않는다."""
+    key = file_digest(file_obj)
+    hit = cache.get(key)
+    if hit is not None: return hit, None
+    df, err = load_data_smart(file_obj, 'sales', columns='order')
+    if df is None: return None, err
+    part = partial_aggregate(df)
+    if part is None: return None, "필수 컬럼 없음"
+    cache.put(key, part)
+    return part, None
+
+@timed()
+def merge_partials(partials):
+    partials = [p for p in partials if p is not None]
+    if not partials: return None
+    if len(partials) == 1: return partials[0]
+    return pd.concat(partials, ignore_index=True).groupby(KEY_COLS)[SUM_COLS].sum().reset_index()
+
+@timed()
+def classify_and_join(agg, resolver, show_all=False):
+    """업체 구분(지족/일반/제외)과 연락처를 붙이고 제외 업체를 뺀다. 집계된 표 기준이라 가볍다.
+
+    resolver 는 suppliers.SupplierResolver. 고유 업체명만 한 번 풀어서 붙인다.
+    """
+    out = agg.copy()
+    out['clean_farmer'] = out['업체명'].astype(str).str.replace(' ', '')
+    labels, res = resolver.classify(out['업체명'].astype(str), show_all)
+    out['구분'] = labels.to_numpy()
+    out['전화번호'] = res['전화번호'].to_numpy()
+    out['매칭'] = res['매칭'].to_numpy()
+    out['매칭업체'] = res['화이트리스트'].to_numpy()
+    out['연락처명'] = res['연락처명'].to_numpy()
+    out = out[out['구분'] != "제외"]
+    return out[out['판매량'] > 0].reset_index(drop=True)
+
+@timed()
+def apply_order_params(agg, safety, purchase_rate):
+    out = agg.copy()
+    out['평균판매가'] = out['총판매액'] / out['판매량']
+    out['추정매입가'] = out['평균판매가'] * purchase_rate
+    out['발주량'] = np.ceil(out['판매량'] * safety)
+    out['예상매입액'] = out['발주량'] * out['추정매입가']
+    return out
+
+@timed()
+def vendor_index(agg):
+    """업체별 발주 문자·품목 수·연락처·소계를 groupby 한 번으로 미리 만든다 (업체명 순)."""
+    cols = ['구분', '품목수', '전화번호', '소계', '메시지']
+    if agg.empty: return pd.DataFrame(columns=cols, index=pd.Index([], name='업체명'))
+    lines = "- " + agg['상품명'].astype(str) + ": " + agg['발주량'].astype(int).astype(str)
+    phone = agg['전화번호'] if '전화번호' in agg.columns else pd.Series('', index=agg.index)
+    d = pd.DataFrame({'업체명': agg['업체명'], '구분': agg['구분'], 'line': lines, '전화번호': phone,
+                      '소계': agg['발주량'] * agg['추정매입가']})
+    g = d.groupby('업체명', sort=True)
+    # 연락처는 업체의 첫 행 값 (빈 값이어도 그대로)
+    first = d.drop_duplicates('업체명').set_index('업체명')
+    out = pd.DataFrame({'품목수': g.size(), '소계': g['소계'].sum(), 'body': g['line'].agg('\n'.join)})
+    out['구분'] = first['구분']
+    out['전화번호'] = first['전화번호'].fillna('').astype(str)
+    out['메시지'] = "[" + out.index.astype(str) + " 발주]\n" + out['body'] + "\n잘 부탁드립니다!"
+    return out[cols]
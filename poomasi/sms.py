@@ -0,0 +1,225 @@
+import datetime
+import hashlib
+import hmac
+import random
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+from .profiling import timed
+
+# ==========================================
+# [문자 발송] CoolSMS v4
+# ==========================================
+API_BASE = "https://api.coolsms.co.kr"
+TIMEOUT = 10                # 초. 응답 없는 소켓 하나가 전체 발송을 멈추지 않게
+BATCH_SIZE = 500            # send-many 한 번에 담을 수신자 수 (API 한도 10,000)
+MAX_WORKERS = 4             # 동시에 보낼 요청 수
+RATE_PER_SEC = 5.0          # 초당 요청 수 상한
+MAX_RETRIES = 3
+BACKOFF = 0.5               # 재시도 대기 (0.5, 1, 2 … 초 + 약간의 랜덤)
+RETRY_STATUS = {429}        # 받지 않았다고 확실한 응답만 재시도
+UNKNOWN_STATUS = {500, 502, 503, 504}  # 서버가 이미 받았을 수도 있음 → 재시도하지 않고 '확인 필요'
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session(pool_size=MAX_WORKERS):
+    # 프로세스 전체에서 커넥션 풀을 공유
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(pool_size, 10))
+            s.mount('https://', adapter)
+            s.mount('http://', adapter)
+            _session = s
+        return _session
+
+def clean_number(num):
+    return re.sub(r'[^0-9]', '', str(num))
+
+def auth_header(api_key, api_secret):
+    # salt 는 요청마다 새로 만들어야 해서 서명도 요청(=배치)마다 계산
+    date = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    salt = str(uuid.uuid4())
+    signature = hmac.new(api_secret.encode('utf-8'), (date + salt).encode('utf-8'), hashlib.sha256).hexdigest()
+    return {"Authorization": f"HMAC-SHA256 apiKey={api_key}, date={date}, salt={salt}, signature={signature}", "Content-Type": "application/json"}
+
+def not_sent(e):
+    """요청이 서버에 닿기 전에 실패한 오류인지 (연결 자체가 안 됨 → 다시 보내도 중복 없음).
+
+    읽기 타임아웃이나 보낸 뒤 끊긴 연결은 서버가 이미 받았을 수 있어서 False.
+    """
+    if isinstance(e, requests.ConnectTimeout): return True
+    if not isinstance(e, requests.ConnectionError) or not e.args: return False
+    reason = getattr(e.args[0], 'reason', e.args[0])
+    return isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+def _json(res):
+    try: return res.json()
+    except ValueError: return {"errorMessage": res.text[:200] or f"HTTP {res.status_code}"}
+
+@timed()
+def send_coolsms_direct(api_key, api_secret, sender, receiver, text, base_url=API_BASE):
+    try:
+        clean_receiver = clean_number(receiver)
+        clean_sender = clean_number(sender)
+        if not clean_receiver or not clean_sender: return False, {"errorMessage": "번호 오류"}
+
+        payload = {"message": {"to": clean_receiver, "from": clean_sender, "text": text}}
+        res = get_session().post(f"{base_url}/messages/v4/send", json=payload, headers=auth_header(api_key, api_secret), timeout=TIMEOUT)
+        if res.status_code == 200: return True, res.json()
+        body = _json(res)
+        if res.status_code in UNKNOWN_STATUS: body['unknown'] = True
+        return False, body
+    except requests.RequestException as e:
+        return False, {"errorMessage": str(e), "unknown": not not_sent(e)}
+    except Exception as e: return False, {"errorMessage": str(e)}
+
+class RateLimiter:
+    """여러 스레드가 나눠 쓰는 초당 요청 수 제한 (토큰 버킷)."""
+
+    def __init__(self, rate_per_sec, burst=1):
+        self.rate = float(rate_per_sec)
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0: return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class SmsDispatcher:
+    """대량 문자 발송기.
+
+    수신자를 send-many 배치로 묶고, 풀링된 세션으로 max_workers 개까지 동시에 보내며
+    rate_per_sec 으로 요청 속도를 제한한다. 보내지 않은 게 확실한 오류(연결 실패, 429)만
+    지수 백오프로 재시도한다. send-many 는 멱등이 아니어서 읽기 타임아웃·5xx 는 다시 보내지 않고
+    'unknown': True 로 돌려준다 (발송함이 '확인 필요'로 남겨 둠).
+    결과는 입력 순서대로 수신자별 dict 목록 {'to', 'ok', 'message_id', 'error', 'unknown'}.
+    """
+
+    def __init__(self, api_key, api_secret, sender, base_url=API_BASE, batch_size=BATCH_SIZE,
+                 max_workers=MAX_WORKERS, rate_per_sec=RATE_PER_SEC, max_retries=MAX_RETRIES,
+                 backoff=BACKOFF, timeout=TIMEOUT, session=None):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.sender = clean_number(sender)
+        self.url = f"{base_url}/messages/v4/send-many/detail"
+        self.batch_size = max(1, int(batch_size))
+        self.max_workers = max(1, int(max_workers))
+        self.limiter = RateLimiter(rate_per_sec)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = session or get_session(self.max_workers)
+
+    def send_bulk(self, receivers, text, on_progress=None, on_result=None):
+        return self.send_messages([(r, text) for r in receivers], on_progress=on_progress, on_result=on_result)
+
+    @timed()
+    def send_messages(self, messages, on_progress=None, on_result=None):
+        """messages: [(수신번호, 내용), ...] → [{'to', 'ok', 'message_id', 'error', 'unknown'}, ...]
+
+        on_result(위치 목록, 결과 목록) 은 배치 하나가 끝날 때마다 부른다 (발송함이 바로 기록하도록).
+        """
+        results = [None] * len(messages)
+        unique = {}  # 같은 번호·같은 내용은 한 번만 보냄
+        invalid = []
+        for i, (receiver, text) in enumerate(messages):
+            to = clean_number(receiver)
+            if not to or not self.sender:
+                results[i] = {'to': to, 'ok': False, 'message_id': None, 'error': "번호 오류", 'unknown': False}
+                invalid.append(i)
+                continue
+            unique.setdefault((to, text), []).append(i)
+        if on_result and invalid: on_result(invalid, [results[i] for i in invalid])
+
+        keys = list(unique)
+        batches = [keys[i:i + self.batch_size] for i in range(0, len(keys), self.batch_size)]
+        done = len(messages) - sum(len(v) for v in unique.values())
+        if on_progress and done: on_progress(done, len(messages))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._send_batch, batch): batch for batch in batches}
+            # 진행률 콜백은 호출한 스레드에서만 부른다 (st.progress 는 스크립트 스레드 전용)
+            for fut in as_completed(futures):
+                finished = []
+                for key, res in zip(futures[fut], fut.result()):
+                    for i in unique[key]:
+                        results[i] = dict(res)
+                        finished.append(i)
+                done += len(finished)
+                if on_result: on_result(finished, [results[i] for i in finished])
+                if on_progress: on_progress(done, len(messages))
+        return results
+
+    def _send_batch(self, batch):
+        payload = {"messages": [{"to": to, "from": self.sender, "text": text} for to, text in batch]}
+        error, unknown = None, False
+        for attempt in range(self.max_retries + 1):
+            if attempt: time.sleep(self.backoff * (2 ** (attempt - 1)) * (1 + random.random() * 0.2))
+            self.limiter.acquire()
+            try:
+                res = self.session.post(self.url, json=payload, headers=auth_header(self.api_key, self.api_secret), timeout=self.timeout)
+            except requests.RequestException as e:
+                error = str(e)
+                if not_sent(e): continue
+                unknown = True
+                break
+            if res.status_code in RETRY_STATUS:
+                error = _json(res).get('errorMessage', f"HTTP {res.status_code}")
+                continue
+            if res.status_code != 200:
+                error = _json(res).get('errorMessage', f"HTTP {res.status_code}")
+                unknown = res.status_code in UNKNOWN_STATUS
+                break
+            return self._parse(batch, _json(res))
+        return [{'to': to, 'ok': False, 'message_id': None, 'error': error, 'unknown': unknown} for to, _ in batch]
+
+    @staticmethod
+    def _parse(batch, body):
+        # 한 배치에 같은 번호로 다른 내용이 갈 수 있어서 번호만이 아니라 (번호, 내용) 으로 맞춘다.
+        # 응답에 text 가 없으면 같은 번호 안에서 보낸 순서대로 맞춘다.
+        failed = _by_receiver(body.get('failedMessageList'))
+        accepted = _by_receiver(body.get('messageList'))
+        out = []
+        for to, text in batch:
+            m = _take(failed, to, text)
+            if m is not None:
+                out.append({'to': to, 'ok': False, 'message_id': None, 'unknown': False,
+                            'error': m.get('statusMessage') or m.get('statusCode') or "발송 실패"})
+                continue
+            m = _take(accepted, to, text) or {}
+            out.append({'to': to, 'ok': True, 'message_id': m.get('messageId'), 'error': None, 'unknown': False})
+        return out
+
+def _by_receiver(messages):
+    table = {}
+    for m in messages or []: table.setdefault(m.get('to'), []).append(m)
+    return table
+
+def _take(table, to, text):
+    """table[to] 에서 이 메시지의 응답 하나를 꺼낸다 (내용이 같은 것 우선, 없으면 text 없는 첫 응답)."""
+    entries = table.get(to)
+    if not entries: return None
+    pos = next((k for k, m in enumerate(entries) if m.get('text') == text), None)
+    if pos is None: pos = next((k for k, m in enumerate(entries) if m.get('text') is None), None)
+    return entries.pop(pos) if pos is not None else None
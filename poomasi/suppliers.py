@@ -0,0 +1,172 @@
+import difflib
+import os
+import re
+import threading
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from .profiling import timed
+from .ref_cache import load_reference, source_signature
+
+# ==========================================
+# [공급처 이름 매칭] 정규화 키 + 별칭 색인
+# ==========================================
+# "(주)", "주식회사", "농업회사법인", 괄호 속 메모, 뒤에 붙은 지점명 때문에 같은 업체가
+# 다른 문자열로 들어와도 화이트리스트·연락처와 이어지도록 한다.
+# 판매 파일의 고유 업체명만 한 번씩 풀고(결과는 색인에 캐시) 코드로 행에 되돌려 붙인다.
+# 순서: 공백 제거 완전일치 → 법인표기 제거 키 → 괄호/지점 제거 별칭 → 같은 2-gram 블록 안 유사도
+# 유사도로 찾은 이름은 '유사후보'로만 돌려준다 (유기농산물 ≠ 유기농산). 업체 구분·전화번호에는 쓰지 않는다.
+LEGAL_FORMS = ['농업회사법인', '영농조합법인', '영어조합법인', '어업회사법인', '협동조합', '주식회사', '유한회사',
+               '(주)', '㈜', '(유)', '(영)', '(농)']
+BRANCH_SUFFIX = re.compile(r'(본점|지점|[가-힣A-Za-z0-9]+점)$')
+BRACKETS = re.compile(r'[\(\[\{（［｛][^\)\]\}）］｝]*[\)\]\}）］｝]')
+FUZZY_CUTOFF = 0.85
+FUZZY_MIN_LEN = 3
+
+EXACT, KEY, ALIAS, FUZZY = '완전일치', '정규화', '별칭', '유사'
+
+def clean_supplier(name):
+    """기존 매칭 기준 (공백만 제거)."""
+    return str(name).replace(' ', '')
+
+def supplier_key(name):
+    """법인 표기·기호·대소문자를 지운 비교용 키."""
+    s = unicodedata.normalize('NFKC', str(name)).lower()
+    for form in LEGAL_FORMS: s = s.replace(form, '')
+    return re.sub(r'[\s\-_.,·&/]', '', s)
+
+def supplier_aliases(name):
+    """괄호 속 내용을 뺀 이름, 끝에 붙은 지점명을 뺀 이름의 키.
+
+    괄호 속 내용(대표자 이름 등)만으로는 색인하지 않는다 — '이은경' 이 '폴카닷(이은경)' 으로 붙으면 안 된다.
+    """
+    s = unicodedata.normalize('NFKC', str(name))
+    for form in LEGAL_FORMS: s = s.replace(form, ' ')
+    out = set()
+    bare = BRACKETS.sub(' ', s).strip()
+    if bare: out.add(supplier_key(bare))
+    words = bare.split()
+    if len(words) > 1 and BRANCH_SUFFIX.search(words[-1]): out.add(supplier_key(' '.join(words[:-1])))
+    out.discard('')
+    return out
+
+def _bigrams(s):
+    return {s[i:i + 2] for i in range(len(s) - 1)} or {s}
+
+class AliasIndex:
+    """이름 목록에 대한 완전일치/정규화/별칭/유사 매칭. 두 이름 이상에 걸리는 키는 쓰지 않는다."""
+
+    def __init__(self, names):
+        self.names = [str(n) for n in names]
+        self.exact, self.key, self.alias, self.blocks = {}, {}, {}, {}
+        self.keys = [supplier_key(n) for n in self.names]
+        for i, n in enumerate(self.names):
+            self._add(self.exact, clean_supplier(n), i)
+            self._add(self.key, self.keys[i], i)
+            for a in supplier_aliases(n): self._add(self.alias, a, i)
+            for g in _bigrams(self.keys[i]): self.blocks.setdefault(g, set()).add(i)
+        self._resolved = {}
+
+    @staticmethod
+    def _add(table, k, i):
+        if not k: return
+        prev = table.get(k)
+        table[k] = i if prev is None or prev == i else -1  # -1: 애매한 키
+
+    def _fuzzy(self, key):
+        if len(key) < FUZZY_MIN_LEN: return None, 0.0
+        cand = set()
+        for g in _bigrams(key): cand |= self.blocks.get(g, set())
+        best, best_score, tie = None, 0.0, False
+        for i in cand:
+            score = difflib.SequenceMatcher(None, key, self.keys[i]).ratio()
+            if score > best_score: best, best_score, tie = i, score, False
+            elif score == best_score: tie = tie or self.keys[i] != self.keys[best]
+        if best is None or best_score < FUZZY_CUTOFF or tie: return None, best_score
+        return best, best_score
+
+    def resolve_one(self, name):
+        """(이름 번호 또는 None, 방법, 점수). 결과는 캐시."""
+        hit = self._resolved.get(name)
+        if hit is not None: return hit
+        key = supplier_key(name)
+        res = None
+        for table, k, method in ((self.exact, clean_supplier(name), EXACT), (self.key, key, KEY)):
+            i = table.get(k)
+            if i is not None and i >= 0: res = (i, method, 1.0); break
+        if res is None:
+            aliases = supplier_aliases(name)
+            found = ({self.alias.get(a) for a in aliases | {key}} | {self.key.get(a) for a in aliases}) - {None}
+            if len(found) == 1 and -1 not in found: res = (found.pop(), ALIAS, 1.0)
+        if res is None:
+            i, score = self._fuzzy(key)
+            res = (i, FUZZY, score) if i is not None else (None, None, score)
+        self._resolved[name] = res
+        return res
+
+class SupplierResolver:
+    """화이트리스트 + 연락처 색인. resolve() 는 고유 업체명 수에 비례한다.
+
+    유사도 매칭은 확인용 제안(유사후보)으로만 남기고 화이트리스트/연락처 연결에는 쓰지 않는다.
+    """
+
+    def __init__(self, whitelist, contact_names=(), contact_phones=()):
+        self.whitelist = AliasIndex(whitelist)
+        self.contacts = AliasIndex(contact_names)
+        self.phones = list(contact_phones)
+
+    def resolve(self, names):
+        """업체명 컬럼 → 화이트리스트/매칭/연락처명/전화번호/유사후보 표 (입력과 같은 인덱스).
+
+        유사도로만 찾은 이름은 화이트리스트·연락처명·전화번호를 비워 두고 유사후보에 적는다.
+        """
+        names = pd.Series(names)
+        codes, uniques = pd.factorize(names, use_na_sentinel=True)
+        rows = []
+        for u in list(uniques) + ['']:
+            w, method, _ = self.whitelist.resolve_one(str(u)) if u != '' else (None, None, 0.0)
+            c, c_method, _ = self.contacts.resolve_one(str(u)) if u != '' else (None, None, 0.0)
+            hints = [self.whitelist.names[w]] if method == FUZZY else []
+            if c_method == FUZZY: hints.append(self.contacts.names[c])
+            if method == FUZZY: w, method = None, None
+            if c_method == FUZZY: c = None
+            rows.append((self.whitelist.names[w] if w is not None else None, method,
+                         self.contacts.names[c] if c is not None else None,
+                         self.phones[c] if c is not None else None,
+                         ' / '.join(dict.fromkeys(hints)) or None))
+        table = pd.DataFrame(rows, columns=['화이트리스트', '매칭', '연락처명', '전화번호', '유사후보'])
+        return table.iloc[codes].set_axis(names.index)
+
+    def classify(self, names, show_all=False):
+        """지족(사입)/일반업체/제외(또는 일반업체(강제)). 화이트리스트는 별칭 매칭까지 본다 (유사 매칭은 제외)."""
+        names = pd.Series(names)
+        res = self.resolve(names)
+        jijok = names.fillna('').astype(str).str.replace(' ', '').str.contains('지족', regex=False).to_numpy()
+        valid = res['화이트리스트'].notna().to_numpy()
+        other = "일반업체(강제)" if show_all else "제외"
+        return pd.Series(np.where(jijok, "지족(사입)", np.where(valid, "일반업체", other)), index=names.index), res
+
+_memo = {}
+_lock = threading.Lock()
+
+@timed()
+def get_supplier_resolver(whitelist, contact_path=None):
+    """화이트리스트 + 연락처 파일 버전마다 한 번만 색인을 만든다 (프로세스 공유)."""
+    sig = source_signature(contact_path) if contact_path and os.path.exists(contact_path) else None
+    key = (tuple(whitelist), os.path.abspath(contact_path) if contact_path else None, sig)
+    with _lock:
+        hit = _memo.get(key)
+        if hit is not None: return hit
+    names, phones = [], []
+    if sig is not None:
+        df, _ = load_reference(contact_path, 'info')
+        if df is not None and 'clean_name' in df.columns and 'clean_phone' in df.columns:
+            book = df[df['clean_phone'].fillna('') != ''].drop_duplicates(subset=['clean_name'])
+            names, phones = book['clean_name'].tolist(), book['clean_phone'].tolist()
+    resolver = SupplierResolver(whitelist, names, phones)
+    with _lock:
+        _memo.clear()  # 이전 버전 색인은 버림
+        _memo[key] = resolver
+    return resolver
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from poomasi import allocation
+from poomasi.allocation import AllocationProblem
+from poomasi.pipeline import budget_orders
+
+# 예산 배분: 최소 주문금액은 예산 안이어도 적용, 큰 DP 는 탐욕으로
+
+def _orders():
+    return pd.DataFrame({'업체명': ['a', 'a', 'b'], '상품명': ['x', 'y', 'z'], '판매량': [3, 2, 2],
+                         '발주량': [3.0, 2.0, 2.0], '추정매입가': [1000.0, 500.0, 800.0], '평균판매가': [1500.0, 800.0, 1200.0]}
+                        ).assign(예상매입액=lambda d: d['발주량'] * d['추정매입가'])
+
+def test_supplier_min_applies_under_budget():
+    agg = _orders()
+    assert budget_orders(agg, 1_000_000) is agg  # 최소 주문금액이 없으면 그대로
+    out = budget_orders(agg, 1_000_000, supplier_min={'b': 5000})
+    assert out['업체명'].tolist() == ['a', 'a'] and out['발주량'].tolist() == [3.0, 2.0]
+    assert budget_orders(agg, None, supplier_min=4000)['업체명'].unique().tolist() == ['a']
+
+def test_exact_falls_back_to_greedy_when_too_large(monkeypatch):
+    problem = AllocationProblem.from_frame(_orders())
+    calls = []
+    monkeypatch.setattr(AllocationProblem, '_exact', lambda self, *a: calls.append(a) or [])
+    problem.solve(3000, exact=True)
+    assert len(calls) == 1
+    monkeypatch.setattr(allocation, 'EXACT_MAX_KEEP', 10)
+    assert problem.solve(3000, exact=True).tolist() == problem.solve(3000, exact=False).tolist()
+    assert len(calls) == 1
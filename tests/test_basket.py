@@ -0,0 +1,37 @@
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from poomasi.basket import build_basket_model, frequent_itemsets
+
+# 장바구니 분석: 동시구매 횟수와 FP-growth 묶음을 전수 계산과 비교
+
+def _sales(seed=0, n=400):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'회원': rng.choice(['m1', 'm2', 'm3', 'm4', 'm5'], n),
+                         '판매일시': pd.Timestamp('2026-02-01') + pd.to_timedelta(rng.integers(0, 40, n), unit='h'),
+                         '품목명': rng.choice(list('abcdefgh'), n)})
+
+def _baskets(df):
+    return [frozenset(g) for _, g in df.groupby(['회원', '판매일시'])['품목명']]
+
+def test_pair_counts_match_brute_force():
+    df = _sales()
+    model = build_basket_model(df)
+    pairs = model.pairs()
+    got = dict(zip(zip(pairs['상품A'], pairs['상품B']), pairs['횟수']))
+    want = Counter(p for t in _baskets(df) for p in combinations(sorted(t), 2))
+    assert got == dict(want)
+    assert model.n_baskets == len(_baskets(df))
+
+def test_frequent_itemsets_match_brute_force():
+    df = _sales(seed=1)
+    baskets = _baskets(df)
+    min_count = 3
+    got = frequent_itemsets(build_basket_model(df), min_support=(min_count - 0.5) / len(baskets), max_len=3)
+    want = Counter(s for t in baskets for k in (2, 3) for s in combinations(sorted(t), k))
+    want = {' + '.join(s): c for s, c in want.items() if c >= min_count}
+    assert dict(zip(got['조합'], got['횟수'])) == want
+    assert (got['품목수'] == 3).any()
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from poomasi.cleaning import classify_supplier, classify_suppliers, clean_numbers, clean_phones, supplier_set
+from poomasi.common import clean_phone_number, to_clean_number
+
+# 벡터 정제 함수가 행 단위 함수(.apply)와 같은 결과를 내는지 확인
+
+NUMBER_CASES = [
+    1234, 1234.5, -500, 0, np.nan, None, True, 1e-05, 1e16,
+    '1,234원', '-1,234', '₩ 12,000', '12.5kg', '', ' ', '-', '.', '..', '1.2.3', '--5', '3-4',
+    'nan', '무료', '(500)', '+82', '0012', '1,234.50원',
+]
+
+PHONE_CASES = [
+    '010-1234-5678', '01012345678', '1012345678', '10-1234-5678', '+82 10-1234-5678', '+821012345678',
+    '02-123-4567', '031 1234 5678', '1234', '010', '010123456789012', '-', '', ' ', 'nan', np.nan, None,
+    1012345678, 1012345678.0, '연락처없음', '(010) 1234-5678',
+]
+
+SUPPLIER_CASES = [
+    '행복한신선농장', '폴카닷(이은경)', '폴카닷', '(주)산애들애', '지족매장', '지족점과일', '없는업체', '', '유영미',
+]
+
+def _expected_numbers(values):
+    return pd.Series([to_clean_number(v) for v in values], dtype='float64')
+
+@pytest.mark.parametrize('dtype', [object, 'str'])
+def test_clean_numbers_text(dtype):
+    values = [v for v in NUMBER_CASES if isinstance(v, str)] + [None]
+    s = pd.Series(values, dtype=dtype)
+    pd.testing.assert_series_equal(clean_numbers(s), _expected_numbers(s), check_names=False)
+
+def test_clean_numbers_mixed_object():
+    s = pd.Series(NUMBER_CASES, dtype=object)
+    pd.testing.assert_series_equal(clean_numbers(s), _expected_numbers(s), check_names=False)
+
+@pytest.mark.parametrize('values', [[1, -2, 3000], [1.5, np.nan, -0.25, 1e-05, 2e16], [True, False]])
+def test_clean_numbers_numeric(values):
+    s = pd.Series(values)
+    pd.testing.assert_series_equal(clean_numbers(s), _expected_numbers(s), check_names=False)
+
+@pytest.mark.parametrize('dtype', [object, 'str'])
+def test_clean_phones(dtype):
+    values = PHONE_CASES if dtype == object else [v for v in PHONE_CASES if v is None or isinstance(v, str)]
+    s = pd.Series(values, dtype=dtype)
+    expected = [clean_phone_number(v) for v in s]
+    assert clean_phones(s).tolist() == expected
+
+def test_clean_phones_keeps_index():
+    s = pd.Series(['010-1234-5678', None], index=[10, 20])
+    assert clean_phones(s).index.tolist() == [10, 20]
+
+@pytest.mark.parametrize('show_all', [False, True])
+def test_classify_suppliers(show_all):
+    valid = supplier_set(['행복한 신선농장', '폴카닷(이은경)', '(주)산애들애'])
+    names = pd.Series(SUPPLIER_CASES * 3).str.replace(' ', '')
+    expected = [classify_supplier(n, valid, show_all) for n in names]
+    assert classify_suppliers(names, valid, show_all).tolist() == expected
+
+def test_classify_suppliers_missing_name():
+    valid = supplier_set(['행복한신선농장'])
+    out = classify_suppliers(pd.Series(['행복한신선농장', None]), valid)
+    assert out.tolist() == ['일반업체', classify_supplier('', valid)]
@@ -0,0 +1,50 @@
+import io
+import zipfile
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from poomasi import export
+from poomasi.export import write_farmer_zip, write_order_workbook
+
+# 발주서 엑셀: openpyxl 로 다시 읽어 시트 이름과 농가별 행 수 확인
+
+def _orders(n=30):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        '농가명': rng.choice(['가나농원', '다라/농장', 'x' * 40, '판매없음'], n),
+        '품목명': [f"품목{i}" for i in range(n)],
+        '판매건수(인기)': rng.integers(1, 10, n),
+        '총판매수량': np.where(np.arange(n) % 7 == 0, np.nan, rng.integers(1, 100, n)),
+        '판매일시': pd.Timestamp('2026-02-01') + pd.to_timedelta(np.arange(n), unit='h'),
+    }).assign(**{'판매건수(인기)': lambda d: d['판매건수(인기)'].where(d['농가명'] != '판매없음', 0)})
+
+def _sheets(data):
+    wb = openpyxl.load_workbook(io.BytesIO(data), read_only=True)
+    return {ws.title: list(ws.iter_rows(values_only=True)) for ws in wb.worksheets}
+
+def test_workbook_round_trip(monkeypatch):
+    monkeypatch.setattr(export, 'CHUNK_ROWS', 4)  # 여러 조각에 걸쳐 쓰기
+    df = _orders()
+    sheets = _sheets(write_order_workbook(df).getvalue())
+    names = {'가나농원': '가나농원', '다라/농장': '다라_농장', 'x' * 40: 'x' * 31}
+    order = [names[f] for f in df['농가명'].drop_duplicates() if f in names]  # 첫 등장 순, 판매건수 0 인 농가는 시트 없음
+    assert list(sheets) == ['전체발주권고', *order]
+    assert sheets['전체발주권고'][0] == tuple(df.columns)
+    assert len(sheets['전체발주권고']) == len(df) + 1
+    for farmer, name in names.items():
+        rows = sheets[name][1:]
+        want = df[df['농가명'] == farmer]
+        assert len(rows) == len(want)
+        assert [r[1] for r in rows] == want['품목명'].tolist()
+        assert [r[3] for r in rows] == [None if np.isnan(v) else v for v in want['총판매수량']]
+    assert sheets['전체발주권고'][1][4] == df['판매일시'].iloc[0].to_pydatetime()
+
+def test_farmer_zip_round_trip():
+    df = _orders()
+    with zipfile.ZipFile(write_farmer_zip(df)) as zf:
+        names = zf.namelist()
+        assert sorted(names) == sorted(['가나농원.xlsx', '다라_농장.xlsx', 'x' * 40 + '.xlsx'])
+        rows = _sheets(zf.read('가나농원.xlsx'))['가나농원']
+    assert len(rows) == (df['농가명'] == '가나농원').sum() + 1
@@ -0,0 +1,14 @@
+import pandas as pd
+
+from poomasi.forecast import apply_forecast
+
+# 예측 발주량: 팔린 품목은 예측이 0 이어도 최소 1 개
+
+def test_zero_forecast_orders_at_least_one():
+    agg = pd.DataFrame({'업체명': ['A', 'A', 'B'], '상품명': ['x', 'y', 'z'], '판매량': [1, 5, 2],
+                        '발주량': [2.0, 6.0, 3.0], '추정매입가': [100.0, 200.0, 300.0]})
+    fc = pd.DataFrame({'업체명': ['A', 'A'], '상품명': ['x', 'y'], '예측수요': [0.1, 4.2],
+                       '안전재고': [-0.5, 1.0], '권장발주량': [0.0, 6.0]})
+    out = apply_forecast(agg, fc)
+    assert out['발주량'].tolist() == [1.0, 6.0, 3.0]
+    assert out['예상매입액'].tolist() == [100.0, 1200.0, 900.0]
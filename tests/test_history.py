@@ -0,0 +1,70 @@
+import datetime
+import io
+import multiprocessing
+
+import pandas as pd
+import pytest
+
+from poomasi.history import SalesHistory, normalize_sales
+
+# 판매 이력: 겹치는 내보내기 파일의 중복 제거(다른 인스턴스·프로세스가 쓴 것 포함), 기간 조회
+
+COLUMNS = ['번호', '판매일시', 'POS번호', '농가명', '품목명', '회원', '수량', '결제금액']
+ROWS = [
+    (1, '2026-01-31 18:00:00', '001', '가나농원', '사과', '김', 1, 3000),
+    (2, '2026-02-01 09:00:00', '001', '가나농원', '배', '이', 2, 8000),
+    (3, '2026-02-01 09:00:00', '001', '가나농원', '배', '이', 2, 8000),  # 한 영수증에 같은 줄 두 번 → 둘 다 남김
+    (4, '2026-02-02 10:30:00', '002', '다라농장', '감', None, 1, 2500),
+    (5, '2026-02-03 11:00:00', '001', '다라농장', '귤', '박', 3, 9000),
+]
+
+def _export(rows, name='sales.csv'):
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    buf = io.BytesIO(df.to_csv(index=False).encode('utf-8-sig'))
+    buf.name = name
+    return buf
+
+def _frame(rows):
+    return normalize_sales(pd.DataFrame(rows, columns=COLUMNS).assign(판매일시=lambda d: pd.to_datetime(d['판매일시'])))[0]
+
+def _append(root, rows):
+    SalesHistory(root).append(_frame(rows))
+
+@pytest.fixture
+def history(tmp_path):
+    return SalesHistory(str(tmp_path / 'sales'))
+
+def test_overlapping_exports_are_deduplicated(history):
+    first = history.ingest(_export(ROWS[:3], 'a.csv'))
+    assert (first['new'], first['months']) == (3, {'2026-01': 1, '2026-02': 2})
+    second = history.ingest(_export(ROWS[1:], 'b.csv'))  # 2·3번 줄이 겹침
+    assert (second['new'], second['duplicate']) == (2, 2)
+    assert history.ingest(_export(ROWS[1:], 'b.csv'))['skipped']
+    assert len(history.query()) == len(ROWS)
+
+def test_other_instance_writes_are_seen(history):
+    other = SalesHistory(history.root)
+    history.append(_frame(ROWS[:3]))       # 이 인스턴스가 1·2월 키를 캐시
+    other.append(_frame(ROWS[3:4]))        # 다른 인스턴스(다른 프로세스)가 2월에 씀
+    assert history.append(_frame(ROWS)) == {'2026-02': 1}
+    assert len(history.query()) == len(ROWS)
+
+def test_concurrent_processes_do_not_duplicate(history):
+    ctx = multiprocessing.get_context('spawn')
+    procs = [ctx.Process(target=_append, args=(history.root, ROWS if i % 2 else ROWS[::-1])) for i in range(4)]
+    for p in procs: p.start()
+    for p in procs: p.join(60)
+    assert [p.exitcode for p in procs] == [0] * 4
+    assert len(history.query()) == len(ROWS)
+
+def test_date_range_and_window_reads(history):
+    assert history.date_range() == (None, None)
+    history.ingest(_export(ROWS))
+    assert history.date_range() == (datetime.date(2026, 1, 31), datetime.date(2026, 2, 3))
+    df = history.query('2026-02-01', '2026-02-02', ['품목명', '수량'])
+    assert list(df.columns) == ['판매일시', '품목명', '수량']
+    assert df['품목명'].tolist() == ['배', '배', '감']  # end 날짜는 그날 끝까지
+    assert df['판매일시'].is_monotonic_increasing
+    assert history.query('2026-01-01', '2026-01-31', ['없는컬럼'])['판매일시'].dt.day.tolist() == [31]
+    assert history.query('2026-03-01', None, ['품목명']).empty
+    assert len(history.signature('2026-01-01', '2026-01-31')) == 1 and len(history.signature()) == 2
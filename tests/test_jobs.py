@@ -0,0 +1,25 @@
+import time
+
+from poomasi.jobs import CANCELLED, DONE, FAILED, Job, JobRunner
+
+# 백그라운드 작업: 상태 전이와 끝난 작업 정리
+
+def _wait(job, timeout=5):
+    end = time.time() + timeout
+    while job.active and time.time() < end: time.sleep(0.01)
+    return job
+
+def test_status_and_finished_are_set_together():
+    runner = JobRunner(max_workers=2)
+    ok = _wait(runner.submit('s', 'ok', lambda job: 42))
+    bad = _wait(runner.submit('s', 'bad', lambda job: 1 / 0))
+    assert (ok.status, ok.result) == (DONE, 42) and ok.finished is not None
+    assert bad.status == FAILED and 'ZeroDivisionError' in bad.error and bad.finished is not None
+
+def test_prune_skips_jobs_without_finish_time():
+    runner = JobRunner(max_workers=1)
+    stray = Job('s', 'stray', 'stray')
+    stray.status = CANCELLED  # 끝났다고 보이지만 finished 는 아직 없음
+    runner._jobs[stray.id] = stray
+    _wait(runner.submit('s', 'next', lambda job: None))
+    assert runner.get(stray.id) is stray
@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+
+from poomasi.outbox import PENDING, SENT, UNKNOWN, Outbox, _now
+
+# 발송함: 멱등 기록, 발송 중 예외 / 오래된 'sending' 처리
+
+class FakeDispatcher:
+    batch_size, max_workers = 2, 1
+
+    def __init__(self, fail=None, fail_after=0, max_workers=1):
+        self.sent, self.fail, self.fail_after, self.max_workers = [], fail, fail_after, max_workers
+
+    def send_messages(self, messages, on_progress=None, on_result=None):
+        results = []
+        for i in range(0, len(messages), self.batch_size):
+            if self.fail and i >= self.fail_after * self.batch_size: raise self.fail
+            batch = messages[i:i + self.batch_size]
+            self.sent += batch
+            res = [{'to': to, 'ok': True, 'message_id': f"M{to}", 'error': None} for to, _ in batch]
+            if on_result: on_result(list(range(i, i + len(batch))), res)
+            results += res
+        return results
+
+@pytest.fixture
+def outbox(tmp_path):
+    return Outbox(str(tmp_path / 'outbox.sqlite3'))
+
+def _enqueue(outbox, n=3, day='2026-02-08'):
+    return outbox.enqueue([(f"v{i}", f"0101111000{i}", 'hi') for i in range(n)], 'order', day=day)
+
+def test_enqueue_is_idempotent(outbox):
+    assert _enqueue(outbox) == _enqueue(outbox)
+    assert len(outbox.rows()) == 3
+
+def test_dispatcher_error_leaves_in_flight_unknown(outbox):
+    keys = _enqueue(outbox)
+    with pytest.raises(RuntimeError):
+        outbox.send_pending(FakeDispatcher(fail=RuntimeError('boom')), keys)
+    # 보내던 묶음은 나갔는지 모름 → 자동으로 다시 보내지 않음, 아직 가져오지 않은 키는 그대로
+    assert [outbox.statuses(keys)[k] for k in keys] == [UNKNOWN, UNKNOWN, PENDING]
+    retry = FakeDispatcher()
+    summary = outbox.send_pending(retry, keys)
+    assert [to for to, _ in retry.sent] == ['01011110002'] and summary['unknown'] == 2
+
+def test_batches_are_recorded_as_they_finish(outbox):
+    keys = _enqueue(outbox, n=4)
+    first = FakeDispatcher(fail=RuntimeError('boom'), fail_after=1, max_workers=2)
+    with pytest.raises(RuntimeError):
+        outbox.send_pending(first, keys)
+    assert [outbox.statuses(keys)[k] for k in keys] == [SENT, SENT, UNKNOWN, UNKNOWN]
+    retry = FakeDispatcher()
+    summary = outbox.send_pending(retry, keys)
+    assert retry.sent == [] and summary == {'sent': 0, 'failed': 0, 'skipped': 2, 'unknown': 2}
+
+def test_stale_sending_is_reclaimed(outbox):
+    keys = _enqueue(outbox, n=2)
+    assert outbox.claim(keys[:1]) == keys[:1]
+    assert outbox.claim(keys[:1]) == []  # 다른 세션이 보내는 중
+    summary = outbox.send_pending(FakeDispatcher(), keys)
+    assert summary == {'sent': 1, 'failed': 0, 'skipped': 0, 'unknown': 1}
+    with sqlite3.connect(outbox.path) as con:
+        con.execute("UPDATE outbox SET updated_at = ? WHERE idem_key = ?", (_now(3600), keys[0]))
+    summary = outbox.send_pending(FakeDispatcher(), keys)
+    assert summary == {'sent': 1, 'failed': 0, 'skipped': 1, 'unknown': 0}
+
+def test_pending_keys_filters_in_sql(outbox):
+    a = _enqueue(outbox, n=2, day='2026-02-08')
+    b = _enqueue(outbox, n=1, day='2026-02-09')
+    m = outbox.enqueue([('x', '01099998888', 'ad')], 'marketing', day='2026-02-08')
+    outbox.mark(a[0], True)
+    outbox.mark(a[1], False, error='e')
+    assert outbox.pending_keys(day='2026-02-08') == [a[1]] + m
+    assert outbox.pending_keys(kind='order', day='2026-02-09') == b
+    assert outbox.pending_keys(kind='marketing') == m
@@ -0,0 +1,38 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from poomasi import parallel
+
+# 병렬 파싱: spawn 프로세스 풀 결과 == 직렬 결과
+
+def _file(seed, excel=False):
+    rng = np.random.default_rng(seed)
+    n = 200
+    df = pd.DataFrame({'판매일시': pd.Timestamp('2026-02-01') + pd.to_timedelta(rng.integers(0, 500, n), unit='h'),
+                       '농가명': rng.choice(['가나농원', '다라농장', '마바상회'], n),
+                       '품목명': rng.choice(['사과', '배', '감', '귤'], n),
+                       '수량': rng.integers(1, 5, n), '결제금액': rng.integers(1, 50, n) * 1000})
+    buf = io.BytesIO()
+    if excel: df.to_excel(buf, index=False)
+    else: buf.write(df.to_csv(index=False).encode('utf-8-sig'))
+    return buf.getvalue()
+
+def _sorted(part):
+    return part.sort_values(parallel.KEY_COLS).reset_index(drop=True)
+
+def test_spawn_pool_matches_serial():
+    datas = [_file(0), _file(1, excel=True), b'not a sales file', _file(2)]
+    parallel._reset_pool()
+    try:
+        pooled = parallel.parse_many(datas, max_workers=2, parallel=True)
+        assert not parallel._pool_broken and parallel._pool is not None  # 풀로 실제로 돌았는지
+    finally: parallel._reset_pool()
+    serial = parallel.parse_many(datas, parallel=False)
+    assert len(pooled) == len(serial) == 4
+    for (p, perr), (s, serr) in zip(pooled, serial):
+        assert perr == serr
+        if s is None: assert p is None
+        else: pd.testing.assert_frame_equal(_sorted(p), _sorted(s))
+    assert serial[2][0] is None and serial[0][0] is not None
@@ -0,0 +1,33 @@
+import tracemalloc
+
+import pytest
+
+from poomasi import profiling
+
+# 계측: 실행 도중 메모리 측정을 켜고 꺼도 단계 기록이 깨지지 않게
+
+@pytest.fixture
+def enabled():
+    was_on, was_tracing = profiling.settings.enabled, tracemalloc.is_tracing()
+    profiling.configure(enabled=True, memory=False)
+    yield
+    profiling.end_run()
+    profiling.configure(enabled=was_on, memory=was_tracing)
+
+def _stages(toggle_at):
+    profiling.begin_run('test')
+    with profiling.stage('outer'):
+        if toggle_at == 'outer': profiling.configure(memory=True)
+        with profiling.stage('inner'):
+            if toggle_at == 'inner': profiling.configure(memory=False)
+            bytearray(1 << 20)
+    return {s['stage']: s['peak_mb'] for s in profiling.end_run().stages}
+
+def test_memory_turned_on_mid_run(enabled):
+    peaks = _stages('outer')
+    assert peaks['outer'] is None and peaks['inner'] is not None
+
+def test_memory_turned_off_mid_run(enabled):
+    profiling.configure(memory=True)
+    peaks = _stages('inner')
+    assert peaks == {'outer': None, 'inner': None}
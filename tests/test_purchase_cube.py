@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from poomasi.purchase_cube import build_purchase_cube
+
+# 구매 큐브: 빈 농가/상품/구매자 행이 다른 칸으로 새지 않게
+
+def test_missing_keys_are_dropped():
+    df = pd.DataFrame({'농가': ['A', None, 'B', 'A'], '상품': ['x', 'x', None, 'y'],
+                       '회원': ['m1', 'm1', 'm3', None], '금액': [1, 2, 4, 8]})
+    cube = build_purchase_cube(df, '농가', '상품', '회원', '금액')
+    out = cube.buyers_for(['A'])
+    assert out['회원'].tolist() == ['m1'] and out['구매금액'].tolist() == [1.0]
+    assert cube.buyers_for(['B']).empty
+    assert cube.items_for() == ['x']
+
+def test_matches_groupby():
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame({'농가': rng.choice(['A', 'B', 'C', None], n), '상품': rng.choice(['x', 'y', None], n),
+                       '회원': rng.choice(['m1', 'm2', 'm3', 'm4', None], n), '금액': rng.integers(1, 100, n)})
+    cube = build_purchase_cube(df, '농가', '상품', '회원', '금액')
+    for farmers in (['A'], ['B', 'C']):
+        got = cube.buyers_for(farmers).set_index('회원').sort_index()
+        sel = df[df['농가'].isin(farmers) & df['상품'].notna()]
+        want = sel.groupby('회원')['금액'].agg(['size', 'sum']).sort_index()
+        assert got['구매횟수'].tolist() == want['size'].tolist()
+        assert got['구매금액'].tolist() == want['sum'].astype(float).tolist()
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from poomasi import rfm
+from poomasi.history import SalesHistory
+from poomasi.pipeline import MEMBER_COLUMNS, rfm_state_window
+
+# 판매 이력 기간의 RFM 회원 상태: 새 part 만 합친 결과 == 처음부터 다시 만든 결과
+
+def _sales(rows):
+    return pd.DataFrame(rows, columns=['판매일시', '회원', '품목명', '결제금액']).assign(
+        판매일시=lambda d: pd.to_datetime(d['판매일시']).astype('datetime64[us]'))
+
+DAY1 = [('2026-02-01 10:00', 'A', '사과', 1000), ('2026-02-01 11:00', 'B', '배', 2000)]
+DAY2 = [('2026-02-02 09:00', 'A', '배', 500), ('2026-02-02 12:00', 'C', '감', 700), ('2026-02-02 13:00', None, '감', 100)]
+DAY2_MORE = [('2026-02-02 18:00', 'A', '감', 300), ('2026-02-03 08:00', 'B', '귤', 900)]
+OLD = [('2026-01-15 10:00', 'A', '사과', 400)]
+
+rfm_update = rfm.update_state
+
+@pytest.fixture
+def history(tmp_path):
+    return SalesHistory(str(tmp_path / 'sales'))
+
+def _full(history, start, end):
+    return rfm.build_state(history.query(start, end, MEMBER_COLUMNS))
+
+def _same(a, b):
+    key = lambda s: s.sort_values('회원').reset_index(drop=True)
+    pd.testing.assert_frame_equal(key(a), key(b), check_dtype=False)
+
+def test_incremental_matches_rebuild(history, monkeypatch):
+    window = ('2026-01-01', '2026-02-28')
+    calls = []
+    monkeypatch.setattr(rfm, 'update_state', lambda *a, **k: calls.append(1) or rfm_update(*a, **k))
+    history.append(_sales(DAY1))
+    _same(rfm_state_window(*window, history=history), _full(history, *window))
+    for rows in (DAY2, DAY2_MORE):  # 같은 날을 나눠 올려도 방문일은 한 번
+        history.append(_sales(rows))
+        _same(rfm_state_window(*window, history=history), _full(history, *window))
+    assert len(calls) == 2
+    history.append(_sales(OLD))  # 과거 날짜가 들어오면 다시 만든다
+    _same(rfm_state_window(*window, history=history), _full(history, *window))
+    assert len(calls) == 2
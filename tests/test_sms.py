@@ -0,0 +1,143 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from poomasi.sms import SmsDispatcher, send_coolsms_direct
+
+# 로컬 스텁 HTTP 서버로 SmsDispatcher 의 배치·재시도·'확인 필요' 처리를 확인
+
+class Stub:
+    """응답 시나리오를 차례로 돌려주는 스텁 서버. 받은 요청 본문은 requests 에 쌓인다."""
+
+    def __init__(self):
+        self.script, self.requests = [], []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                stub.requests.append((self.path, body))
+                status, delay = stub.script.pop(0) if stub.script else (200, 0)
+                if delay: time.sleep(delay)
+                messages = body.get('messages') or [body.get('message')]
+                if status == 200:
+                    bad = lambda m: m['to'].endswith('9') or m['text'] == 'fail'
+                    out = {'messageList': [{'to': m['to'], 'text': m['text'], 'messageId': f"M{m['to']}:{m['text']}"} for m in messages if not bad(m)],
+                           'failedMessageList': [{'to': m['to'], 'text': m['text'], 'statusMessage': '수신거부'} for m in messages if bad(m)]}
+                else: out = {'errorMessage': f"HTTP {status}"}
+                data = json.dumps(out).encode('utf-8')
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except OSError: pass  # 클라이언트가 타임아웃으로 먼저 끊은 경우
+
+            def log_message(self, *args): pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+@pytest.fixture
+def stub():
+    s = Stub()
+    yield s
+    s.server.shutdown()
+    s.server.server_close()
+
+def _dispatcher(url, **kw):
+    opts = dict(batch_size=2, max_workers=2, rate_per_sec=0, backoff=0, timeout=2, session=requests.Session())
+    opts.update(kw)
+    return SmsDispatcher('key', 'secret', '010-0000-0000', base_url=url, **opts)
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def test_batches_and_per_recipient_results(stub):
+    msgs = [('010-1111-1111', 'a'), ('01022222222', 'a'), ('010-3333-3339', 'a'), ('', 'a'), ('010-1111-1111', 'a')]
+    out = _dispatcher(stub.url).send_messages(msgs)
+    assert len(stub.requests) == 2  # 중복 번호는 한 번, 2명씩 배치
+    assert all(path == '/messages/v4/send-many/detail' for path, _ in stub.requests)
+    assert [r['ok'] for r in out] == [True, True, False, False, True]
+    assert out[0]['message_id'] == 'M01011111111:a'
+    assert out[2]['error'] == '수신거부' and not out[2]['unknown']
+    assert out[3]['error'] == '번호 오류'
+
+def test_on_result_reports_each_batch(stub):
+    calls = []
+    msgs = [('01011111111', 'a'), ('', 'a'), ('01022222222', 'a'), ('01033333333', 'a')]
+    out = _dispatcher(stub.url).send_messages(msgs, on_result=lambda pos, res: calls.append((sorted(pos), [r['ok'] for r in res])))
+    assert sorted(calls) == [([0, 2], [True, True]), ([1], [False]), ([3], [True])]
+    assert [r['ok'] for r in out] == [True, False, True, True]
+
+def test_same_receiver_different_texts_in_one_batch(stub):
+    msgs = [('01011111111', '세그먼트'), ('01011111111', 'fail'), ('01011111111', '공지')]
+    out = _dispatcher(stub.url, batch_size=10).send_messages(msgs)
+    assert len(stub.requests) == 1
+    assert [r['ok'] for r in out] == [True, False, True]
+    assert [r['message_id'] for r in out] == ['M01011111111:세그먼트', None, 'M01011111111:공지']
+
+def test_parse_without_text_matches_in_order():
+    batch = [('01011111111', 'x'), ('01011111111', 'y')]
+    body = {'messageList': [{'to': '01011111111', 'messageId': 'M1'}],
+            'failedMessageList': [{'to': '01011111111', 'statusMessage': '잔액 부족'}]}
+    out = SmsDispatcher._parse(batch, body)
+    assert [(r['ok'], r['message_id'], r['error']) for r in out] == [(False, None, '잔액 부족'), (True, 'M1', None)]
+
+def test_retries_429(stub):
+    stub.script = [(429, 0), (429, 0)]
+    out = _dispatcher(stub.url, batch_size=10).send_messages([('01011111111', 'a')])
+    assert len(stub.requests) == 3
+    assert out[0]['ok']
+
+@pytest.mark.parametrize('status', [500, 502, 503, 504])
+def test_server_error_is_unknown_and_not_retried(stub, status):
+    stub.script = [(status, 0)]
+    out = _dispatcher(stub.url, batch_size=10).send_messages([('01011111111', 'a'), ('01022222222', 'a')])
+    assert len(stub.requests) == 1
+    assert [(r['ok'], r['unknown']) for r in out] == [(False, True), (False, True)]
+
+def test_read_timeout_is_unknown_and_not_retried(stub):
+    stub.script = [(200, 1.5)]
+    out = _dispatcher(stub.url, batch_size=10, timeout=0.5).send_messages([('01011111111', 'a')])
+    assert len(stub.requests) == 1
+    assert not out[0]['ok'] and out[0]['unknown']
+
+def test_connection_refused_is_retried_and_not_unknown():
+    url = f"http://127.0.0.1:{_free_port()}"
+    out = _dispatcher(url, max_retries=2).send_messages([('01011111111', 'a')])
+    assert not out[0]['ok'] and not out[0]['unknown']
+
+def test_client_error_is_failed(stub):
+    stub.script = [(400, 0)]
+    out = _dispatcher(stub.url).send_messages([('01011111111', 'a')])
+    assert len(stub.requests) == 1
+    assert not out[0]['ok'] and not out[0]['unknown']
+
+def test_send_direct(stub):
+    ok, res = send_coolsms_direct('key', 'secret', '010-0000-0000', '010-1111-1111', 'hi', base_url=stub.url)
+    assert ok and stub.requests[-1][0] == '/messages/v4/send'
+    stub.script = [(503, 0)]
+    ok, res = send_coolsms_direct('key', 'secret', '010-0000-0000', '010-1111-1111', 'hi', base_url=stub.url)
+    assert not ok and res['unknown']
+
+def test_outbox_keeps_unknown_rows(stub, tmp_path):
+    from poomasi.outbox import SENT, UNKNOWN, Outbox
+    outbox = Outbox(str(tmp_path / 'outbox.sqlite3'))
+    keys = outbox.enqueue([(p, p, 'hi') for p in ['01011111111', '01022222222', '01033333333']], 'marketing')
+    stub.script = [(200, 0), (503, 0)]
+    summary = outbox.send_pending(_dispatcher(stub.url, max_workers=1), keys)
+    assert summary == {'sent': 2, 'failed': 0, 'skipped': 0, 'unknown': 1}
+    assert sorted(outbox.statuses(keys).values()) == sorted([SENT, SENT, UNKNOWN])
+    again = outbox.send_pending(_dispatcher(stub.url), keys)
+    assert again == {'sent': 0, 'failed': 0, 'skipped': 2, 'unknown': 1}
+    assert len(stub.requests) == 2  # 확인 필요 건은 다시 보내지 않음
@@ -0,0 +1,20 @@
+from poomasi.suppliers import SupplierResolver
+
+# 공급처 매칭: 괄호 속 이름만으로는 잇지 않고, 유사 매칭은 제안으로만
+
+def _resolver():
+    return SupplierResolver(['폴카닷(이은경)', '유기농산', '토종마을', '행복농장'],
+                            ['유기농산', '토종마을', '행복농장'], ['01011112222', '01033334444', '01055556666'])
+
+def test_bracket_contents_are_not_aliases():
+    res = _resolver().resolve(['이은경', '폴카닷'])
+    assert res['화이트리스트'].isna().iloc[0]
+    assert res['화이트리스트'].iloc[1] == '폴카닷(이은경)'
+
+def test_fuzzy_hits_are_suggestions_only():
+    r = _resolver()
+    res = r.resolve(['유기농산물', '토종마을점', '(주)행복농장'])
+    assert res['화이트리스트'].isna().iloc[:2].all() and res['전화번호'].isna().iloc[:2].all()
+    assert res['유사후보'].tolist()[:2] == ['유기농산', '토종마을']
+    assert res['화이트리스트'].iloc[2] == '행복농장' and res['전화번호'].iloc[2] == '01055556666'
+    assert r.classify(['유기농산물', '토종마을점'])[0].tolist() == ['제외', '제외']